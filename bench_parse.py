@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: décodage d'une réponse time_series de 5000 bougies
+
+Compare le chemin historique (json + float() par champ pour chaque ligne
+SQLite) au chemin du client: fast_json puis CandleStore.to_columns (une
+conversion NumPy par colonne), et la conversion en colonnes de l'analyse
+(CandleSeries.from_values). Une dernière mesure inclut l'écriture SQLite
+de save_candles (base temporaire).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from core.candles import CandleSeries
+from data.candle_store import CandleStore
+from data.replay import synthetic_time_series
+from utils import fast_json
+
+OUTPUT_SIZE = 5000
+ROUNDS = 20
+
+
+def legacy_rows(body: str) -> list[tuple]:
+    """Chemin historique: json.loads puis float() par champ de chaque bougie"""
+    return [
+        (
+            "EUR/USD",
+            "1h",
+            item.get("datetime"),
+            float(item.get("open", 0)),
+            float(item.get("high", 0)),
+            float(item.get("low", 0)),
+            float(item.get("close", 0)),
+            float(item.get("volume")) if item.get("volume") else 0,
+        )
+        for item in json.loads(body)["values"]
+        if item.get("datetime")
+    ]
+
+
+def column_rows(body: str) -> list[tuple]:
+    """Chemin du client: fast_json puis colonnes NumPy (comme save_candles)"""
+    timestamps, columns = CandleStore.to_columns(fast_json.loads(body)["values"])
+    return list(zip(timestamps, *(column.tolist() for column in columns)))
+
+
+def series_columns(body: str) -> CandleSeries:
+    """Colonnes de l'analyse: fast_json puis CandleSeries.from_values"""
+    return CandleSeries.from_values(fast_json.loads(body)["values"], "1h")
+
+
+def timed(func, body: str, rounds: int = ROUNDS) -> float:
+    """Meilleure durée d'un décodage sur rounds essais (ms)"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(body)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> int:
+    body = json.dumps(synthetic_time_series("EUR/USD", "1h", OUTPUT_SIZE))
+
+    legacy_ms = timed(legacy_rows, body)
+    columns_ms = timed(column_rows, body)
+    series_ms = timed(series_columns, body)
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        store = CandleStore(db_path)
+        save_ms = timed(lambda b: store.save_candles("EUR/USD", "1h", fast_json.loads(b)["values"]), body, 5)
+    finally:
+        os.remove(db_path)
+
+    print("\n" + "=" * 60)
+    print(f"⏱️  DÉCODAGE time_series ({OUTPUT_SIZE} bougies, {len(body) / 1024:.0f} Ko)")
+    print("=" * 60)
+    decoder = "orjson" if fast_json.HAS_ORJSON else "json"
+    print(f"{'json + float() par champ:':30}{legacy_ms:7.2f} ms")
+    print(f"{decoder + ' + to_columns:':30}{columns_ms:7.2f} ms (x{legacy_ms / columns_ms:.2f})")
+    print(f"{decoder + ' + from_values:':30}{series_ms:7.2f} ms")
+    print(f"{'save_candles (SQLite inclus):':30}{save_ms:7.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,13 @@
 Handlers des commandes Telegram
 """
 
+from typing import Optional
 from telegram import Update
 from telegram.ext import ContextTypes
+from config.settings import TWELVEDATA_CREDITS_DAILY_LIMIT
+from core.analysis_cache import AnalysisCache
 from data.database import Database
+from data.twelvedata_client import TwelveDataClient
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -13,14 +17,23 @@ logger = setup_logger(__name__)
 class CommandHandlers:
     """Handlers des commandes Telegram"""
 
-    def __init__(self, db: Database):
+    def __init__(
+        self,
+        db: Database,
+        api_client: Optional[TwelveDataClient] = None,
+        analysis_cache: Optional[AnalysisCache] = None,
+    ):
         """
         Initialiser les handlers
         
         Args:
             db: Base de données
+            api_client: Client Twelve Data (latences affichées par /status)
+            analysis_cache: Cache des analyses du scanner (taux de hits affiché par /status)
         """
         self.db = db
+        self.api_client = api_client
+        self.analysis_cache = analysis_cache
 
     async def handle_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Commande /start"""
@@ -58,6 +71,9 @@ Vous recevrez des notifications pour chaque signal détecté.
             bearish = [p["symbol"] for p in pair_statuses if p["trend"] == "BEARISH"]
             neutral = [p["symbol"] for p in pair_statuses if p["trend"] == "NEUTRAL"]
 
+            credits_used = self.db.get_credits_used_today()
+            credits_remaining = max(0, TWELVEDATA_CREDITS_DAILY_LIMIT - credits_used)
+
             message = f"""
 📊 Statut des paires alignées
 
@@ -70,9 +86,23 @@ Vous recevrez des notifications pour chaque signal détecté.
 ⚪ NEUTRAL ({len(neutral)}):
 {", ".join(neutral) if neutral else "Aucune"}
 
-💾 Crédits API: ~700/800 (estimation)
+💾 Crédits API: {credits_remaining}/{TWELVEDATA_CREDITS_DAILY_LIMIT} restants ({credits_used} utilisés aujourd'hui)
             """
 
+            stats = self.api_client.get_fetch_stats() if self.api_client else None
+            if stats and stats["attempts"]:
+                message = message.rstrip() + (
+                    f"\n⏱️ Latence API: p50 {stats['p50'] * 1000:.0f}ms, p99 {stats['p99'] * 1000:.0f}ms "
+                    f"({stats['retries']} retries)"
+                )
+
+            cache_stats = self.analysis_cache.get_stats() if self.analysis_cache else None
+            if cache_stats and cache_stats["hits"] + cache_stats["misses"]:
+                message = message.rstrip() + (
+                    f"\n🧮 Cache d'analyse: {cache_stats['hit_rate']:.0%} de hits "
+                    f"({cache_stats['entries']} entrées)"
+                )
+
             await update.message.reply_text(message)
             logger.info(f"Commande /status de {update.effective_user.id}")
 
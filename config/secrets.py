@@ -28,6 +28,11 @@ class Secrets:
             raise ValueError("TWELVEDATA_API_KEY_FIBOBOT n'est pas défini")
         return api_key
 
+    @staticmethod
+    def get_twelvedata_mode() -> str:
+        """Récupérer le mode du client Twelve Data (live, record, replay)"""
+        return os.getenv("TWELVEDATA_MODE", "live")
+
     @staticmethod
     def get_log_level() -> str:
         """Récupérer le niveau de log"""
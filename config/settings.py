@@ -27,6 +27,14 @@ TIMEFRAMES = {
     "hourly": "1h",
 }
 
+# Durée d'une bougie par timeframe (secondes)
+TIMEFRAME_SECONDS = {
+    "1h": 3600,
+    "4h": 4 * 3600,
+    "1day": 24 * 3600,
+    "1week": 7 * 24 * 3600,
+}
+
 # Paramètres techniques
 SMA_PERIOD = 200
 RSI_PERIOD = 14
@@ -44,18 +52,62 @@ FIBONACCI_LEVELS = {
 FIBONACCI_ZONE_MIN = 0.500
 FIBONACCI_ZONE_MAX = 0.618
 
+# Swings ZigZag (ancrages Fibonacci): retournement minimum en ATR, sinon en %
+SWING_REVERSAL_ATR = 1.5
+SWING_REVERSAL_PCT = 0.2
+
+# Cache des analyses par bougie (pivots, Heiken Ashi, S/R)
+ANALYSIS_CACHE_SIZE = 512
+
 # Limites API Twelve Data
 TWELVEDATA_CREDITS_DAILY_LIMIT = 800
 TWELVEDATA_REQUESTS_PER_MINUTE = 8
 TWELVEDATA_CREDITS_PER_REQUEST = 1
+TWELVEDATA_BATCH_MAX_SYMBOLS = 8  # symboles par requête batch (1 crédit/symbole)
+TWELVEDATA_HTTP_TIMEOUT = 10  # secondes par requête
+TWELVEDATA_MAX_CONCURRENCY = 4  # requêtes async simultanées
+
+# Résilience des requêtes Twelve Data
+TWELVEDATA_RETRY_ATTEMPTS = 3  # tentatives par requête (timeouts, 5xx, 429)
+TWELVEDATA_RETRY_BASE_DELAY = 1.0  # secondes, doublé à chaque tentative (jitter complet)
+TWELVEDATA_RETRY_MAX_DELAY = 15.0
+TWELVEDATA_BREAKER_FAILURES = 5  # échecs consécutifs avant ouverture du circuit
+TWELVEDATA_BREAKER_RESET = 60  # secondes avant la requête d'essai
+TWELVEDATA_HEDGE_AFTER = None  # secondes avant requête doublée (async, None = désactivé)
+TWELVEDATA_LATENCY_WINDOW = 1000  # tentatives conservées pour les percentiles
+
+# Flux de prix temps réel (WebSocket, selon le plan Twelve Data)
+TWELVEDATA_STREAM_ENABLED = False
+TWELVEDATA_WS_URL = "wss://ws.twelvedata.com/v1/quotes/price"
+TWELVEDATA_WS_HEARTBEAT = 10  # secondes
 
 # Budget optimisé
 BUDGET_W1_D1_SCAN = 112  # 14 paires * 4 requêtes (W1 + D1 prix + SMA)
 BUDGET_H1_SCAN = 14  # 14 paires max
 BUDGET_DAILY_TARGET = 500
+BUDGET_SAFETY_MARGIN = 20  # crédits jamais engagés par le planificateur
+# Timeframes demandés à l'API par paire et par job (1 crédit chacun, au plus)
+BUDGET_JOB_INTERVALS = {
+    "daily_scan": ("1h", "1week", "1day"),  # H1 du stockage local, W1/D1 si l'historique manque
+    "hourly_scan": ("1h",),
+    "backfill": ("1h",),
+}
+BUDGET_JOB_CREDITS_PER_PAIR = {job: len(intervals) for job, intervals in BUDGET_JOB_INTERVALS.items()}
+
+# Sessions FX (UTC): début de journée pour l'agrégation D1/W1
+FX_DAY_START_HOUR_UTC = 0
+FX_WEEK_OPEN_HOUR_UTC = 22  # dimanche
+FX_WEEK_CLOSE_HOUR_UTC = 22  # vendredi
+
+# Mode du client Twelve Data: live, record (enregistre les réponses), replay (rejoue)
+TWELVEDATA_RECORDINGS_DIR = "recordings"
+
+# Stockage local des bougies (SQLite)
+CANDLE_STORE_PATH = "fibo_bot.db"
 
 # Scans
 SCAN_TIME_DAILY = "00:00"  # UTC
+BACKFILL_HOURS = "3,9,15,21"  # UTC, à la demi-heure (hors scans H1)
 SCAN_INTERVAL_HOURLY = 1  # heure
 
 # Heiken Ashi
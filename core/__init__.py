@@ -1,11 +1,13 @@
 """Core package"""
 
+from .candles import CandleSeries
 from .fibonacci import FibonacciCalculator
 from .heiken_ashi import HeikenAshiAnalyzer
 from .technical import TechnicalAnalyzer
 from .scanner import ForexScanner
 
 __all__ = [
+    "CandleSeries",
     "FibonacciCalculator",
     "HeikenAshiAnalyzer",
     "TechnicalAnalyzer",
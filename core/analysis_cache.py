@@ -0,0 +1,108 @@
+"""
+Cache des résultats d'analyse par bougie (pivots, Heiken Ashi, S/R...)
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+from config.settings import ANALYSIS_CACHE_SIZE
+from core.candles import CandleSeries
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AnalysisCache:
+    """
+    Mémoïsation LRU des calculs d'analyse
+
+    Clé: (paire, timeframe, dernière bougie, nom du calcul, paramètres).
+    La dernière bougie est identifiée par son horodatage, la taille de la
+    série et sa clôture: une bougie en cours mise à jour invalide l'entrée.
+    Une instance est partagée entre les scans H1 et les ticks du flux de
+    prix (scanner du scheduler) et par replay_scan.py; les handlers
+    Telegram ne calculent rien et n'en lisent que les compteurs (/status).
+    """
+
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_SIZE):
+        """
+        Initialiser le cache
+
+        Args:
+            max_entries: Nombre d'entrées avant éviction de la moins récente
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(symbol: str, interval: str, series: CandleSeries, name: str, params: Dict) -> Tuple:
+        """Clé d'un calcul sur la série"""
+        if len(series):
+            last_bar = (int(series.timestamp[-1]), len(series), float(series.close[-1]))
+        else:
+            last_bar = (0, 0, 0.0)
+        return (symbol, interval, last_bar, name, tuple(sorted(params.items())))
+
+    def get_or_compute(
+        self,
+        symbol: str,
+        interval: str,
+        series: CandleSeries,
+        name: str,
+        compute: Callable[[], Any],
+        **params,
+    ) -> Any:
+        """
+        Lire un résultat ou le calculer une fois pour la bougie courante
+
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            series: Bougies analysées
+            name: Nom du calcul (pivots, heiken_ashi, sr_levels...)
+            compute: Calcul à exécuter en cas d'absence
+            **params: Paramètres du calcul (font partie de la clé)
+
+        Returns:
+            Résultat (partagé: ne pas le modifier)
+        """
+        key = self.make_key(symbol, interval, series, name, params)
+
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return result
+
+    def clear(self):
+        """Vider le cache (compteurs conservés)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Compteurs du cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
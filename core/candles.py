@@ -0,0 +1,194 @@
+"""
+Série de bougies en colonnes contiguës (NumPy)
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Optional, Union
+import numpy as np
+from utils.timeframes import DATETIME_FORMAT, DATE_FORMAT
+
+# Colonnes de prix (float64) et colonnes Heiken Ashi optionnelles
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+HA_FIELDS = ("ha_open", "ha_high", "ha_low", "ha_close")
+
+
+class CandleSeries:
+    """
+    Bougies stockées en colonnes NumPy, triées chronologiquement
+
+    Les horodatages sont des secondes UNIX (int64). Un slice renvoie une
+    vue partageant les colonnes (aucune copie); un index entier renvoie la
+    bougie au format dict pour les appels unitaires (is_bullish, etc.).
+    """
+
+    __slots__ = ("timestamp",) + PRICE_FIELDS + HA_FIELDS + ("interval",)
+
+    def __init__(
+        self,
+        timestamp: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: Optional[np.ndarray] = None,
+        ha: Optional[tuple] = None,
+        interval: Optional[str] = None,
+    ):
+        """
+        Initialiser la série à partir de colonnes de même longueur
+
+        Args:
+            timestamp: Horodatages (secondes UNIX, int64)
+            open, high, low, close: Prix (float64)
+            volume: Volumes (défaut: zéros)
+            ha: Colonnes Heiken Ashi (ha_open, ha_high, ha_low, ha_close)
+            interval: Timeframe (format des dates des bougies)
+        """
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume if volume is not None else np.zeros(len(close))
+        self.ha_open, self.ha_high, self.ha_low, self.ha_close = ha or (None,) * 4
+        self.interval = interval
+
+    @classmethod
+    def from_values(cls, values: list[Dict], interval: Optional[str] = None) -> "CandleSeries":
+        """
+        Construire une série depuis les "values" Twelve Data (plus récente en premier)
+
+        Args:
+            values: Bougies {datetime, open, high, low, close, volume}
+            interval: Timeframe
+
+        Returns:
+            Série triée chronologiquement
+        """
+        series = cls._from_records(values, "datetime", interval)
+
+        # Twelve Data renvoie la plus récente en premier: tri sur la colonne
+        order = np.argsort(series.timestamp, kind="stable")
+        return cls(
+            series.timestamp[order], series.open[order], series.high[order],
+            series.low[order], series.close[order], series.volume[order],
+            interval=interval,
+        )
+
+    @classmethod
+    def from_candles(cls, candles: list[Dict], interval: Optional[str] = None) -> "CandleSeries":
+        """
+        Construire une série depuis des bougies au format dict (ordre conservé)
+
+        Args:
+            candles: Bougies {timestamp, open, high, low, close, [ha_*]}
+            interval: Timeframe
+
+        Returns:
+            Série dans l'ordre de la liste
+        """
+        return cls._from_records(candles, "timestamp", interval)
+
+    @classmethod
+    def _from_records(cls, records: list[Dict], time_key: str, interval: Optional[str]) -> "CandleSeries":
+        """Remplir les colonnes (conversions vectorisées, champs absents = 0)"""
+        # NumPy convertit les chaînes ISO et décimales en C, sans float()/strptime par bougie
+        times = np.array([r.get(time_key) or "NaT" for r in records], dtype="datetime64[s]")
+        timestamp = np.where(np.isnat(times), 0, times.astype(np.int64))
+        columns = [
+            np.array([r.get(field) or 0 for r in records], dtype=np.float64)
+            for field in PRICE_FIELDS
+        ]
+
+        ha = None
+        if records and all(field in records[0] for field in HA_FIELDS):
+            ha = tuple(
+                np.array([r.get(field) or 0 for r in records], dtype=np.float64)
+                for field in HA_FIELDS
+            )
+
+        return cls(timestamp, *columns, ha=ha, interval=interval)
+
+    @property
+    def has_heiken_ashi(self) -> bool:
+        """True si les colonnes Heiken Ashi sont calculées"""
+        return self.ha_close is not None
+
+    def with_heiken_ashi(
+        self,
+        ha_open: np.ndarray,
+        ha_high: np.ndarray,
+        ha_low: np.ndarray,
+        ha_close: np.ndarray,
+    ) -> "CandleSeries":
+        """Nouvelle série partageant les colonnes OHLC, avec les colonnes Heiken Ashi"""
+        return CandleSeries(
+            self.timestamp, self.open, self.high, self.low, self.close, self.volume,
+            ha=(ha_open, ha_high, ha_low, ha_close),
+            interval=self.interval,
+        )
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Dict, "CandleSeries"]:
+        if isinstance(key, slice):
+            ha = None
+            if self.has_heiken_ashi:
+                ha = (self.ha_open[key], self.ha_high[key], self.ha_low[key], self.ha_close[key])
+            return CandleSeries(
+                self.timestamp[key], self.open[key], self.high[key], self.low[key],
+                self.close[key], self.volume[key], ha=ha, interval=self.interval,
+            )
+        return self.bar(key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.bar(i)
+
+    def bar(self, index: int) -> Dict:
+        """
+        Bougie à l'index donné au format dict
+
+        Args:
+            index: Position (négatif accepté)
+
+        Returns:
+            {timestamp, open, high, low, close, volume, [ha_*]}
+        """
+        candle = {"timestamp": self.format_time(index)}
+        for field in PRICE_FIELDS:
+            candle[field] = float(getattr(self, field)[index])
+        if self.has_heiken_ashi:
+            for field in HA_FIELDS:
+                candle[field] = float(getattr(self, field)[index])
+        return candle
+
+    def format_time(self, index: int) -> Optional[str]:
+        """Horodatage de la bougie au format Twelve Data (None si absent)"""
+        epoch = int(self.timestamp[index])
+        if not epoch:
+            return None
+        dt = datetime.fromtimestamp(epoch, timezone.utc)
+        return dt.strftime(DATE_FORMAT if self.interval in ("1day", "1week") else DATETIME_FORMAT)
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par les colonnes (octets)"""
+        columns = [self.timestamp] + [getattr(self, f) for f in PRICE_FIELDS + HA_FIELDS]
+        return sum(c.nbytes for c in columns if c is not None)
+
+
+def as_series(candles: Union[CandleSeries, list[Dict]]) -> CandleSeries:
+    """
+    Accepter indifféremment une CandleSeries ou une liste de bougies dict
+
+    Args:
+        candles: Série ou liste (ordre chronologique)
+
+    Returns:
+        CandleSeries (la série d'origine si déjà en colonnes)
+    """
+    if isinstance(candles, CandleSeries):
+        return candles
+    return CandleSeries.from_candles(candles)
@@ -2,7 +2,9 @@
 Calculs et détection des niveaux Fibonacci
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from core.candles import CandleSeries, as_series
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -26,6 +28,10 @@ class FibonacciCalculator:
     ZONE_MIN = 0.500
     ZONE_MAX = 0.618
 
+    # Ratios en colonnes (calculs par lots), dans l'ordre de LEVELS
+    RATIOS = np.array(list(LEVELS.values()))
+    ZONE_COLUMNS = (list(LEVELS).index("level_500"), list(LEVELS).index("level_618"))
+
     @staticmethod
     def calculate_levels(high: float, low: float) -> dict[str, float]:
         """
@@ -87,10 +93,107 @@ class FibonacciCalculator:
 
         return (min(level_500, level_618), max(level_500, level_618))
 
+    @staticmethod
+    def calculate_levels_batch(highs: np.ndarray, lows: np.ndarray) -> np.ndarray:
+        """
+        Calculer les niveaux Fibonacci de nombreux ancrages en une opération
+        
+        Args:
+            highs: Prix hauts, de forme quelconque (ex. paires x swings, NaN si absent)
+            lows: Prix bas, même forme
+            
+        Returns:
+            Matrice de forme highs.shape + (7,), colonnes dans l'ordre de LEVELS
+        """
+        highs = np.asarray(highs, dtype=np.float64)[..., np.newaxis]
+        lows = np.asarray(lows, dtype=np.float64)[..., np.newaxis]
+        return highs - (highs - lows) * FibonacciCalculator.RATIOS
+
+    @staticmethod
+    def zone_bounds_batch(levels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Limites des zones GA d'une matrice de niveaux
+        
+        Args:
+            levels: Résultat de calculate_levels_batch
+            
+        Returns:
+            Tuple (zone_min, zone_max) de forme levels.shape[:-1]
+        """
+        level_500, level_618 = (levels[..., column] for column in FibonacciCalculator.ZONE_COLUMNS)
+        return np.fmin(level_500, level_618), np.fmax(level_500, level_618)
+
+    @staticmethod
+    def zone_mask(prices: np.ndarray, zone_min: np.ndarray, zone_max: np.ndarray) -> np.ndarray:
+        """
+        Appartenance des prix aux zones (une ligne de zones par prix)
+        
+        Args:
+            prices: Prix, forme (paires,)
+            zone_min: Bornes basses, forme (paires, zones), NaN si absente
+            zone_max: Bornes hautes, même forme
+            
+        Returns:
+            Masque booléen (paires, zones); une zone NaN n'est jamais touchée
+        """
+        prices = np.asarray(prices, dtype=np.float64)[..., np.newaxis]
+        return (zone_min <= prices) & (prices <= zone_max)
+
+    @staticmethod
+    def find_fractals(
+        highs: np.ndarray,
+        lows: np.ndarray,
+        window: int = 2,
+        strict: bool = True,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Trouver les fractales (sommets et creux sur window bougies de chaque côté)
+        
+        Strict: le pivot dépasse toutes ses voisines. Non strict: les voisines
+        de gauche peuvent l'égaler, un plateau ne donne qu'un pivot (sa
+        dernière bougie).
+        
+        Args:
+            highs: Plus hauts (ordre chronologique)
+            lows: Plus bas
+            window: Bougies comparées de chaque côté
+            strict: Refuser les égalités à gauche
+            
+        Returns:
+            Tuple (indices_sommets, indices_creux) en tableaux d'entiers
+        """
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        if window < 1 or len(highs) < 2 * window + 1:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+
+        # Une ligne par pivot candidat: [window voisines, pivot, window voisines]
+        high_windows = np.lib.stride_tricks.sliding_window_view(highs, 2 * window + 1)
+        low_windows = np.lib.stride_tricks.sliding_window_view(lows, 2 * window + 1)
+        center_high = highs[window:-window]
+        center_low = lows[window:-window]
+
+        left_high = high_windows[:, :window].max(axis=1)
+        right_high = high_windows[:, window + 1:].max(axis=1)
+        left_low = low_windows[:, :window].min(axis=1)
+        right_low = low_windows[:, window + 1:].min(axis=1)
+
+        if strict:
+            is_peak = (center_high > left_high) & (center_high > right_high)
+            is_trough = (center_low < left_low) & (center_low < right_low)
+        else:
+            is_peak = (center_high >= left_high) & (center_high > right_high)
+            is_trough = (center_low <= left_low) & (center_low < right_low)
+
+        return np.flatnonzero(is_peak) + window, np.flatnonzero(is_trough) + window
+
     @staticmethod
     def find_peaks_and_troughs(
-        candles: list[Dict],
+        candles: Union[CandleSeries, list[Dict]],
         lookback: int = 50,
+        window: int = 1,
+        strict: bool = True,
     ) -> Tuple[list[int], list[int]]:
         """
         Trouver les sommets et creux dans les dernières bougies
@@ -98,6 +201,8 @@ class FibonacciCalculator:
         Args:
             candles: Liste des bougies (format: {high, low, close, ...})
             lookback: Nombre de bougies à analyser
+            window: Bougies comparées de chaque côté du pivot
+            strict: Refuser les égalités (voir find_fractals)
             
         Returns:
             Tuple (indices_sommets, indices_creux) avec indices relatifs à la liste complète
@@ -107,86 +212,88 @@ class FibonacciCalculator:
 
         # Déterminer le point de départ
         start_idx = max(0, len(candles) - lookback)
-        recent_candles = candles[start_idx:]
-        peaks = []
-        troughs = []
-
-        for i in range(1, len(recent_candles) - 1):
-            high = recent_candles[i].get("high", 0)
-            low = recent_candles[i].get("low", 0)
-            prev_high = recent_candles[i - 1].get("high", 0)
-            next_high = recent_candles[i + 1].get("high", 0)
-            prev_low = recent_candles[i - 1].get("low", 0)
-            next_low = recent_candles[i + 1].get("low", 0)
-
-            # Sommet: haut supérieur aux précédent et suivant
-            if high > prev_high and high > next_high:
-                peaks.append(start_idx + i)
-
-            # Creux: bas inférieur aux précédent et suivant
-            if low < prev_low and low < next_low:
-                troughs.append(start_idx + i)
+        recent_candles = as_series(candles)[start_idx:]
+
+        peaks, troughs = FibonacciCalculator.find_fractals(
+            recent_candles.high, recent_candles.low, window, strict
+        )
+        peaks = (peaks + start_idx).tolist()
+        troughs = (troughs + start_idx).tolist()
 
         logger.debug(f"Sommets trouvés: {len(peaks)}, Creux trouvés: {len(troughs)}")
         return peaks, troughs
 
     @staticmethod
-    def get_last_peak(candles: list[Dict]) -> Tuple[int, float]:
+    def get_last_peak(
+        candles: Union[CandleSeries, list[Dict]],
+        peaks: Optional[list[int]] = None,
+    ) -> Tuple[int, float]:
         """
         Récupérer le dernier sommet
         
         Args:
             candles: Liste des bougies
+            peaks: Sommets déjà calculés (find_peaks_and_troughs)
             
         Returns:
             Tuple (index, prix)
         """
-        if not candles:
+        if not len(candles):
             return -1, 0
 
-        peaks, _ = FibonacciCalculator.find_peaks_and_troughs(candles)
+        candles = as_series(candles)
+        if peaks is None:
+            peaks, _ = FibonacciCalculator.find_peaks_and_troughs(candles)
         if not peaks:
             # Retourner le plus haut des 50 dernières bougies
-            recent = candles[-50:]
-            max_idx = max(range(len(recent)), key=lambda i: recent[i].get("high", 0))
-            return len(candles) - 50 + max_idx, recent[max_idx].get("high", 0)
+            recent = candles.high[-50:]
+            max_idx = int(np.argmax(recent))
+            return len(candles) - 50 + max_idx, float(recent[max_idx])
 
         last_peak_idx = peaks[-1]
         if last_peak_idx >= len(candles):
             return -1, 0
-        return last_peak_idx, candles[last_peak_idx].get("high", 0)
+        return last_peak_idx, float(candles.high[last_peak_idx])
 
     @staticmethod
-    def get_last_trough(candles: list[Dict]) -> Tuple[int, float]:
+    def get_last_trough(
+        candles: Union[CandleSeries, list[Dict]],
+        troughs: Optional[list[int]] = None,
+    ) -> Tuple[int, float]:
         """
         Récupérer le dernier creux
         
         Args:
             candles: Liste des bougies
+            troughs: Creux déjà calculés (find_peaks_and_troughs)
             
         Returns:
             Tuple (index, prix)
         """
-        if not candles:
+        if not len(candles):
             return -1, 0
 
-        _, troughs = FibonacciCalculator.find_peaks_and_troughs(candles)
+        candles = as_series(candles)
+        if troughs is None:
+            _, troughs = FibonacciCalculator.find_peaks_and_troughs(candles)
         if not troughs:
             # Retourner le plus bas des 50 dernières bougies
-            recent = candles[-50:]
-            min_idx = min(range(len(recent)), key=lambda i: recent[i].get("low", 0))
-            return len(candles) - 50 + min_idx, recent[min_idx].get("low", 0)
+            recent = candles.low[-50:]
+            min_idx = int(np.argmin(recent))
+            return len(candles) - 50 + min_idx, float(recent[min_idx])
 
         last_trough_idx = troughs[-1]
         if last_trough_idx >= len(candles):
             return -1, 0
-        return last_trough_idx, candles[last_trough_idx].get("low", 0)
+        return last_trough_idx, float(candles.low[last_trough_idx])
 
     @staticmethod
     def calculate_multiple_fibonacci(
-        candles: list[Dict],
+        candles: Union[CandleSeries, list[Dict]],
         mode: str = "bullish",
         max_count: int = 4,
+        pivots: Optional[Tuple[list[int], list[int]]] = None,
+        swings: Optional[list[Dict]] = None,
     ) -> list[Dict]:
         """
         Tracer jusqu'à 4 Fibonacci selon le mode
@@ -205,6 +312,9 @@ class FibonacciCalculator:
             candles: Liste des bougies avec ha_high, ha_low, ha_open, ha_close
             mode: "bullish" ou "bearish"
             max_count: Nombre max de Fibonacci (défaut 4)
+            pivots: (sommets, creux) déjà calculés, sinon calculés une seule fois
+            swings: Swings ZigZag (ZigZag.swings): ancrages pris sur les swings
+                plutôt que sur chaque pivot de 3 bougies
             
         Returns:
             Liste de dictionnaires avec les niveaux Fibonacci
@@ -213,72 +323,111 @@ class FibonacciCalculator:
             logger.warning("Pas assez de bougies pour calculer les Fibonacci")
             return []
 
+        candles = as_series(candles)
+        if swings is not None:
+            pivots = (
+                [swing["index"] for swing in swings if swing["type"] == "high"],
+                [swing["index"] for swing in swings if swing["type"] == "low"],
+            )
+        peaks, troughs = pivots or FibonacciCalculator.find_peaks_and_troughs(candles)
         fibs = []
 
         if mode.lower() == "bullish":
             # Point A = Dernier sommet (HA rouge→vert)
-            point_a_idx, point_a_price = FibonacciCalculator.get_last_peak(candles)
+            point_a_idx, point_a_price = FibonacciCalculator.get_last_peak(candles, peaks)
             if point_a_idx < 0:
                 return []
 
             # Trouver les 4 derniers creux AVANT le sommet
-            _, troughs = FibonacciCalculator.find_peaks_and_troughs(candles)
             valid_troughs = [t for t in troughs if t < point_a_idx]
 
             # Prendre les 4 derniers creux valides
             selected_troughs = valid_troughs[-max_count:]
 
-            for i, trough_idx in enumerate(selected_troughs):
-                trough_price = candles[trough_idx].get("low", 0)
-                levels = FibonacciCalculator.calculate_levels(point_a_price, trough_price)
-
-                fibs.append({
-                    "index": i + 1,
-                    "mode": "bullish",
-                    "point_a": point_a_price,
-                    "point_b": trough_price,
-                    "point_a_idx": point_a_idx,
-                    "point_b_idx": trough_idx,
-                    "levels": levels,
-                    "zone_min": levels.get("level_500", 0),
-                    "zone_max": levels.get("level_618", 0),
-                })
+            anchors = [(point_a_price, float(candles.low[t]), point_a_idx, t) for t in selected_troughs]
+            fibs = FibonacciCalculator._build_fibonacci_batch("bullish", anchors)
 
             logger.info(f"Bullish: {len(fibs)} Fibonacci tracés (sommet {point_a_price:.5f})")
 
         elif mode.lower() == "bearish":
             # Point A = Dernier creux (HA vert→rouge)
-            point_a_idx, point_a_price = FibonacciCalculator.get_last_trough(candles)
+            point_a_idx, point_a_price = FibonacciCalculator.get_last_trough(candles, troughs)
             if point_a_idx < 0:
                 return []
 
             # Trouver les 4 derniers sommets AVANT le creux
-            peaks, _ = FibonacciCalculator.find_peaks_and_troughs(candles)
             valid_peaks = [p for p in peaks if p < point_a_idx]
 
             # Prendre les 4 derniers sommets valides
             selected_peaks = valid_peaks[-max_count:]
 
-            for i, peak_idx in enumerate(selected_peaks):
-                peak_price = candles[peak_idx].get("high", 0)
-                levels = FibonacciCalculator.calculate_levels(peak_price, point_a_price)
-
-                fibs.append({
-                    "index": i + 1,
-                    "mode": "bearish",
-                    "point_a": peak_price,
-                    "point_b": point_a_price,
-                    "point_a_idx": peak_idx,
-                    "point_b_idx": point_a_idx,
-                    "levels": levels,
-                    "zone_min": min(levels.get("level_500", 0), levels.get("level_618", 0)),
-                    "zone_max": max(levels.get("level_500", 0), levels.get("level_618", 0)),
-                })
+            anchors = [(float(candles.high[p]), point_a_price, p, point_a_idx) for p in selected_peaks]
+            fibs = FibonacciCalculator._build_fibonacci_batch("bearish", anchors)
 
             logger.info(f"Bearish: {len(fibs)} Fibonacci tracés (creux {point_a_price:.5f})")
 
         return fibs
 
+    @staticmethod
+    def _build_fibonacci_batch(mode: str, anchors: list[Tuple[float, float, int, int]]) -> list[Dict]:
+        """Fibonacci de plusieurs ancrages (point_a, point_b, idx_a, idx_b), niveaux en une opération"""
+        if not anchors:
+            return []
+
+        highs, lows = zip(*((point_a, point_b) for point_a, point_b, _, _ in anchors))
+        matrix = FibonacciCalculator.calculate_levels_batch(np.array(highs), np.array(lows))
+        return [
+            FibonacciCalculator.build_fibonacci(
+                mode, i + 1, point_a, point_b, point_a_idx, point_b_idx,
+                levels=dict(zip(FibonacciCalculator.LEVELS, row)),
+            )
+            for i, ((point_a, point_b, point_a_idx, point_b_idx), row) in enumerate(zip(anchors, matrix.tolist()))
+        ]
+
+    @staticmethod
+    def build_fibonacci(
+        mode: str,
+        index: int,
+        point_a: float,
+        point_b: float,
+        point_a_idx: int,
+        point_b_idx: int,
+        levels: Optional[dict[str, float]] = None,
+    ) -> Dict:
+        """
+        Construire un Fibonacci tracé entre deux ancrages
+        
+        Args:
+            mode: "bullish" ou "bearish"
+            index: Numéro du Fibonacci (1 à 4)
+            point_a: Prix haut (sommet)
+            point_b: Prix bas (creux)
+            point_a_idx: Indice de la bougie du sommet
+            point_b_idx: Indice de la bougie du creux
+            levels: Niveaux déjà calculés (ligne de calculate_levels_batch)
+            
+        Returns:
+            Dict {index, mode, point_a, point_b, point_a_idx, point_b_idx, levels, zone_min, zone_max}
+        """
+        if levels is None:
+            levels = FibonacciCalculator.calculate_levels(point_a, point_b)
+        if mode == "bullish":
+            zone_min, zone_max = levels.get("level_500", 0), levels.get("level_618", 0)
+        else:
+            zone_min, zone_max = FibonacciCalculator.get_zone_boundaries(levels)
+
+        return {
+            "index": index,
+            "mode": mode,
+            "point_a": point_a,
+            "point_b": point_b,
+            "point_a_idx": point_a_idx,
+            "point_b_idx": point_b_idx,
+            "levels": levels,
+            "zone_min": zone_min,
+            "zone_max": zone_max,
+        }
+
     @staticmethod
     def check_price_in_any_zone(
         price: float,
@@ -310,3 +459,48 @@ class FibonacciCalculator:
                 }
 
         return None
+
+    @staticmethod
+    def check_prices_in_zones(
+        prices: dict[str, float],
+        fibs_by_symbol: dict[str, list[Dict]],
+    ) -> dict[str, Dict]:
+        """
+        check_price_in_any_zone pour toutes les paires en un seul masque NumPy
+        
+        Args:
+            prices: Prix actuel par paire
+            fibs_by_symbol: Fibonacci tracés par paire
+            
+        Returns:
+            Dict {paire: résultat de check_price_in_any_zone} des seules paires en zone
+        """
+        symbols = [symbol for symbol in prices if fibs_by_symbol.get(symbol)]
+        if not symbols:
+            return {}
+
+        # Zones alignées en matrice (paires x Fibonacci), complétées par NaN
+        width = max(len(fibs_by_symbol[symbol]) for symbol in symbols)
+        zone_min = np.full((len(symbols), width), np.nan)
+        zone_max = np.full((len(symbols), width), np.nan)
+        for row, symbol in enumerate(symbols):
+            fibs = fibs_by_symbol[symbol]
+            zone_min[row, :len(fibs)] = [fib.get("zone_min", 0) for fib in fibs]
+            zone_max[row, :len(fibs)] = [fib.get("zone_max", 0) for fib in fibs]
+
+        mask = FibonacciCalculator.zone_mask([prices[symbol] for symbol in symbols], zone_min, zone_max)
+        first = mask.argmax(axis=1)
+
+        results = {}
+        for row in np.flatnonzero(mask.any(axis=1)).tolist():
+            symbol = symbols[row]
+            fib = fibs_by_symbol[symbol][first[row]]
+            logger.info(f"Prix {prices[symbol]:.5f} dans zone Fib #{fib.get('index')} de {symbol}")
+            results[symbol] = {
+                "in_zone": True,
+                "fib_index": fib.get("index"),
+                "zone_min": fib.get("zone_min", 0),
+                "zone_max": fib.get("zone_max", 0),
+                "fib": fib,
+            }
+        return results
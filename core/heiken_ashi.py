@@ -2,7 +2,10 @@
 Conversion et analyse des bougies Heiken Ashi
 """
 
-from typing import Dict, List
+from typing import Dict, List, Union
+import numpy as np
+from core.candles import CandleSeries, as_series
+from core.indicators import exponential_filter
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -12,59 +15,83 @@ class HeikenAshiAnalyzer:
     """Analyse des bougies Heiken Ashi"""
 
     @staticmethod
-    def convert_to_heiken_ashi(candles: list[Dict]) -> list[Dict]:
+    def convert_to_heiken_ashi(candles: Union[CandleSeries, list[Dict]]) -> CandleSeries:
         """
         Convertir les bougies standards en Heiken Ashi
         
         Args:
-            candles: Liste des bougies standards
+            candles: Série ou liste des bougies standards (ordre chronologique)
             
         Returns:
-            Liste des bougies Heiken Ashi
-        """
-        if not candles:
-            return []
-
-        ha_candles = []
-        prev_ha_open = 0
-        prev_ha_close = 0
-
-        for i, candle in enumerate(candles):
-            open_price = float(candle.get("open", 0))
-            high = float(candle.get("high", 0))
-            low = float(candle.get("low", 0))
-            close = float(candle.get("close", 0))
-
-            # Heiken Ashi Close = moyenne OHLC
-            ha_close = (open_price + high + low + close) / 4
-
-            # Heiken Ashi Open = moyenne du HA open/close précédent
-            if i == 0:
-                ha_open = (open_price + close) / 2
-            else:
-                ha_open = (prev_ha_open + prev_ha_close) / 2
-
-            # Heiken Ashi High/Low
-            ha_high = max(high, ha_open, ha_close)
-            ha_low = min(low, ha_open, ha_close)
-
-            ha_candles.append({
-                "timestamp": candle.get("timestamp"),
-                "open": open_price,
-                "high": high,
-                "low": low,
-                "close": close,
-                "ha_open": ha_open,
-                "ha_high": ha_high,
-                "ha_low": ha_low,
-                "ha_close": ha_close,
-            })
-
-            prev_ha_open = ha_open
-            prev_ha_close = ha_close
-
-        logger.debug(f"Conversion Heiken Ashi: {len(candles)} bougies")
-        return ha_candles
+            Série avec les colonnes ha_open, ha_high, ha_low, ha_close
+        """
+        series = as_series(candles)
+        if not len(series):
+            return series
+
+        # Heiken Ashi Close = moyenne OHLC
+        ha_close = (series.open + series.high + series.low + series.close) / 4
+
+        # Heiken Ashi Open = moyenne du HA open/close précédent: filtre
+        # linéaire ha_open[i] = 0.5 * ha_open[i - 1] + 0.5 * ha_close[i - 1]
+        ha_open = np.empty_like(ha_close)
+        ha_open[0] = (series.open[0] + series.close[0]) / 2
+        ha_open[1:] = exponential_filter(ha_close[:-1], 0.5, ha_open[0])
+
+        # Heiken Ashi High/Low
+        ha_high = np.maximum(series.high, np.maximum(ha_open, ha_close))
+        ha_low = np.minimum(series.low, np.minimum(ha_open, ha_close))
+
+        logger.debug(f"Conversion Heiken Ashi: {len(series)} bougies")
+        return series.with_heiken_ashi(ha_open, ha_high, ha_low, ha_close)
+
+    @staticmethod
+    def color_changes(candles: Union[CandleSeries, list[Dict]]) -> np.ndarray:
+        """
+        Changements de couleur de chaque bougie (detect_color_change en tableau)
+        
+        Args:
+            candles: Série Heiken Ashi (convertie si besoin)
+            
+        Returns:
+            Tableau int8: 1 rouge→vert, -1 vert→rouge, 0 sans changement (première bougie: 0)
+        """
+        series = HeikenAshiAnalyzer._ha_series(candles)
+        bullish = (series.ha_close > series.ha_open).astype(np.int8)
+        changes = np.zeros(len(series), dtype=np.int8)
+        changes[1:] = np.diff(bullish)
+        return changes
+
+    @staticmethod
+    def run_lengths(candles: Union[CandleSeries, list[Dict]]) -> np.ndarray:
+        """
+        Nombre de bougies consécutives de même couleur jusqu'à chaque bougie
+        
+        Args:
+            candles: Série Heiken Ashi (convertie si besoin)
+            
+        Returns:
+            Tableau d'entiers (1 sur une bougie qui change de couleur)
+        """
+        series = HeikenAshiAnalyzer._ha_series(candles)
+        n = len(series)
+        if not n:
+            return np.empty(0, dtype=np.intp)
+
+        # Début de la série en cours pour chaque bougie
+        bullish = series.ha_close > series.ha_open
+        starts = np.zeros(n, dtype=np.intp)
+        changed = np.flatnonzero(bullish[1:] != bullish[:-1]) + 1
+        starts[changed] = changed
+        return np.arange(n) - np.maximum.accumulate(starts) + 1
+
+    @staticmethod
+    def _ha_series(candles: Union[CandleSeries, list[Dict]]) -> CandleSeries:
+        """Série avec colonnes Heiken Ashi (calculées si absentes)"""
+        series = as_series(candles)
+        if series.has_heiken_ashi:
+            return series
+        return HeikenAshiAnalyzer.convert_to_heiken_ashi(series)
 
     @staticmethod
     def is_bullish(ha_candle: Dict) -> bool:
@@ -119,7 +146,7 @@ class HeikenAshiAnalyzer:
 
     @staticmethod
     def is_peak_confirmed(
-        candles: list[Dict],
+        candles: Union[CandleSeries, list[Dict]],
         peak_idx: int,
     ) -> bool:
         """
@@ -136,6 +163,12 @@ class HeikenAshiAnalyzer:
         if peak_idx < 1 or peak_idx >= len(candles):
             return False
 
+        # Série en colonnes: lecture directe des deux bougies
+        if isinstance(candles, CandleSeries) and candles.has_heiken_ashi:
+            prev_bullish = candles.ha_close[peak_idx - 1] > candles.ha_open[peak_idx - 1]
+            curr_bullish = candles.ha_close[peak_idx] > candles.ha_open[peak_idx]
+            return bool(curr_bullish and not prev_bullish)
+
         prev_candle = candles[peak_idx - 1]
         curr_candle = candles[peak_idx]
 
@@ -144,7 +177,7 @@ class HeikenAshiAnalyzer:
 
     @staticmethod
     def is_trough_confirmed(
-        candles: list[Dict],
+        candles: Union[CandleSeries, list[Dict]],
         trough_idx: int,
     ) -> bool:
         """
@@ -161,6 +194,12 @@ class HeikenAshiAnalyzer:
         if trough_idx < 1 or trough_idx >= len(candles):
             return False
 
+        # Série en colonnes: lecture directe des deux bougies
+        if isinstance(candles, CandleSeries) and candles.has_heiken_ashi:
+            prev_bullish = candles.ha_close[trough_idx - 1] > candles.ha_open[trough_idx - 1]
+            curr_bullish = candles.ha_close[trough_idx] > candles.ha_open[trough_idx]
+            return bool(prev_bullish and not curr_bullish)
+
         prev_candle = candles[trough_idx - 1]
         curr_candle = candles[trough_idx]
 
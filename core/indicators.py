@@ -0,0 +1,648 @@
+"""
+Indicateurs: séries vectorisées (SMA, RSI de Wilder) et versions incrémentales
+
+Les fonctions *_series calculent l'indicateur pour toutes les bougies en
+une passe NumPy (NaN sans historique suffisant). Les classes Online* sont
+mises à jour en O(1) par bougie et sérialisables entre deux scans.
+"""
+
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Dict, Optional, Tuple
+import numpy as np
+from config.settings import RSI_PERIOD, SMA_PERIOD
+from core.candles import CandleSeries
+
+# Taille des blocs du lissage exponentiel (bornée pour que (1 - alpha)^-k reste représentable)
+_SMOOTHING_BLOCK = 64
+
+
+def sma_series(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Calculer la SMA de chaque bougie
+
+    Args:
+        values: Prix (clôtures) dans l'ordre chronologique
+        period: Période
+
+    Returns:
+        Tableau de même taille (NaN avant la bougie period - 1)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if period < 1 or len(values) < period:
+        return result
+
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    result[period - 1:] = (cumsum[period:] - cumsum[:-period]) / period
+    return result
+
+
+def wilder_smoothing(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Lissage de Wilder: moyenne simple des period premières valeurs, puis
+    avg[i] = (avg[i - 1] * (period - 1) + values[i]) / period
+
+    Filtre exponentiel de poids 1/period (voir exponential_filter).
+
+    Args:
+        values: Valeurs à lisser
+        period: Période
+
+    Returns:
+        Tableau de même taille (NaN avant l'indice period - 1)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    result = np.full(n, np.nan)
+    if period < 1 or n < period:
+        return result
+
+    result[period - 1] = values[:period].mean()
+    if period == 1:
+        result[:] = values
+        return result
+
+    result[period:] = exponential_filter(values[period:], 1.0 / period, result[period - 1])
+    return result
+
+
+def exponential_filter(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    Filtre linéaire du premier ordre: y[i] = (1 - alpha) * y[i - 1] + alpha * values[i]
+
+    La récurrence est résolue par blocs sous forme fermée (somme cumulée
+    pondérée par (1 - alpha)^-k), sans boucle Python par élément.
+
+    Args:
+        values: Entrées du filtre
+        alpha: Poids de l'entrée (0 < alpha < 1)
+        initial: Valeur y[-1] précédant la première entrée
+
+    Returns:
+        Tableau de même taille
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.empty(len(values))
+    decay = 1.0 - alpha
+    powers = decay ** np.arange(_SMOOTHING_BLOCK + 1)
+
+    previous = initial
+    for start in range(0, len(values), _SMOOTHING_BLOCK):
+        block = values[start:start + _SMOOTHING_BLOCK]
+        size = len(block)
+        # y[j] = decay^(j+1) * prev + alpha * sum_k decay^(j-k) * x[k]
+        weighted = np.cumsum(block / powers[:size])
+        filtered = powers[1:size + 1] * previous + alpha * powers[:size] * weighted
+        result[start:start + size] = filtered
+        previous = filtered[-1]
+
+    return result
+
+
+def rsi_series(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Calculer le RSI de Wilder de chaque bougie
+
+    Args:
+        closes: Clôtures dans l'ordre chronologique
+        period: Période
+
+    Returns:
+        Tableau de même taille (NaN avant la bougie period)
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    result = np.full(len(closes), np.nan)
+    if period < 1 or len(closes) < period + 1:
+        return result
+
+    deltas = np.diff(closes)
+    avg_gain = wilder_smoothing(np.clip(deltas, 0, None), period)[period - 1:]
+    avg_loss = wilder_smoothing(-np.clip(deltas, None, 0), period)[period - 1:]
+
+    # Sans perte: 100 s'il y a eu des gains, 0 pour un marché plat
+    flat = np.where(avg_gain > 0, 100.0, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    result[period:] = np.where(avg_loss == 0, flat, rsi)
+    return result
+
+
+def atr_series(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Calculer l'ATR de Wilder de chaque bougie
+
+    Args:
+        high: Plus hauts
+        low: Plus bas
+        close: Clôtures
+        period: Période
+
+    Returns:
+        Tableau de même taille (NaN avant la bougie period)
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    result = np.full(len(close), np.nan)
+    if len(close) < period + 1:
+        return result
+
+    # True range: amplitude élargie à la clôture précédente
+    prev_close = close[:-1]
+    true_range = np.maximum(high[1:], prev_close) - np.minimum(low[1:], prev_close)
+    result[1:] = wilder_smoothing(true_range, period)
+    return result
+
+
+def cluster_levels(levels, tolerance: float) -> list[Dict]:
+    """
+    Regrouper les niveaux proches (balayage des niveaux triés)
+
+    Un niveau rejoint le groupe courant tant qu'il reste à moins de
+    tolerance du plus bas niveau du groupe.
+
+    Args:
+        levels: Prix des pivots
+        tolerance: Écart maximum dans un groupe (en prix)
+
+    Returns:
+        Groupes triés par prix: {price (moyenne), low, high, touches}
+    """
+    clusters = []
+    for level in np.sort(np.asarray(levels, dtype=np.float64)).tolist():
+        if clusters and level - clusters[-1]["low"] <= tolerance:
+            cluster = clusters[-1]
+            cluster["high"] = level
+            cluster["total"] += level
+            cluster["touches"] += 1
+        else:
+            clusters.append({"low": level, "high": level, "total": level, "touches": 1})
+
+    return [
+        {
+            "price": cluster["total"] / cluster["touches"],
+            "low": cluster["low"],
+            "high": cluster["high"],
+            "touches": cluster["touches"],
+        }
+        for cluster in clusters
+    ]
+
+
+def _rsi_value(avg_gain: float, avg_loss: float) -> float:
+    """RSI à partir des moyennes de gains et de pertes"""
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 0.0
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+class OnlineSMA:
+    """SMA mise à jour en O(1) par bougie (somme glissante)"""
+
+    def __init__(self, period: int = SMA_PERIOD, window: Optional[list[float]] = None):
+        """
+        Initialiser la SMA
+
+        Args:
+            period: Période
+            window: Dernières valeurs (état sérialisé)
+        """
+        self.period = period
+        self.window: deque = deque(window or [], maxlen=period)
+        self.total = math.fsum(self.window)
+        self._updates = 0
+
+    @property
+    def value(self) -> Optional[float]:
+        """SMA des period dernières valeurs ou None"""
+        if len(self.window) < self.period:
+            return None
+        return self.total / self.period
+
+    def update(self, value: float) -> Optional[float]:
+        """Ajouter une bougie close"""
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+
+        # Resommer une fois par période borne la dérive de la somme glissante
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self.total = math.fsum(self.window)
+        return self.value
+
+    def peek(self, value: float) -> Optional[float]:
+        """SMA si value était la bougie suivante (sans modifier l'état)"""
+        if len(self.window) < self.period - 1:
+            return None
+        dropped = self.window[0] if len(self.window) == self.period else 0.0
+        return (self.total - dropped + value) / self.period
+
+    def to_dict(self) -> Dict:
+        """État sérialisable"""
+        return {"period": self.period, "window": list(self.window)}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "OnlineSMA":
+        """Restaurer un état sérialisé"""
+        return cls(state["period"], state["window"])
+
+
+class OnlineRSI:
+    """RSI de Wilder mis à jour en O(1) par bougie"""
+
+    def __init__(self, period: int = RSI_PERIOD):
+        """
+        Initialiser le RSI
+
+        Args:
+            period: Période
+        """
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.count = 0  # variations reçues
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _advance(self, close: float) -> tuple[int, float, float]:
+        """Moyennes après une clôture de plus (count, gain, perte)"""
+        delta = close - self.prev_close
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        count = self.count + 1
+
+        # Amorçage: moyenne simple des period premières variations
+        if count <= self.period:
+            return count, self.avg_gain + gain / self.period, self.avg_loss + loss / self.period
+
+        n = self.period
+        return count, (self.avg_gain * (n - 1) + gain) / n, (self.avg_loss * (n - 1) + loss) / n
+
+    @property
+    def value(self) -> Optional[float]:
+        """RSI courant ou None"""
+        if self.count < self.period:
+            return None
+        return _rsi_value(self.avg_gain, self.avg_loss)
+
+    def update(self, close: float) -> Optional[float]:
+        """Ajouter une bougie close"""
+        if self.prev_close is not None:
+            self.count, self.avg_gain, self.avg_loss = self._advance(close)
+        self.prev_close = close
+        return self.value
+
+    def peek(self, close: float) -> Optional[float]:
+        """RSI si close était la bougie suivante (sans modifier l'état)"""
+        if self.prev_close is None:
+            return None
+        count, avg_gain, avg_loss = self._advance(close)
+        if count < self.period:
+            return None
+        return _rsi_value(avg_gain, avg_loss)
+
+    def to_dict(self) -> Dict:
+        """État sérialisable"""
+        return {
+            "period": self.period,
+            "prev_close": self.prev_close,
+            "count": self.count,
+            "avg_gain": self.avg_gain,
+            "avg_loss": self.avg_loss,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "OnlineRSI":
+        """Restaurer un état sérialisé"""
+        rsi = cls(state["period"])
+        rsi.prev_close = state["prev_close"]
+        rsi.count = state["count"]
+        rsi.avg_gain = state["avg_gain"]
+        rsi.avg_loss = state["avg_loss"]
+        return rsi
+
+
+class OnlineHeikenAshi:
+    """Heiken Ashi mis à jour en O(1) (report du HA open/close précédent)"""
+
+    def __init__(self, prev_open: Optional[float] = None, prev_close: Optional[float] = None):
+        """
+        Initialiser le report
+
+        Args:
+            prev_open: HA open de la dernière bougie close
+            prev_close: HA close de la dernière bougie close
+        """
+        self.prev_open = prev_open
+        self.prev_close = prev_close
+
+    def peek(self, open_: float, high: float, low: float, close: float) -> Dict:
+        """Bougie HA de la bougie suivante (sans modifier l'état)"""
+        ha_close = (open_ + high + low + close) / 4
+        if self.prev_open is None:
+            ha_open = (open_ + close) / 2
+        else:
+            ha_open = (self.prev_open + self.prev_close) / 2
+
+        return {
+            "ha_open": ha_open,
+            "ha_high": max(high, ha_open, ha_close),
+            "ha_low": min(low, ha_open, ha_close),
+            "ha_close": ha_close,
+        }
+
+    def update(self, open_: float, high: float, low: float, close: float) -> Dict:
+        """Ajouter une bougie close"""
+        bar = self.peek(open_, high, low, close)
+        self.prev_open = bar["ha_open"]
+        self.prev_close = bar["ha_close"]
+        return bar
+
+    def to_dict(self) -> Dict:
+        """État sérialisable"""
+        return {"prev_open": self.prev_open, "prev_close": self.prev_close}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "OnlineHeikenAshi":
+        """Restaurer un état sérialisé"""
+        return cls(state["prev_open"], state["prev_close"])
+
+
+class OnlineATR:
+    """ATR de Wilder mis à jour en O(1) par bougie"""
+
+    def __init__(self, period: int = 14):
+        """
+        Initialiser l'ATR
+
+        Args:
+            period: Période
+        """
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.count = 0  # true ranges reçus
+        self.atr = 0.0
+
+    @property
+    def value(self) -> Optional[float]:
+        """ATR courant ou None"""
+        return self.atr if self.count >= self.period else None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        """Ajouter une bougie close"""
+        if self.prev_close is not None:
+            true_range = max(high, self.prev_close) - min(low, self.prev_close)
+            self.count += 1
+            if self.count <= self.period:
+                self.atr += true_range / self.period
+            else:
+                self.atr = (self.atr * (self.period - 1) + true_range) / self.period
+        self.prev_close = close
+        return self.value
+
+    def to_dict(self) -> Dict:
+        """État sérialisable"""
+        return {"period": self.period, "prev_close": self.prev_close, "count": self.count, "atr": self.atr}
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "OnlineATR":
+        """Restaurer un état sérialisé"""
+        atr = cls(state["period"])
+        atr.prev_close = state["prev_close"]
+        atr.count = state["count"]
+        atr.atr = state["atr"]
+        return atr
+
+
+class StreamingPivots:
+    """
+    Pivots et niveaux S/R glissants, mis à jour à chaque bougie close
+
+    Le pivot candidat (window bougies avant la dernière) est confirmé ou
+    rejeté dès que ses window voisines de droite sont connues. Les pivots
+    sortis des lookback dernières bougies quittent les listes triées de
+    niveaux, regroupés à la demande comme find_sr_levels.
+    """
+
+    def __init__(self, window: int = 1, lookback: int = 50, atr_factor: float = 0.25, atr_period: int = 14):
+        """
+        Initialiser le détecteur
+
+        Args:
+            window: Bougies comparées de chaque côté du pivot (strict)
+            lookback: Bougies couvertes par les niveaux
+            atr_factor: Fraction de l'ATR utilisée comme tolérance de regroupement
+            atr_period: Période de l'ATR
+        """
+        self.window = window
+        self.lookback = lookback
+        self.atr_factor = atr_factor
+        self.atr = OnlineATR(atr_period)
+
+        self.bars = 0  # bougies reçues
+        self.recent: deque = deque(maxlen=2 * window + 1)  # (high, low)
+        self.peaks: deque = deque()  # (indice, prix)
+        self.troughs: deque = deque()
+        self.resistance_prices: list[float] = []  # triés
+        self.support_prices: list[float] = []
+
+    def update(self, high: float, low: float, close: float) -> list[Dict]:
+        """
+        Ajouter une bougie close
+
+        Args:
+            high: Plus haut
+            low: Plus bas
+            close: Clôture
+
+        Returns:
+            Pivots confirmés par cette bougie {index, price, type}
+        """
+        self.recent.append((high, low))
+        self.atr.update(high, low, close)
+        self.bars += 1
+
+        confirmed = []
+        if len(self.recent) == self.recent.maxlen:
+            w = self.window
+            center = self.bars - 1 - w
+            center_high, center_low = self.recent[w]
+            neighbours = [bar for i, bar in enumerate(self.recent) if i != w]
+
+            if all(center_high > bar_high for bar_high, _ in neighbours):
+                self.peaks.append((center, center_high))
+                insort(self.resistance_prices, center_high)
+                confirmed.append({"index": center, "price": center_high, "type": "high"})
+            if all(center_low < bar_low for _, bar_low in neighbours):
+                self.troughs.append((center, center_low))
+                insort(self.support_prices, center_low)
+                confirmed.append({"index": center, "price": center_low, "type": "low"})
+
+        # Fenêtre glissante: mêmes pivots que find_peaks_and_troughs(lookback)
+        oldest = self.bars - self.lookback + self.window
+        for pivots, prices in ((self.peaks, self.resistance_prices), (self.troughs, self.support_prices)):
+            while pivots and pivots[0][0] < oldest:
+                _, price = pivots.popleft()
+                del prices[bisect_left(prices, price)]
+
+        return confirmed
+
+    def levels(self, tolerance: Optional[float] = None) -> Dict[str, list[Dict]]:
+        """
+        Niveaux S/R regroupés des pivots de la fenêtre
+
+        Args:
+            tolerance: Écart de regroupement (défaut: atr_factor * ATR)
+
+        Returns:
+            Dict {supports, resistances} de groupes triés par prix
+        """
+        if tolerance is None:
+            atr = self.atr.value
+            tolerance = 0.0 if atr is None else atr * self.atr_factor
+        return {
+            "supports": cluster_levels(self.support_prices, tolerance),
+            "resistances": cluster_levels(self.resistance_prices, tolerance),
+        }
+
+    def support_resistance(self, tolerance: Optional[float] = None) -> Tuple[list[float], list[float]]:
+        """Prix des niveaux (supports, résistances), triés par prix croissant"""
+        levels = self.levels(tolerance)
+        return (
+            [cluster["price"] for cluster in levels["supports"]],
+            [cluster["price"] for cluster in levels["resistances"]],
+        )
+
+    def to_dict(self) -> Dict:
+        """État sérialisable"""
+        return {
+            "window": self.window,
+            "lookback": self.lookback,
+            "atr_factor": self.atr_factor,
+            "atr": self.atr.to_dict(),
+            "bars": self.bars,
+            "recent": [list(bar) for bar in self.recent],
+            "peaks": [list(pivot) for pivot in self.peaks],
+            "troughs": [list(pivot) for pivot in self.troughs],
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "StreamingPivots":
+        """Restaurer un état sérialisé"""
+        pivots = cls(state["window"], state["lookback"], state["atr_factor"])
+        pivots.atr = OnlineATR.from_dict(state["atr"])
+        pivots.bars = state["bars"]
+        pivots.recent.extend(tuple(bar) for bar in state["recent"])
+        pivots.peaks.extend(tuple(pivot) for pivot in state["peaks"])
+        pivots.troughs.extend(tuple(pivot) for pivot in state["troughs"])
+        pivots.resistance_prices = sorted(price for _, price in pivots.peaks)
+        pivots.support_prices = sorted(price for _, price in pivots.troughs)
+        return pivots
+
+
+class IndicatorState:
+    """
+    SMA, RSI, Heiken Ashi et pivots S/R incrémentaux d'une paire sur un timeframe
+
+    Seules les bougies closes (toutes sauf la plus récente) font avancer
+    l'état; la bougie en cours est évaluée avec peek() à chaque scan.
+    """
+
+    def __init__(self, sma_period: int = SMA_PERIOD, rsi_period: int = RSI_PERIOD):
+        """
+        Initialiser l'état
+
+        Args:
+            sma_period: Période de la SMA
+            rsi_period: Période du RSI
+        """
+        self.sma_period = sma_period
+        self.rsi_period = rsi_period
+        self.reset()
+
+    def reset(self):
+        """Repartir d'un état vide"""
+        self.sma = OnlineSMA(self.sma_period)
+        self.rsi = OnlineRSI(self.rsi_period)
+        self.ha = OnlineHeikenAshi()
+        self.pivots = StreamingPivots()
+        self.last_timestamp = 0  # dernière bougie close intégrée (epoch)
+
+    def advance(self, series: CandleSeries) -> int:
+        """
+        Intégrer les bougies closes pas encore vues
+
+        L'état repart de zéro si la série ne recouvre plus la dernière
+        bougie intégrée (trou ou historique réécrit).
+
+        Args:
+            series: Bougies chronologiques (la plus récente est en cours)
+
+        Returns:
+            Nombre de bougies intégrées
+        """
+        closed = series[:-1]
+        if not len(closed):
+            return 0
+
+        timestamps = closed.timestamp
+        if self.last_timestamp and (
+            timestamps[0] > self.last_timestamp or self.last_timestamp not in timestamps
+        ):
+            self.reset()
+
+        start = int(np.searchsorted(timestamps, self.last_timestamp, side="right"))
+        for i in range(start, len(closed)):
+            close = float(closed.close[i])
+            self.sma.update(close)
+            self.rsi.update(close)
+            high, low = float(closed.high[i]), float(closed.low[i])
+            self.ha.update(float(closed.open[i]), high, low, close)
+            self.pivots.update(high, low, close)
+
+        self.last_timestamp = int(timestamps[-1])
+        return len(closed) - start
+
+    def snapshot(self, series: CandleSeries) -> Dict:
+        """
+        Valeurs des indicateurs sur la bougie la plus récente
+
+        Args:
+            series: Bougies déjà intégrées avec advance()
+
+        Returns:
+            Dict {sma, rsi, prev_rsi, ha}
+        """
+        bar = series.bar(len(series) - 1)
+        return {
+            "sma": self.sma.peek(bar["close"]),
+            "rsi": self.rsi.peek(bar["close"]),
+            "prev_rsi": self.rsi.value,
+            "ha": self.ha.peek(bar["open"], bar["high"], bar["low"], bar["close"]),
+        }
+
+    def to_dict(self) -> Dict:
+        """État sérialisable (JSON)"""
+        return {
+            "last_timestamp": self.last_timestamp,
+            "sma": self.sma.to_dict(),
+            "rsi": self.rsi.to_dict(),
+            "ha": self.ha.to_dict(),
+            "pivots": self.pivots.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "IndicatorState":
+        """Restaurer un état sérialisé"""
+        indicators = cls(state["sma"]["period"], state["rsi"]["period"])
+        if "pivots" not in state:
+            return indicators  # état antérieur aux pivots: reconstruit au prochain advance()
+
+        indicators.pivots = StreamingPivots.from_dict(state["pivots"])
+        indicators.sma = OnlineSMA.from_dict(state["sma"])
+        indicators.rsi = OnlineRSI.from_dict(state["rsi"])
+        indicators.ha = OnlineHeikenAshi.from_dict(state["ha"])
+        indicators.last_timestamp = state["last_timestamp"]
+        return indicators
@@ -2,12 +2,19 @@
 Scanner principal: logique de détection multi-timeframes
 """
 
+import asyncio
 from typing import Dict, List, Optional, Tuple
 from data.twelvedata_client import TwelveDataClient
 from data.database import Database
+from core.analysis_cache import AnalysisCache
+from core.candles import CandleSeries
+from core.indicators import IndicatorState, rsi_series
 from core.technical import TechnicalAnalyzer
 from core.fibonacci import FibonacciCalculator
 from core.heiken_ashi import HeikenAshiAnalyzer
+from core.swings import ZigZag
+from core.zone_index import ZoneIndex
+from core.zone_tracker import BROKEN, ZoneTracker
 from config.settings import (
     SMA_PERIOD,
     FIBONACCI_ZONE_MIN,
@@ -21,16 +28,33 @@ logger = setup_logger(__name__)
 class ForexScanner:
     """Scanner Forex avec logique Fibonacci multi-timeframes"""
 
-    def __init__(self, api_client: TwelveDataClient, db: Database):
+    def __init__(
+        self,
+        api_client: TwelveDataClient,
+        db: Database,
+        analysis_cache: Optional[AnalysisCache] = None,
+    ):
         """
         Initialiser le scanner
         
         Args:
             api_client: Client Twelve Data
             db: Base de données
+            analysis_cache: Cache des analyses par bougie (partagé si fourni)
         """
         self.api_client = api_client
         self.db = db
+        self.analysis_cache = analysis_cache or AnalysisCache()
+
+        # Zones Fibonacci du dernier scan H1, par paire (flux de prix)
+        self.zones: dict[str, Dict] = {}
+        self.zone_index = ZoneIndex()
+
+        # Cycle de vie des zones (table active_zones), ancrages recalculés sur nouveau swing
+        self.zone_tracker = ZoneTracker(db)
+
+        # Indicateurs incrémentaux par (paire, timeframe), persistés en base
+        self.indicators: dict[tuple[str, str], IndicatorState] = {}
 
     def scan_daily_w1_d1(self, pairs: list[str]) -> dict[str, str]:
         """
@@ -42,38 +66,167 @@ class ForexScanner:
         Returns:
             Dict {paire: tendance}
         """
-        aligned_pairs = {}
         logger.info(f"Scan quotidien W1+D1 pour {len(pairs)} paires...")
+        store = self.api_client.candle_store
+
+        if store is None:
+            # Récupérer W1 et D1 par lots (une requête pour plusieurs paires)
+            w1_batch = self.api_client.get_candles_batch(pairs, "1week", 200)
+            d1_batch = self.api_client.get_candles_batch(pairs, "1day", 200)
+            return self._classify_pairs(pairs, w1_batch, d1_batch)
+
+        # Compléter l'historique H1 puis agréger W1/D1 localement
+        self.api_client.get_candles_batch(pairs, "1h", 100)
+        w1_batch = self._get_resampled_batch(pairs, "1week")
+        d1_batch = self._get_resampled_batch(pairs, "1day")
+
+        # Backfill API pour les paires dont l'historique local est trop court
+        for interval, batch in (("1week", w1_batch), ("1day", d1_batch)):
+            missing = self._missing_history(batch)
+            if missing:
+                logger.info(f"Backfill {interval} via l'API: {', '.join(missing)}")
+                batch.update(self.api_client.get_candles_batch(missing, interval, 200))
+
+        return self._classify_pairs(pairs, w1_batch, d1_batch)
+
+    async def scan_daily_w1_d1_async(self, pairs: list[str]) -> dict[str, str]:
+        """Version async de scan_daily_w1_d1 (requêtes envoyées en parallèle)"""
+        logger.info(f"Scan quotidien W1+D1 pour {len(pairs)} paires...")
+        store = self.api_client.candle_store
+
+        if store is None:
+            w1_batch, d1_batch = await asyncio.gather(
+                self.api_client.get_candles_batch_async(pairs, "1week", 200),
+                self.api_client.get_candles_batch_async(pairs, "1day", 200),
+            )
+            return self._classify_pairs(pairs, w1_batch, d1_batch)
+
+        await self.api_client.get_candles_batch_async(pairs, "1h", 100)
+        w1_batch = self._get_resampled_batch(pairs, "1week")
+        d1_batch = self._get_resampled_batch(pairs, "1day")
+
+        w1_missing = self._missing_history(w1_batch)
+        d1_missing = self._missing_history(d1_batch)
+        if w1_missing or d1_missing:
+            logger.info(f"Backfill W1/D1 via l'API: {', '.join(sorted(set(w1_missing + d1_missing)))}")
+            w1_backfill, d1_backfill = await asyncio.gather(
+                self.api_client.get_candles_batch_async(w1_missing, "1week", 200),
+                self.api_client.get_candles_batch_async(d1_missing, "1day", 200),
+            )
+            w1_batch.update(w1_backfill)
+            d1_batch.update(d1_backfill)
+
+        return self._classify_pairs(pairs, w1_batch, d1_batch)
+
+    def _update_indicators(self, symbol: str, interval: str, candles: CandleSeries) -> Optional[Dict]:
+        """
+        Faire avancer les indicateurs incrémentaux et évaluer la bougie en cours
+        
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            candles: Bougies chronologiques (la plus récente est en cours)
+            
+        Returns:
+            Dict {sma, rsi, prev_rsi, ha} ou None sans horodatages
+        """
+        if not len(candles) or not candles.timestamp[-1]:
+            return None
+
+        key = (symbol, interval)
+        state = self.indicators.get(key)
+        if state is None:
+            saved = self.db.get_indicator_state(symbol, interval) if self.db is not None else None
+            state = IndicatorState.from_dict(saved) if saved else IndicatorState()
+            self.indicators[key] = state
+
+        if state.advance(candles) and self.db is not None:
+            self.db.save_indicator_state(symbol, interval, state.to_dict())
+        return state.snapshot(candles)
+
+    def _current_sma(self, symbol: str, interval: str, candles: CandleSeries) -> Optional[float]:
+        """SMA200 de la bougie en cours"""
+        indicators = self._update_indicators(symbol, interval, candles)
+        if indicators is not None and indicators["sma"] is not None:
+            return indicators["sma"]
+        return TechnicalAnalyzer.calculate_sma(candles, SMA_PERIOD)
+
+    def daily_scan_intervals(self, pairs: list[str]) -> dict[str, list[str]]:
+        """
+        Timeframes que le scan quotidien demandera à l'API, par paire (budget)
+        
+        Args:
+            pairs: Liste des paires
+            
+        Returns:
+            Dict {paire: timeframes}
+        """
+        store = self.api_client.candle_store
+        if store is None:
+            return {symbol: ["1week", "1day"] for symbol in pairs}
+
+        intervals = {symbol: ["1h"] for symbol in pairs}
+        for interval in ("1week", "1day"):
+            for symbol in self._missing_history(self._get_resampled_batch(pairs, interval)):
+                intervals[symbol].append(interval)
+        return intervals
+
+    def _get_resampled_batch(self, pairs: list[str], interval: str) -> dict[str, list[Dict]]:
+        """Bougies W1/D1 agrégées depuis l'historique H1 local, par paire"""
+        store = self.api_client.candle_store
+        return {symbol: store.get_resampled_candles(symbol, interval, 200) for symbol in pairs}
+
+    @staticmethod
+    def _missing_history(batch: dict[str, Optional[list[Dict]]]) -> list[str]:
+        """Paires dont l'historique est trop court pour la SMA200"""
+        return [symbol for symbol, values in batch.items() if len(values or []) < SMA_PERIOD]
+
+    def _classify_pairs(
+        self,
+        pairs: list[str],
+        w1_batch: dict[str, Optional[list[Dict]]],
+        d1_batch: dict[str, Optional[list[Dict]]],
+    ) -> dict[str, str]:
+        """
+        Classifier les paires à partir des bougies W1 et D1 récupérées
+        
+        Args:
+            pairs: Liste des paires
+            w1_batch: Bougies W1 par paire
+            d1_batch: Bougies D1 par paire
+            
+        Returns:
+            Dict {paire: tendance}
+        """
+        aligned_pairs = {}
 
         for symbol in pairs:
             try:
-                # Récupérer W1
-                w1_data = self.api_client.get_weekly_candles(symbol)
+                w1_data = w1_batch.get(symbol)
                 if not w1_data:
                     logger.warning(f"Pas de données W1 pour {symbol}")
                     continue
 
-                # Récupérer D1
-                d1_data = self.api_client.get_daily_candles(symbol)
+                d1_data = d1_batch.get(symbol)
                 if not d1_data:
                     logger.warning(f"Pas de données D1 pour {symbol}")
                     continue
 
                 # Convertir en format standard
-                w1_candles = self._convert_candles(w1_data)
-                d1_candles = self._convert_candles(d1_data)
+                w1_candles = self._convert_candles(w1_data, "1week")
+                d1_candles = self._convert_candles(d1_data, "1day")
 
-                # Calculer SMA200
-                w1_sma = TechnicalAnalyzer.calculate_sma(w1_candles, SMA_PERIOD)
-                d1_sma = TechnicalAnalyzer.calculate_sma(d1_candles, SMA_PERIOD)
+                # SMA200 incrémentale (calcul complet si l'état n'est pas exploitable)
+                w1_sma = self._current_sma(symbol, "1week", w1_candles)
+                d1_sma = self._current_sma(symbol, "1day", d1_candles)
 
                 if not w1_sma or not d1_sma:
                     logger.warning(f"SMA non calculable pour {symbol}")
                     continue
 
                 # Récupérer les prix actuels
-                w1_price = float(w1_candles[-1].get("close", 0))
-                d1_price = float(d1_candles[-1].get("close", 0))
+                w1_price = float(w1_candles.close[-1])
+                d1_price = float(d1_candles.close[-1])
 
                 # Déterminer la tendance
                 w1_trend = TechnicalAnalyzer.determine_trend(w1_price, w1_sma)
@@ -120,22 +273,71 @@ class ForexScanner:
         try:
             # Récupérer les bougies H1
             h1_data = self.api_client.get_hourly_candles(symbol)
+        except Exception as e:
+            logger.error(f"Erreur scan H1 {symbol}: {e}")
+            return None
+
+        return self._analyze_hourly(symbol, trend, h1_data)
+
+    async def scan_hourly_for_signals_async(
+        self,
+        symbol: str,
+        trend: str,
+    ) -> Optional[Dict]:
+        """Version async de scan_hourly_for_signals"""
+        try:
+            h1_data = await self.api_client.get_hourly_candles_async(symbol)
+        except Exception as e:
+            logger.error(f"Erreur scan H1 {symbol}: {e}")
+            return None
+
+        return self._analyze_hourly(symbol, trend, h1_data)
+
+    def _analyze_hourly(
+        self,
+        symbol: str,
+        trend: str,
+        h1_data: Optional[list[Dict]],
+    ) -> Optional[Dict]:
+        """
+        Analyser les bougies H1 récupérées pour détecter un signal
+        
+        Args:
+            symbol: Paire
+            trend: Tendance (BULLISH/BEARISH)
+            h1_data: Bougies H1 brutes de l'API
+            
+        Returns:
+            Signal détecté ou None
+        """
+        # Les zones du scan précédent ne sont plus valides
+        self.drop_zones(symbol)
+
+        try:
             if not h1_data:
                 logger.warning(f"Pas de données H1 pour {symbol}")
                 return None
 
-            h1_candles = self._convert_candles(h1_data)
+            h1_candles = self._convert_candles(h1_data, "1h")
 
-            # Convertir en Heiken Ashi
-            ha_candles = HeikenAshiAnalyzer.convert_to_heiken_ashi(h1_candles)
+            # Bougie Heiken Ashi en cours (report incrémental du HA open)
+            indicators = self._update_indicators(symbol, "1h", h1_candles)
+            if indicators is not None:
+                ha_candle = indicators["ha"]
+            else:
+                ha_candles = self.analysis_cache.get_or_compute(
+                    symbol, "1h", h1_candles, "heiken_ashi",
+                    lambda: HeikenAshiAnalyzer.convert_to_heiken_ashi(h1_candles),
+                )
+                ha_candle = ha_candles[-1]
 
             # Récupérer le prix actuel
-            current_price = float(h1_candles[-1].get("close", 0))
+            current_price = float(h1_candles.close[-1])
 
             if trend == "BULLISH":
-                return self._detect_bullish_signal(symbol, h1_candles, ha_candles, current_price)
+                return self._detect_bullish_signal(symbol, h1_candles, ha_candle, current_price)
             elif trend == "BEARISH":
-                return self._detect_bearish_signal(symbol, h1_candles, ha_candles, current_price)
+                return self._detect_bearish_signal(symbol, h1_candles, ha_candle, current_price)
 
         except Exception as e:
             logger.error(f"Erreur scan H1 {symbol}: {e}")
@@ -145,83 +347,98 @@ class ForexScanner:
     def _detect_bullish_signal(
         self,
         symbol: str,
-        h1_candles: list[Dict],
-        ha_candles: list[Dict],
+        h1_candles: CandleSeries,
+        ha_candle: Dict,
         current_price: float,
     ) -> Optional[Dict]:
         """Détecter un signal haussier avec jusqu'à 4 Fibonacci"""
         # Calculer jusqu'à 4 Fibonacci
-        fibs = FibonacciCalculator.calculate_multiple_fibonacci(h1_candles, mode="bullish", max_count=4)
+        fibs = self._fibonacci(symbol, h1_candles, "bullish")
 
         if not fibs:
             return None
 
+        # Zones gardées pour le flux de prix (évaluées entre deux scans H1)
+        ha_confirmed = HeikenAshiAnalyzer.is_bullish(ha_candle)
+        self._cache_zones(symbol, "bullish", fibs, h1_candles, ha_confirmed)
+
         # Vérifier si le prix est dans la zone GA d'un des Fibonacci
         price_in_zone = FibonacciCalculator.check_price_in_any_zone(current_price, fibs)
         if not price_in_zone:
             return None
 
         # Vérifier la confirmation Heiken Ashi
-        if not HeikenAshiAnalyzer.is_bullish(ha_candles[-1]):
+        if not ha_confirmed:
             return None
 
-        # Calculer les bonus
-        rsi_div = TechnicalAnalyzer.detect_rsi_divergence(h1_candles, "bullish")
-        supports, resistances = TechnicalAnalyzer.find_support_resistance(h1_candles)
-        sr_confluence = TechnicalAnalyzer.check_sr_confluence(current_price, supports, resistances)
-
-        fib_info = price_in_zone.get("fib", {})
-        zone_min = price_in_zone.get("zone_min", 0)
-        zone_max = price_in_zone.get("zone_max", 0)
-
-        return {
-            "symbol": symbol,
-            "signal_type": "bullish",
-            "price": current_price,
-            "fib_index": price_in_zone.get("fib_index"),
-            "fib_zone": f"{zone_min:.5f} - {zone_max:.5f}",
-            "fib_count": len(fibs),
-            "rsi_divergence": rsi_div,
-            "sr_confluence": sr_confluence,
-            "fibs": fibs,
-        }
+        self.zones[symbol]["notified"].add(price_in_zone["fib_index"])
+        return self._build_signal(symbol, "bullish", current_price, price_in_zone, fibs, h1_candles)
 
     def _detect_bearish_signal(
         self,
         symbol: str,
-        h1_candles: list[Dict],
-        ha_candles: list[Dict],
+        h1_candles: CandleSeries,
+        ha_candle: Dict,
         current_price: float,
     ) -> Optional[Dict]:
         """Détecter un signal baissier avec jusqu'à 4 Fibonacci"""
         # Calculer jusqu'à 4 Fibonacci
-        fibs = FibonacciCalculator.calculate_multiple_fibonacci(h1_candles, mode="bearish", max_count=4)
+        fibs = self._fibonacci(symbol, h1_candles, "bearish")
 
         if not fibs:
             return None
 
+        # Zones gardées pour le flux de prix (évaluées entre deux scans H1)
+        ha_confirmed = HeikenAshiAnalyzer.is_bearish(ha_candle)
+        self._cache_zones(symbol, "bearish", fibs, h1_candles, ha_confirmed)
+
         # Vérifier si le prix est dans la zone GA d'un des Fibonacci
         price_in_zone = FibonacciCalculator.check_price_in_any_zone(current_price, fibs)
         if not price_in_zone:
             return None
 
         # Vérifier la confirmation Heiken Ashi
-        if not HeikenAshiAnalyzer.is_bearish(ha_candles[-1]):
+        if not ha_confirmed:
             return None
 
-        # Calculer les bonus
-        rsi_div = TechnicalAnalyzer.detect_rsi_divergence(h1_candles, "bearish")
-        supports, resistances = TechnicalAnalyzer.find_support_resistance(h1_candles)
-        sr_confluence = TechnicalAnalyzer.check_sr_confluence(current_price, supports, resistances)
+        self.zones[symbol]["notified"].add(price_in_zone["fib_index"])
+        return self._build_signal(symbol, "bearish", current_price, price_in_zone, fibs, h1_candles)
+
+    def _build_signal(
+        self,
+        symbol: str,
+        signal_type: str,
+        price: float,
+        price_in_zone: Dict,
+        fibs: list[Dict],
+        h1_candles: CandleSeries,
+    ) -> Dict:
+        """
+        Construire un signal (bonus RSI et S/R compris)
+        
+        Args:
+            symbol: Paire
+            signal_type: bullish ou bearish
+            price: Prix dans la zone
+            price_in_zone: Résultat de check_price_in_any_zone
+            fibs: Fibonacci tracés
+            h1_candles: Bougies H1 closes
+            
+        Returns:
+            Signal
+        """
+        # Calculer les bonus (une seule fois par bougie, ticks compris)
+        rsi_div = self._rsi_divergence(symbol, h1_candles, signal_type)
+        supports, resistances = self._support_resistance(symbol, h1_candles)
+        sr_confluence = TechnicalAnalyzer.check_sr_confluence(price, supports, resistances)
 
-        fib_info = price_in_zone.get("fib", {})
         zone_min = price_in_zone.get("zone_min", 0)
         zone_max = price_in_zone.get("zone_max", 0)
 
         return {
             "symbol": symbol,
-            "signal_type": "bearish",
-            "price": current_price,
+            "signal_type": signal_type,
+            "price": price,
             "fib_index": price_in_zone.get("fib_index"),
             "fib_zone": f"{zone_min:.5f} - {zone_max:.5f}",
             "fib_count": len(fibs),
@@ -230,17 +447,195 @@ class ForexScanner:
             "fibs": fibs,
         }
 
-    @staticmethod
-    def _convert_candles(data: list[Dict]) -> list[Dict]:
-        """Convertir les données API en format standard"""
-        return [
-            {
-                "timestamp": item.get("datetime"),
-                "open": float(item.get("open", 0)),
-                "high": float(item.get("high", 0)),
-                "low": float(item.get("low", 0)),
-                "close": float(item.get("close", 0)),
-                "volume": int(item.get("volume", 0)) if item.get("volume") else 0,
-            }
-            for item in data
+    def _support_resistance(self, symbol: str, h1_candles: CandleSeries) -> Tuple[list[float], list[float]]:
+        """
+        Niveaux S/R H1: pivots incrémentaux si l'état est à jour, sinon recalcul
+        
+        Args:
+            symbol: Paire
+            h1_candles: Bougies H1 (la plus récente est en cours)
+            
+        Returns:
+            Tuple (supports, resistances) triés par prix croissant
+        """
+        state = self.indicators.get((symbol, "1h"))
+        if (
+            state is not None
+            and len(h1_candles) > 1
+            and state.last_timestamp == int(h1_candles.timestamp[-2])
+            and state.pivots.bars >= state.pivots.lookback
+        ):
+            return state.pivots.support_resistance()
+
+        return self.analysis_cache.get_or_compute(
+            symbol, "1h", h1_candles, "support_resistance",
+            lambda: TechnicalAnalyzer.find_support_resistance(h1_candles, pivots=self._pivots(symbol, h1_candles)),
+        )
+
+    def _pivots(self, symbol: str, h1_candles: CandleSeries, lookback: int = 50) -> Tuple[list[int], list[int]]:
+        """Sommets et creux des dernières bougies H1 (partagés Fibonacci / S/R)"""
+        return self.analysis_cache.get_or_compute(
+            symbol, "1h", h1_candles, "pivots",
+            lambda: FibonacciCalculator.find_peaks_and_troughs(h1_candles, lookback),
+            lookback=lookback,
+        )
+
+    def _rsi(self, symbol: str, h1_candles: CandleSeries, period: int = 14):
+        """Série RSI H1 (partagée par les divergences haussières et baissières)"""
+        return self.analysis_cache.get_or_compute(
+            symbol, "1h", h1_candles, "rsi",
+            lambda: rsi_series(h1_candles.close, period),
+            period=period,
+        )
+
+    def _rsi_divergence(self, symbol: str, h1_candles: CandleSeries, signal_type: str) -> bool:
+        """Divergence RSI récente, à partir du RSI et des pivots de tout l'historique en cache"""
+        def compute() -> bool:
+            peaks, troughs = self._pivots(symbol, h1_candles, lookback=len(h1_candles))
+            return TechnicalAnalyzer.detect_rsi_divergence(
+                h1_candles, signal_type,
+                rsi=self._rsi(symbol, h1_candles), peaks=peaks, troughs=troughs,
+            )
+
+        return self.analysis_cache.get_or_compute(
+            symbol, "1h", h1_candles, "rsi_divergence", compute,
+            signal_type=signal_type,
+        )
+
+    def _swings(self, symbol: str, h1_candles: CandleSeries) -> list[Dict]:
+        """Swings ZigZag H1 (sommets et creux alternés, seuil en ATR)"""
+        return self.analysis_cache.get_or_compute(
+            symbol, "1h", h1_candles, "swings",
+            lambda: ZigZag.from_series(h1_candles).swings(),
+        )
+
+    def _fibonacci(self, symbol: str, h1_candles: CandleSeries, mode: str) -> list[Dict]:
+        """Jusqu'à 4 Fibonacci ancrés sur les swings ZigZag (zones cassées exclues)"""
+        swings = self._swings(symbol, h1_candles)
+        fibs = self.zone_tracker.update(
+            symbol, mode, h1_candles, swings,
+            lambda: self.analysis_cache.get_or_compute(
+                symbol, "1h", h1_candles, "fibonacci",
+                lambda: FibonacciCalculator.calculate_multiple_fibonacci(
+                    h1_candles, mode=mode, max_count=4, swings=swings
+                ),
+                mode=mode,
+            ),
+        )
+        # Une zone cassée ne signale plus (ni scan H1, ni index des ticks)
+        return [fib for fib in fibs if fib.get("status") != BROKEN]
+
+    def _cache_zones(
+        self,
+        symbol: str,
+        signal_type: str,
+        fibs: list[Dict],
+        h1_candles: CandleSeries,
+        ha_confirmed: bool,
+    ):
+        """Garder les zones du dernier scan H1 pour les ticks du flux de prix"""
+        self.zones[symbol] = {
+            "signal_type": signal_type,
+            "fibs": fibs,
+            "h1_candles": h1_candles,
+            "ha_confirmed": ha_confirmed,
+            "notified": set(),
+        }
+
+        # Valables jusqu'à la fin de la bougie suivant le prochain scan H1
+        expires_at = int(h1_candles.timestamp[-1]) + 2 * 3600 if len(h1_candles) and h1_candles.timestamp[-1] else None
+        self.zone_index.replace(
+            symbol,
+            [(fib.get("index"), fib.get("zone_min", 0), fib.get("zone_max", 0), fib) for fib in fibs],
+            expires_at,
+        )
+
+    def drop_zones(self, symbol: str):
+        """Oublier les zones en cache d'une paire"""
+        self.zones.pop(symbol, None)
+        self.zone_index.remove(symbol)
+
+    def check_tick(self, symbol: str, price: float, now: Optional[int] = None) -> Optional[Dict]:
+        """
+        Évaluer un prix du flux temps réel contre les zones en cache
+        
+        Un même Fibonacci ne déclenche qu'un signal tant que le prix
+        reste dans sa zone; il peut redéclencher après en être sorti.
+        
+        Args:
+            symbol: Paire
+            price: Dernier prix
+            now: Timestamp UNIX du prix (expiration des zones)
+            
+        Returns:
+            Signal détecté ou None
+        """
+        return self.check_ticks({symbol: price}, now).get(symbol)
+
+    def check_ticks(self, prices: dict[str, float], now: Optional[int] = None) -> dict[str, Dict]:
+        """
+        Évaluer les prix de plusieurs paires contre les zones en cache
+        
+        Un prix seul est cherché par dichotomie dans l'index des zones
+        (ZoneIndex); plusieurs paires (cotations rattrapées après un scan)
+        sont évaluées en un seul masque NumPy sur les zones indexées.
+        
+        Args:
+            prices: Dernier prix par paire
+            now: Timestamp UNIX des prix (expiration des zones)
+            
+        Returns:
+            Dict {paire: signal} des paires qui déclenchent un signal
+        """
+        if now is not None:
+            self.zone_index.expire(now)
+
+        symbols = [
+            symbol for symbol in prices
+            if symbol in self.zones and self.zones[symbol]["ha_confirmed"]
         ]
+        if len(symbols) > 1:
+            hits = FibonacciCalculator.check_prices_in_zones(
+                {symbol: prices[symbol] for symbol in symbols},
+                {symbol: [zone["data"] for zone in self.zone_index.zones(symbol)] for symbol in symbols},
+            )
+        else:
+            hits = {symbol: self._zone_hit(symbol, prices[symbol]) for symbol in symbols}
+
+        signals = {}
+        for symbol in symbols:
+            setup = self.zones[symbol]
+            price = prices[symbol]
+            price_in_zone = hits.get(symbol)
+            if not price_in_zone:
+                setup["notified"].clear()
+                continue
+
+            if price_in_zone["fib_index"] in setup["notified"]:
+                continue
+            setup["notified"].add(price_in_zone["fib_index"])
+
+            logger.info(f"Signal intrabar {symbol} à {price:.5f}")
+            signals[symbol] = self._build_signal(
+                symbol, setup["signal_type"], price, price_in_zone, setup["fibs"], setup["h1_candles"]
+            )
+        return signals
+
+    def _zone_hit(self, symbol: str, price: float) -> Optional[Dict]:
+        """Premier Fibonacci indexé contenant le prix, comme check_price_in_any_zone"""
+        containing = self.zone_index.containing(symbol, price)
+        if not containing:
+            return None
+        zone = containing[0]
+        return {
+            "in_zone": True,
+            "fib_index": zone["key"],
+            "zone_min": zone["low"],
+            "zone_max": zone["high"],
+            "fib": zone["data"],
+        }
+
+    @staticmethod
+    def _convert_candles(data: list[Dict], interval: Optional[str] = None) -> CandleSeries:
+        """Convertir les données API en série chronologique (la plus récente en dernier)"""
+        return CandleSeries.from_values(data, interval)
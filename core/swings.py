@@ -0,0 +1,165 @@
+"""
+Moteur de swings ZigZag: sommets et creux alternés confirmés par un retournement
+"""
+
+from typing import Dict, Optional, Union
+import numpy as np
+from config.settings import SWING_REVERSAL_ATR, SWING_REVERSAL_PCT
+from core.candles import CandleSeries, as_series
+from core.indicators import atr_series
+
+HIGH = "high"
+LOW = "low"
+
+
+class ZigZag:
+    """
+    ZigZag en une passe, extensible bougie par bougie
+
+    Seul l'extrême de la jambe en cours est gardé (pile monotone de
+    profondeur un): un nouvel extrême le remplace, un retournement d'au
+    moins le seuil le confirme comme swing et ouvre la jambe inverse.
+    Le seuil vaut reversal_atr * ATR de la bougie si l'ATR est fourni,
+    sinon reversal_pct % du prix de l'extrême.
+    """
+
+    def __init__(self, reversal_pct: float = SWING_REVERSAL_PCT, reversal_atr: Optional[float] = None):
+        """
+        Initialiser le moteur
+
+        Args:
+            reversal_pct: Retournement minimum en pourcentage du prix
+            reversal_atr: Retournement minimum en multiple d'ATR (prioritaire si l'ATR est connu)
+        """
+        self.reversal_pct = reversal_pct
+        self.reversal_atr = reversal_atr
+
+        self.confirmed: list[Dict] = []
+        self.bars = 0  # bougies traitées
+        self.direction = 0  # 1: jambe haussière, -1: baissière, 0: indéterminée
+        self.extreme: Optional[Dict] = None
+
+        # Avant la première jambe: plus haut et plus bas depuis le début
+        self._first_high: Optional[Dict] = None
+        self._first_low: Optional[Dict] = None
+
+    def _threshold(self, price: float, atr: Optional[float]) -> float:
+        """Retournement minimum en prix"""
+        if self.reversal_atr is not None and atr is not None and not np.isnan(atr):
+            return self.reversal_atr * atr
+        return price * self.reversal_pct / 100
+
+    def _confirm(self, swing: Dict, direction: int, extreme: Dict) -> Dict:
+        """Confirmer un swing et ouvrir la jambe suivante"""
+        self.confirmed.append(swing)
+        self.direction = direction
+        self.extreme = extreme
+        return swing
+
+    def update(self, high: float, low: float, atr: Optional[float] = None) -> Optional[Dict]:
+        """
+        Traiter la bougie suivante
+
+        Args:
+            high: Plus haut de la bougie
+            low: Plus bas de la bougie
+            atr: ATR de la bougie (seuil en ATR)
+
+        Returns:
+            Swing confirmé par cette bougie ou None
+        """
+        index = self.bars
+        self.bars += 1
+        bar_high = {"index": index, "price": high, "type": HIGH}
+        bar_low = {"index": index, "price": low, "type": LOW}
+
+        if self.direction == 0:
+            if self._first_high is None or high > self._first_high["price"]:
+                self._first_high = bar_high
+            if self._first_low is None or low < self._first_low["price"]:
+                self._first_low = bar_low
+
+            first_high, first_low = self._first_high, self._first_low
+            if first_low["index"] < index and high - first_low["price"] >= self._threshold(first_low["price"], atr):
+                return self._confirm(first_low, 1, bar_high)
+            if first_high["index"] < index and first_high["price"] - low >= self._threshold(first_high["price"], atr):
+                return self._confirm(first_high, -1, bar_low)
+            return None
+
+        if self.direction == 1:
+            if high > self.extreme["price"]:
+                self.extreme = bar_high
+            elif self.extreme["price"] - low >= self._threshold(self.extreme["price"], atr):
+                return self._confirm(self.extreme, -1, bar_low)
+            return None
+
+        if low < self.extreme["price"]:
+            self.extreme = bar_low
+        elif high - self.extreme["price"] >= self._threshold(self.extreme["price"], atr):
+            return self._confirm(self.extreme, 1, bar_high)
+        return None
+
+    def extend(self, candles: Union[CandleSeries, list[Dict]], atr: Optional[np.ndarray] = None) -> int:
+        """
+        Traiter les bougies de la série pas encore vues
+
+        Args:
+            candles: Série complète (les bougies déjà traitées sont ignorées)
+            atr: Série ATR alignée sur candles (seuil en ATR)
+
+        Returns:
+            Nombre de swings confirmés
+        """
+        series = as_series(candles)
+        before = len(self.confirmed)
+        highs = series.high.tolist()
+        lows = series.low.tolist()
+        atrs = atr.tolist() if atr is not None else None
+
+        for i in range(self.bars, len(series)):
+            self.update(highs[i], lows[i], atrs[i] if atrs is not None else None)
+        return len(self.confirmed) - before
+
+    def swings(self, include_pending: bool = True) -> list[Dict]:
+        """
+        Swings alternés, du plus ancien au plus récent
+
+        Args:
+            include_pending: Ajouter l'extrême de la jambe en cours (non confirmé)
+
+        Returns:
+            Liste de {index, price, type, confirmed}
+        """
+        swings = [{**swing, "confirmed": True} for swing in self.confirmed]
+        if include_pending and self.extreme is not None:
+            swings.append({**self.extreme, "confirmed": False})
+        return swings
+
+    @classmethod
+    def from_series(
+        cls,
+        candles: Union[CandleSeries, list[Dict]],
+        reversal_pct: float = SWING_REVERSAL_PCT,
+        reversal_atr: Optional[float] = SWING_REVERSAL_ATR,
+        atr_period: int = 14,
+    ) -> "ZigZag":
+        """
+        Construire le ZigZag d'une série complète
+
+        Args:
+            candles: Bougies chronologiques
+            reversal_pct: Retournement minimum en pourcentage (sans ATR)
+            reversal_atr: Retournement minimum en multiple d'ATR (None: pourcentage seul)
+            atr_period: Période de l'ATR
+
+        Returns:
+            ZigZag à jour sur la série
+        """
+        series = as_series(candles)
+        atr = None
+        if reversal_atr is not None:
+            atr = atr_series(series.high, series.low, series.close, atr_period)
+
+        zigzag = cls(reversal_pct, reversal_atr)
+        zigzag.extend(series, atr)
+        return zigzag
@@ -2,7 +2,12 @@
 Calculs techniques: SMA, RSI, Support/Résistance
 """
 
-from typing import Dict, List, Tuple, Optional
+from bisect import bisect_left
+from typing import Dict, List, Tuple, Optional, Union
+import numpy as np
+from core.candles import CandleSeries, as_series
+from core.fibonacci import FibonacciCalculator
+from core.indicators import atr_series, cluster_levels, rsi_series
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -12,7 +17,7 @@ class TechnicalAnalyzer:
     """Analyse technique"""
 
     @staticmethod
-    def calculate_sma(candles: list[Dict], period: int) -> Optional[float]:
+    def calculate_sma(candles: Union[CandleSeries, list[Dict]], period: int) -> Optional[float]:
         """
         Calculer la SMA (Simple Moving Average)
         
@@ -26,14 +31,14 @@ class TechnicalAnalyzer:
         if len(candles) < period:
             return None
 
-        closes = [float(c.get("close", 0)) for c in candles[-period:]]
-        sma = sum(closes) / period
+        closes = as_series(candles).close[-period:]
+        sma = float(closes.sum()) / period
 
         logger.debug(f"SMA{period} calculée: {sma}")
         return sma
 
     @staticmethod
-    def calculate_rsi(candles: list[Dict], period: int = 14) -> Optional[float]:
+    def calculate_rsi(candles: Union[CandleSeries, list[Dict]], period: int = 14) -> Optional[float]:
         """
         Calculer le RSI (Relative Strength Index)
         
@@ -47,37 +52,101 @@ class TechnicalAnalyzer:
         if len(candles) < period + 1:
             return None
 
-        closes = [float(c.get("close", 0)) for c in candles]
-        deltas = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
+        # Lissage de Wilder sur tout l'historique disponible
+        rsi = float(rsi_series(as_series(candles).close, period)[-1])
 
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
+        logger.debug(f"RSI{period} calculée: {rsi}")
+        return rsi
 
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
+    @staticmethod
+    def find_rsi_divergences(
+        candles: Union[CandleSeries, list[Dict]],
+        rsi: Optional[np.ndarray] = None,
+        peaks: Optional[list[int]] = None,
+        troughs: Optional[list[int]] = None,
+        period: int = 14,
+        max_distance: int = 60,
+    ) -> list[Dict]:
+        """
+        Trouver toutes les divergences RSI entre pivots consécutifs
+        
+        Classique haussière: creux plus bas, RSI plus haut. Cachée haussière:
+        creux plus haut, RSI plus bas. Symétrique sur les sommets pour les
+        divergences baissières. Une seule passe vectorisée sur les pivots.
+        
+        Args:
+            candles: Liste des bougies
+            rsi: Série RSI déjà calculée (défaut: rsi_series des clôtures)
+            peaks: Indices des sommets (défaut: find_peaks_and_troughs sur tout l'historique)
+            troughs: Indices des creux
+            period: Période RSI (si rsi n'est pas fourni)
+            max_distance: Écart maximum en bougies entre les deux pivots
+            
+        Returns:
+            Divergences triées par pivot final: {type, kind, start, end,
+            price_start, price_end, rsi_start, rsi_end}
+        """
+        series = as_series(candles)
+        if rsi is None:
+            rsi = rsi_series(series.close, period)
+        if peaks is None or troughs is None:
+            peaks, troughs = FibonacciCalculator.find_peaks_and_troughs(series, lookback=len(series))
 
-        if avg_loss == 0:
-            rsi = 100 if avg_gain > 0 else 0
-        else:
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
+        divergences = []
+        for signal_type, pivots, prices in (("bullish", troughs, series.low), ("bearish", peaks, series.high)):
+            idx = np.asarray(pivots, dtype=np.intp)
+            if len(idx) < 2:
+                continue
 
-        logger.debug(f"RSI{period} calculée: {rsi}")
-        return rsi
+            start, end = idx[:-1], idx[1:]
+            price_delta = prices[end] - prices[start]
+            rsi_delta = rsi[end] - rsi[start]
+            valid = (end - start <= max_distance) & ~np.isnan(rsi_delta)
+
+            # Haussier: prix plus bas et RSI plus haut (classique) ou l'inverse (cachée)
+            sign = 1 if signal_type == "bullish" else -1
+            kinds = (
+                ("regular", valid & (sign * price_delta < 0) & (sign * rsi_delta > 0)),
+                ("hidden", valid & (sign * price_delta > 0) & (sign * rsi_delta < 0)),
+            )
+            for kind, mask in kinds:
+                for i in np.flatnonzero(mask).tolist():
+                    a, b = int(start[i]), int(end[i])
+                    divergences.append({
+                        "type": signal_type,
+                        "kind": kind,
+                        "start": a,
+                        "end": b,
+                        "price_start": float(prices[a]),
+                        "price_end": float(prices[b]),
+                        "rsi_start": float(rsi[a]),
+                        "rsi_end": float(rsi[b]),
+                    })
+
+        divergences.sort(key=lambda divergence: divergence["end"])
+        return divergences
 
     @staticmethod
     def detect_rsi_divergence(
-        candles: list[Dict],
+        candles: Union[CandleSeries, list[Dict]],
         signal_type: str,
         period: int = 14,
+        recent: int = 10,
+        rsi: Optional[np.ndarray] = None,
+        peaks: Optional[list[int]] = None,
+        troughs: Optional[list[int]] = None,
     ) -> bool:
         """
-        Détecter une divergence RSI
+        Détecter une divergence RSI classique récente
         
         Args:
             candles: Liste des bougies
             signal_type: Type de signal (bullish/bearish)
             period: Période RSI
+            recent: Le second pivot doit se trouver dans les recent dernières bougies
+            rsi: Série RSI déjà calculée (voir find_rsi_divergences)
+            peaks: Indices des sommets sur tout l'historique
+            troughs: Indices des creux sur tout l'historique
             
         Returns:
             True si divergence détectée
@@ -85,36 +154,88 @@ class TechnicalAnalyzer:
         if len(candles) < period + 10:
             return False
 
-        # Calculer RSI pour les 10 dernières bougies
-        rsi_values = []
-        for i in range(10):
-            rsi = TechnicalAnalyzer.calculate_rsi(candles[:-10 + i], period)
-            if rsi is not None:
-                rsi_values.append(rsi)
-
-        if len(rsi_values) < 2:
-            return False
+        candles = as_series(candles)
+        divergences = TechnicalAnalyzer.find_rsi_divergences(
+            candles, rsi=rsi, peaks=peaks, troughs=troughs, period=period
+        )
 
-        # Divergence haussière: prix bas mais RSI haut
-        if signal_type == "bullish":
-            prices = [float(c.get("low", 0)) for c in candles[-10:]]
-            if prices[-1] < prices[-2] and rsi_values[-1] > rsi_values[-2]:
-                logger.debug("Divergence RSI haussière détectée")
-                return True
-
-        # Divergence baissière: prix haut mais RSI bas
-        elif signal_type == "bearish":
-            prices = [float(c.get("high", 0)) for c in candles[-10:]]
-            if prices[-1] > prices[-2] and rsi_values[-1] < rsi_values[-2]:
-                logger.debug("Divergence RSI baissière détectée")
+        for divergence in reversed(divergences):
+            if divergence["end"] < len(candles) - recent:
+                break
+            if divergence["type"] == signal_type and divergence["kind"] == "regular":
+                logger.debug(
+                    f"Divergence RSI {'haussière' if signal_type == 'bullish' else 'baissière'} détectée"
+                )
                 return True
 
         return False
 
+    @staticmethod
+    def cluster_levels(levels: list[float], tolerance: float) -> list[Dict]:
+        """
+        Regrouper les niveaux proches (balayage des niveaux triés)
+        
+        Un niveau rejoint le groupe courant tant qu'il reste à moins de
+        tolerance du plus bas niveau du groupe.
+        
+        Args:
+            levels: Prix des pivots
+            tolerance: Écart maximum dans un groupe (en prix)
+            
+        Returns:
+            Groupes triés par prix: {price (moyenne), low, high, touches}
+        """
+        return cluster_levels(levels, tolerance)
+
+    @staticmethod
+    def find_sr_levels(
+        candles: Union[CandleSeries, list[Dict]],
+        lookback: Optional[int] = None,
+        tolerance: Optional[float] = None,
+        atr_factor: float = 0.25,
+        atr_period: int = 14,
+        pivots: Optional[Tuple[list[int], list[int]]] = None,
+    ) -> Dict[str, list[Dict]]:
+        """
+        Construire la table des niveaux de support et résistance
+        
+        Args:
+            candles: Liste des bougies
+            lookback: Nombre de bougies à analyser (défaut: toutes)
+            tolerance: Écart de regroupement en prix (défaut: atr_factor * ATR)
+            atr_factor: Fraction de l'ATR utilisée comme tolérance
+            atr_period: Période de l'ATR
+            pivots: (sommets, creux) déjà calculés, indices dans candles
+            
+        Returns:
+            Dict {supports, resistances} de groupes triés par prix
+        """
+        series = as_series(candles)
+        start = 0 if lookback is None else max(0, len(series) - lookback)
+        if len(series) - start < 3:
+            return {"supports": [], "resistances": []}
+
+        # Points hauts et bas locaux (réutilisés s'ils sont fournis)
+        if pivots is None:
+            pivots = FibonacciCalculator.find_peaks_and_troughs(series, lookback=len(series) - start)
+        peaks = np.asarray(pivots[0], dtype=np.intp)
+        troughs = np.asarray(pivots[1], dtype=np.intp)
+
+        recent = series[start:]
+        if tolerance is None:
+            atr = atr_series(recent.high, recent.low, recent.close, atr_period)[-1]
+            tolerance = 0.0 if np.isnan(atr) else float(atr) * atr_factor
+
+        return {
+            "supports": TechnicalAnalyzer.cluster_levels(series.low[troughs[troughs > start]], tolerance),
+            "resistances": TechnicalAnalyzer.cluster_levels(series.high[peaks[peaks > start]], tolerance),
+        }
+
     @staticmethod
     def find_support_resistance(
-        candles: list[Dict],
+        candles: Union[CandleSeries, list[Dict]],
         lookback: int = 50,
+        pivots: Optional[Tuple[list[int], list[int]]] = None,
     ) -> Tuple[list[float], list[float]]:
         """
         Trouver les niveaux de support et résistance
@@ -122,35 +243,40 @@ class TechnicalAnalyzer:
         Args:
             candles: Liste des bougies
             lookback: Nombre de bougies à analyser
+            pivots: (sommets, creux) déjà calculés, indices dans candles
             
         Returns:
-            Tuple (supports, resistances)
+            Tuple (supports, resistances), niveaux regroupés triés par prix croissant
         """
         if len(candles) < lookback:
             return [], []
 
-        recent_candles = candles[-lookback:]
-        highs = [float(c.get("high", 0)) for c in recent_candles]
-        lows = [float(c.get("low", 0)) for c in recent_candles]
-
-        # Trouver les points hauts et bas locaux
-        resistances = []
-        supports = []
-
-        for i in range(1, len(recent_candles) - 1):
-            if highs[i] > highs[i - 1] and highs[i] > highs[i + 1]:
-                resistances.append(highs[i])
-
-            if lows[i] < lows[i - 1] and lows[i] < lows[i + 1]:
-                supports.append(lows[i])
-
-        # Trier et dédupliquer (regrouper les niveaux proches)
-        resistances = sorted(list(set(resistances)), reverse=True)
-        supports = sorted(list(set(supports)))
+        levels = TechnicalAnalyzer.find_sr_levels(candles, lookback, pivots=pivots)
+        supports = [cluster["price"] for cluster in levels["supports"]]
+        resistances = [cluster["price"] for cluster in levels["resistances"]]
 
         logger.debug(f"S/R trouvés: {len(supports)} supports, {len(resistances)} résistances")
         return supports, resistances
 
+    @staticmethod
+    def nearest_level(price: float, levels: list[float]) -> Optional[float]:
+        """
+        Trouver le niveau le plus proche d'un prix (recherche dichotomique)
+        
+        Args:
+            price: Prix
+            levels: Niveaux triés par prix croissant
+            
+        Returns:
+            Niveau le plus proche ou None
+        """
+        if not levels:
+            return None
+
+        i = bisect_left(levels, price)
+        candidates = levels[max(0, i - 1):i + 1]
+        return min(candidates, key=lambda level: abs(price - level))
+
     @staticmethod
     def check_sr_confluence(
         price: float,
@@ -163,8 +289,8 @@ class TechnicalAnalyzer:
         
         Args:
             price: Prix actuel
-            supports: Niveaux de support
-            resistances: Niveaux de résistance
+            supports: Niveaux de support (triés par prix croissant)
+            resistances: Niveaux de résistance (triés par prix croissant)
             tolerance: Tolérance en pourcentage
             
         Returns:
@@ -172,16 +298,10 @@ class TechnicalAnalyzer:
         """
         tolerance_amount = price * tolerance
 
-        # Vérifier supports
-        for support in supports:
-            if abs(price - support) <= tolerance_amount:
-                logger.debug(f"Confluence support détectée: {support}")
-                return True
-
-        # Vérifier résistances
-        for resistance in resistances:
-            if abs(price - resistance) <= tolerance_amount:
-                logger.debug(f"Confluence résistance détectée: {resistance}")
+        for name, levels in (("support", supports), ("résistance", resistances)):
+            level = TechnicalAnalyzer.nearest_level(price, levels)
+            if level is not None and abs(price - level) <= tolerance_amount:
+                logger.debug(f"Confluence {name} détectée: {level}")
                 return True
 
         return False
@@ -0,0 +1,256 @@
+"""
+Index d'intervalles des zones GA actives de toutes les paires
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Dict, Hashable, Optional, Tuple
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class _SymbolZones:
+    """
+    Zones d'une paire découpées en segments élémentaires
+
+    Les bornes triées des zones découpent l'axe des prix en points et en
+    intervalles ouverts entre deux points; chacun garde les zones qui le
+    couvrent. Une recherche est une dichotomie, une insertion reconstruit
+    les segments de la seule paire concernée (quelques zones).
+    """
+
+    def __init__(self):
+        self.zones: dict[Hashable, Dict] = {}
+        self.points: list[float] = []
+        self.at_point: list[list[Dict]] = []  # zones contenant points[i]
+        self.between: list[list[Dict]] = [[]]  # zones couvrant ]points[i-1], points[i][
+        self.lows: list[Tuple[float, int]] = []  # (low, rang dans by_order) trié
+        self.highs: list[Tuple[float, int]] = []  # (high, rang dans by_order) trié
+        self.by_order: list[Dict] = []  # zones non vides, ordre d'insertion
+
+    def rebuild(self):
+        """Recalculer les segments après une modification"""
+        # Une zone dont low > high ne contient aucun prix (comme check_price_in_any_zone)
+        zones = [zone for zone in self.zones.values() if zone["low"] <= zone["high"]]
+        zones.sort(key=lambda zone: zone["order"])
+
+        self.points = sorted({bound for zone in zones for bound in (zone["low"], zone["high"])})
+        self.at_point = [[zone for zone in zones if zone["low"] <= point <= zone["high"]] for point in self.points]
+        self.between = [[]]
+        for left, right in zip(self.points, self.points[1:]):
+            self.between.append([zone for zone in zones if zone["low"] <= left and right <= zone["high"]])
+        self.between.append([])
+
+        self.by_order = zones
+        self.lows = sorted((zone["low"], i) for i, zone in enumerate(zones))
+        self.highs = sorted((zone["high"], i) for i, zone in enumerate(zones))
+
+    def containing(self, price: float) -> list[Dict]:
+        """Zones contenant le prix, dans l'ordre d'insertion"""
+        i = bisect_left(self.points, price)
+        if i < len(self.points) and self.points[i] == price:
+            return self.at_point[i]
+        return self.between[i]
+
+
+class ZoneIndex:
+    """
+    Index des zones Fibonacci actives, par paire
+
+    Insertion, expiration, zones contenant un prix et zone la plus proche
+    d'un prix en temps logarithmique par paire. Les échéances sont gardées
+    dans un tas: sans zone échue, expire() ne lit que son sommet.
+    """
+
+    def __init__(self):
+        """Initialiser un index vide"""
+        self._symbols: dict[str, _SymbolZones] = {}
+        self._order = 0  # ordre d'insertion (départage des zones)
+        # (expires_at, ordre, paire, key); entrées périmées ignorées à l'expiration
+        self._expiries: list[Tuple[int, int, str, Hashable]] = []
+
+    def __len__(self) -> int:
+        """Nombre de zones indexées"""
+        return sum(len(zones.zones) for zones in self._symbols.values())
+
+    def _entry(self, symbol: str, key: Hashable, low: float, high: float, expires_at: Optional[int], data: Optional[Dict]) -> Dict:
+        """Zone indexée (l'ordre d'insertion départage les zones d'une paire)"""
+        self._order += 1
+        if expires_at is not None:
+            heapq.heappush(self._expiries, (expires_at, self._order, symbol, key))
+        return {
+            "symbol": symbol,
+            "key": key,
+            "low": low,
+            "high": high,
+            "expires_at": expires_at,
+            "data": data,
+            "order": self._order,
+        }
+
+    def insert(
+        self,
+        symbol: str,
+        key: Hashable,
+        low: float,
+        high: float,
+        expires_at: Optional[int] = None,
+        data: Optional[Dict] = None,
+    ):
+        """
+        Ajouter ou remplacer une zone
+
+        Args:
+            symbol: Paire
+            key: Identifiant de la zone dans la paire (ex. indice du Fibonacci)
+            low: Borne basse (incluse)
+            high: Borne haute (incluse)
+            expires_at: Timestamp UNIX d'expiration (None: jamais)
+            data: Données associées (ex. le Fibonacci)
+        """
+        zones = self._symbols.setdefault(symbol, _SymbolZones())
+        zones.zones[key] = self._entry(symbol, key, low, high, expires_at, data)
+        zones.rebuild()
+
+    def replace(self, symbol: str, zones: list[Tuple[Hashable, float, float, Optional[Dict]]], expires_at: Optional[int] = None):
+        """
+        Remplacer toutes les zones d'une paire
+
+        Args:
+            symbol: Paire
+            zones: Liste de (key, low, high, data)
+            expires_at: Timestamp UNIX d'expiration commun
+        """
+        self._symbols.pop(symbol, None)
+        if not zones:
+            return
+
+        entries = _SymbolZones()
+        for key, low, high, data in zones:
+            entries.zones[key] = self._entry(symbol, key, low, high, expires_at, data)
+        entries.rebuild()
+        self._symbols[symbol] = entries
+
+    def remove(self, symbol: str, key: Optional[Hashable] = None) -> int:
+        """
+        Retirer une zone, ou toutes celles d'une paire
+
+        Args:
+            symbol: Paire
+            key: Zone à retirer (None: toutes)
+
+        Returns:
+            Nombre de zones retirées
+        """
+        zones = self._symbols.get(symbol)
+        if zones is None:
+            return 0
+
+        if key is None:
+            del self._symbols[symbol]
+            return len(zones.zones)
+
+        if zones.zones.pop(key, None) is None:
+            return 0
+        if zones.zones:
+            zones.rebuild()
+        else:
+            del self._symbols[symbol]
+        return 1
+
+    def expire(self, now: int) -> int:
+        """
+        Retirer les zones expirées
+
+        Args:
+            now: Timestamp UNIX courant
+
+        Returns:
+            Nombre de zones retirées
+        """
+        removed = 0
+        touched = set()
+        while self._expiries and self._expiries[0][0] <= now:
+            _, order, symbol, key = heapq.heappop(self._expiries)
+            zones = self._symbols.get(symbol)
+            zone = zones.zones.get(key) if zones is not None else None
+            if zone is None or zone["order"] != order:
+                continue  # zone remplacée ou retirée depuis
+            del zones.zones[key]
+            touched.add(symbol)
+            removed += 1
+
+        for symbol in touched:
+            zones = self._symbols[symbol]
+            if zones.zones:
+                zones.rebuild()
+            else:
+                del self._symbols[symbol]
+
+        if removed:
+            logger.debug(f"{removed} zones expirées")
+        return removed
+
+    def zones(self, symbol: str) -> list[Dict]:
+        """
+        Zones non vides d'une paire, dans l'ordre d'insertion
+
+        Args:
+            symbol: Paire
+
+        Returns:
+            Zones {symbol, key, low, high, expires_at, data}
+        """
+        zones = self._symbols.get(symbol)
+        return zones.by_order if zones is not None else []
+
+    def containing(self, symbol: str, price: float) -> list[Dict]:
+        """
+        Zones d'une paire contenant un prix
+
+        Args:
+            symbol: Paire
+            price: Prix
+
+        Returns:
+            Zones {symbol, key, low, high, expires_at, data} dans l'ordre d'insertion
+        """
+        zones = self._symbols.get(symbol)
+        if zones is None:
+            return []
+        return zones.containing(price)
+
+    def nearest(self, symbol: str, price: float) -> Optional[Tuple[Dict, float]]:
+        """
+        Zone d'une paire la plus proche d'un prix
+
+        Args:
+            symbol: Paire
+            price: Prix
+
+        Returns:
+            Tuple (zone, distance), distance nulle si le prix est dans la zone,
+            ou None sans zone
+        """
+        zones = self._symbols.get(symbol)
+        if zones is None or not zones.by_order:
+            return None
+
+        inside = zones.containing(price)
+        if inside:
+            return inside[0], 0.0
+
+        # Plus proche zone au-dessus (plus petit low > prix) et au-dessous (plus grand high < prix)
+        candidates = []
+        above = bisect_right(zones.lows, (price, len(zones.by_order)))
+        if above < len(zones.lows):
+            low, i = zones.lows[above]
+            candidates.append((low - price, i))
+        below = bisect_left(zones.highs, (price, -1))
+        if below > 0:
+            high, i = zones.highs[below - 1]
+            candidates.append((price - high, i))
+
+        distance, i = min(candidates)
+        return zones.by_order[i], distance
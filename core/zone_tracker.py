@@ -0,0 +1,214 @@
+"""
+Suivi du cycle de vie des zones GA (intacte, touchée, cassée)
+"""
+
+import json
+from typing import Callable, Dict, Optional
+import numpy as np
+from core.candles import CandleSeries
+from core.fibonacci import FibonacciCalculator
+from core.heiken_ashi import HeikenAshiAnalyzer
+from core.indicators import OnlineHeikenAshi
+from data.database import Database
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+UNTOUCHED = "untouched"
+TOUCHED = "touched"
+BROKEN = "broken"
+
+
+class ZoneTracker:
+    """
+    Zones Fibonacci persistées dans active_zones et suivies bougie par bougie
+
+    Les ancrages ne sont recalculés qu'à un nouveau swing confirmé: une
+    jambe en cours qui s'étend ne change pas les zones (ni leurs ids).
+    Sinon les zones enregistrées sont reprises et seules les bougies
+    closes depuis le dernier passage font évoluer leur statut.
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        """
+        Initialiser le suivi
+
+        Args:
+            db: Base de données (None: suivi en mémoire seulement)
+        """
+        self.db = db
+        self.zones: dict[str, list[Dict]] = {}  # lignes active_zones par paire
+        self.ha: dict[str, OnlineHeikenAshi] = {}  # HA de la dernière bougie close suivie
+        self.ha_timestamp: dict[str, int] = {}
+
+    @staticmethod
+    def anchor_key(mode: str, swings: list[Dict], candles: CandleSeries) -> str:
+        """
+        Signature des ancrages: mode et horodatages des deux derniers swings confirmés
+
+        Args:
+            mode: bullish ou bearish
+            swings: Swings ZigZag (l'extrême en cours, non confirmé, est ignoré)
+            candles: Bougies des indices des swings
+
+        Returns:
+            Signature JSON
+        """
+        confirmed = [swing for swing in swings if swing.get("confirmed", True)]
+        recent = [[int(candles.timestamp[swing["index"]]), swing["type"]] for swing in confirmed[-2:]]
+        return json.dumps([mode, recent])
+
+    def update(
+        self,
+        symbol: str,
+        mode: str,
+        candles: CandleSeries,
+        swings: list[Dict],
+        compute_fibs: Callable[[], list[Dict]],
+    ) -> list[Dict]:
+        """
+        Reprendre ou recréer les zones d'une paire puis suivre les nouvelles bougies
+
+        Args:
+            symbol: Paire
+            mode: bullish ou bearish
+            candles: Bougies H1 (la plus récente est en cours)
+            swings: Swings ZigZag de candles
+            compute_fibs: Calcul des Fibonacci si les ancrages ont changé
+
+        Returns:
+            Fibonacci des zones (indices relatifs à candles)
+        """
+        if len(candles) < 2 or not candles.timestamp[-1]:
+            return compute_fibs()
+
+        key = self.anchor_key(mode, swings, candles)
+        zones = self._load(symbol)
+        if not zones or zones[0]["anchor_key"] != key:
+            zones = self._create(symbol, mode, key, candles, compute_fibs())
+        if not zones:
+            return []
+
+        self._advance(symbol, candles, zones)
+        fibs = [self._to_fib(zone, candles) for zone in zones]
+        return [fib for fib in fibs if fib is not None]
+
+    def get_zones(self, symbol: str) -> list[Dict]:
+        """Zones suivies d'une paire (lignes active_zones)"""
+        return self._load(symbol)
+
+    def _load(self, symbol: str) -> list[Dict]:
+        """Zones en mémoire, sinon relues en base (redémarrage)"""
+        if symbol not in self.zones:
+            rows = self.db.get_active_zones(symbol) if self.db is not None else []
+            self.zones[symbol] = [row for row in rows if row.get("anchor_key")]
+        return self.zones[symbol]
+
+    def _create(self, symbol: str, mode: str, key: str, candles: CandleSeries, fibs: list[Dict]) -> list[Dict]:
+        """Enregistrer les zones de nouveaux ancrages (bougies suivies à partir du dernier ancrage)"""
+        zones = []
+        for fib in fibs:
+            point_a_time = int(candles.timestamp[fib["point_a_idx"]])
+            point_b_time = int(candles.timestamp[fib["point_b_idx"]])
+            zones.append({
+                "symbol": symbol,
+                "zone_type": mode,
+                "high": fib["point_a"],
+                "low": fib["point_b"],
+                "level_500": fib["levels"]["level_500"],
+                "level_618": fib["levels"]["level_618"],
+                "status": UNTOUCHED,
+                "fib_index": fib["index"],
+                "point_a_time": point_a_time,
+                "point_b_time": point_b_time,
+                "anchor_key": key,
+                # Le retracement commence après le second ancrage: ces bougies
+                # sont rejouées par _advance (une zone déjà cassée ne signale pas)
+                "last_timestamp": max(point_a_time, point_b_time),
+            })
+
+        if self.db is not None:
+            ids = self.db.replace_active_zones(symbol, zones)
+            for zone, zone_id in zip(zones, ids):
+                zone["id"] = zone_id
+
+        logger.info(f"{symbol}: {len(zones)} zones {mode} créées")
+        self.zones[symbol] = zones
+        return zones
+
+    def _advance(self, symbol: str, candles: CandleSeries, zones: list[Dict]):
+        """Faire évoluer les statuts avec les bougies closes pas encore vues"""
+        closed = candles[:-1]
+        timestamps = closed.timestamp
+
+        # Report HA repris de l'appel précédent (seules les nouvelles bougies
+        # sont lues), sinon réchauffé une fois sur la fenêtre (redémarrage,
+        # ou zones créées dont les bougies depuis l'ancrage sont à rejouer)
+        ha = self.ha.get(symbol)
+        ha_timestamp = self.ha_timestamp.get(symbol, 0)
+        since = min(zone["last_timestamp"] or 0 for zone in zones)
+        if ha is None or not int(timestamps[0]) <= ha_timestamp <= int(timestamps[-1]) or since < ha_timestamp:
+            ha, ha_timestamp = OnlineHeikenAshi(), 0
+        start = int(np.searchsorted(timestamps, ha_timestamp, side="right"))
+
+        opens, highs = closed.open.tolist(), closed.high.tolist()
+        lows, closes = closed.low.tolist(), closed.close.tolist()
+        for i in range(start, len(closed)):
+            ha_bar = ha.update(opens[i], highs[i], lows[i], closes[i])
+            timestamp = int(timestamps[i])
+            for zone in zones:
+                if timestamp <= (zone["last_timestamp"] or 0):
+                    continue  # bougie déjà suivie pour cette zone
+                status = self._next_status(zone, highs[i], lows[i], ha_bar)
+                zone["last_timestamp"] = timestamp
+                if status != zone["status"]:
+                    logger.info(f"{symbol}: zone Fib #{zone['fib_index']} {zone['status']} -> {status}")
+                    zone["status"] = status
+                    if self.db is not None and zone.get("id") is not None:
+                        self.db.update_zone_status(zone["id"], status, timestamp)
+
+        self.ha[symbol] = ha
+        self.ha_timestamp[symbol] = int(timestamps[-1])
+
+    @staticmethod
+    def _next_status(zone: Dict, high: float, low: float, ha_bar: Dict) -> str:
+        """
+        Statut d'une zone après une bougie close
+
+        Touchée dès que la bougie entre dans la zone; cassée quand un corps
+        HA touché sort de la zone du côté opposé à la tendance.
+        """
+        if zone["status"] == BROKEN:
+            return BROKEN
+
+        zone_min = min(zone["level_500"], zone["level_618"])
+        zone_max = max(zone["level_500"], zone["level_618"])
+        status = zone["status"]
+        if status == UNTOUCHED and low <= zone_max and high >= zone_min:
+            status = TOUCHED
+
+        if status == TOUCHED and HeikenAshiAnalyzer.is_body_outside_zone(ha_bar, zone_min, zone_max):
+            body_max = max(ha_bar["ha_open"], ha_bar["ha_close"])
+            body_min = min(ha_bar["ha_open"], ha_bar["ha_close"])
+            if (zone["zone_type"] == "bullish" and body_max < zone_min) or (
+                zone["zone_type"] == "bearish" and body_min > zone_max
+            ):
+                status = BROKEN
+
+        return status
+
+    @staticmethod
+    def _to_fib(zone: Dict, candles: CandleSeries) -> Optional[Dict]:
+        """Fibonacci d'une zone, ancrages replacés dans la série courante (None hors fenêtre)"""
+        anchors = [zone["point_a_time"], zone["point_b_time"]]
+        point_a_idx, point_b_idx = np.searchsorted(candles.timestamp, anchors)
+        for idx, timestamp in zip((point_a_idx, point_b_idx), anchors):
+            if idx >= len(candles) or int(candles.timestamp[idx]) != timestamp:
+                logger.debug(f"{zone['symbol']}: ancrage de la zone Fib #{zone['fib_index']} hors fenêtre, zone ignorée")
+                return None
+
+        fib = FibonacciCalculator.build_fibonacci(
+            zone["zone_type"], zone["fib_index"], zone["high"], zone["low"], int(point_a_idx), int(point_b_idx)
+        )
+        fib["status"] = zone["status"]
+        return fib
@@ -2,5 +2,7 @@
 
 from .twelvedata_client import TwelveDataClient
 from .database import Database
+from .candle_store import CandleStore
+from .gap_scanner import GapScanner
 
-__all__ = ["TwelveDataClient", "Database"]
+__all__ = ["TwelveDataClient", "Database", "CandleStore", "GapScanner"]
@@ -0,0 +1,291 @@
+"""
+Stockage local des bougies OHLCV (SQLite) pour le fetch incrémental
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from itertools import repeat
+from typing import Dict, Optional, Tuple
+import numpy as np
+from data.resampler import CandleResampler
+from utils.logger import setup_logger
+from utils.timeframes import parse_timestamp, interval_seconds
+
+# Bougies H1 par bougie cible (marge incluse pour les week-ends)
+H1_BARS_PER_TARGET = {
+    "4h": 4,
+    "1day": 24,
+    "1week": 24 * 7,
+}
+
+# Colonnes de prix des "values" Twelve Data (ordre de la table candles)
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+logger = setup_logger(__name__)
+
+
+class CandleStore:
+    """Historique local des bougies, indexé par (symbole, timeframe, horodatage)"""
+
+    def __init__(self, db_path: str = "fibo_bot.db"):
+        """
+        Initialiser le stockage
+
+        Args:
+            db_path: Chemin du fichier SQLite
+        """
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        """Initialiser la table des bougies"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            # Les dates Twelve Data (YYYY-MM-DD[ HH:MM:SS]) se trient lexicographiquement
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS candles (
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    volume REAL,
+                    PRIMARY KEY (symbol, interval, timestamp)
+                )
+            """)
+
+            conn.commit()
+            conn.close()
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur initialisation stockage bougies: {e}")
+
+    def save_candles(self, symbol: str, interval: str, values: list[Dict]) -> int:
+        """
+        Insérer ou remplacer des bougies (format "values" Twelve Data)
+
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            values: Bougies {datetime, open, high, low, close, volume}
+
+        Returns:
+            Nombre de bougies enregistrées
+        """
+        timestamps, columns = self.to_columns(values)
+        if not timestamps:
+            return 0
+
+        # executemany parcourt les colonnes directement (aucune ligne dict intermédiaire)
+        rows = zip(repeat(symbol), repeat(interval), timestamps, *(column.tolist() for column in columns))
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            # La dernière bougie stockée peut être incomplète: on la remplace
+            cursor.executemany("""
+                INSERT OR REPLACE INTO candles
+                (symbol, interval, timestamp, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+            conn.commit()
+            conn.close()
+            logger.debug(f"{len(timestamps)} bougies {interval} enregistrées pour {symbol}")
+            return len(timestamps)
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur sauvegarde bougies {symbol}: {e}")
+            return 0
+
+    @staticmethod
+    def to_columns(values: list[Dict]) -> Tuple[list[str], list[np.ndarray]]:
+        """
+        Décoder les "values" Twelve Data en colonnes (une conversion NumPy par colonne)
+
+        Args:
+            values: Bougies {datetime, open, high, low, close, [volume]} (chaînes)
+
+        Returns:
+            Tuple (horodatages Twelve Data, colonnes float64 dans l'ordre de PRICE_COLUMNS);
+            les bougies sans date sont ignorées, un champ absent vaut 0
+        """
+        values = [item for item in values if item.get("datetime")]
+        timestamps = [item["datetime"] for item in values]
+        columns = [
+            np.array([item.get(field) or 0 for item in values], dtype=np.float64)
+            for field in PRICE_COLUMNS
+        ]
+        return timestamps, columns
+
+    def get_candles(self, symbol: str, interval: str, limit: int) -> list[Dict]:
+        """
+        Récupérer les dernières bougies stockées
+
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            limit: Nombre max de bougies
+
+        Returns:
+            Bougies au format "values" Twelve Data (la plus récente en premier)
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT timestamp AS datetime, open, high, low, close, volume
+                FROM candles
+                WHERE symbol = ? AND interval = ?
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (symbol, interval, limit))
+
+            rows = cursor.fetchall()
+            conn.close()
+
+            return [dict(row) for row in rows]
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lecture bougies {symbol}: {e}")
+            return []
+
+    def get_last_timestamp(self, symbol: str, interval: str) -> Optional[str]:
+        """Récupérer l'horodatage de la dernière bougie stockée"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT MAX(timestamp) FROM candles
+                WHERE symbol = ? AND interval = ?
+            """, (symbol, interval))
+            row = cursor.fetchone()
+            conn.close()
+
+            return row[0] if row else None
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lecture dernière bougie {symbol}: {e}")
+            return None
+
+    def count_candles(self, symbol: str, interval: str) -> int:
+        """Compter les bougies stockées pour une paire et un timeframe"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT COUNT(*) FROM candles
+                WHERE symbol = ? AND interval = ?
+            """, (symbol, interval))
+            row = cursor.fetchone()
+            conn.close()
+
+            return row[0] if row else 0
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur comptage bougies {symbol}: {e}")
+            return 0
+
+    def get_timestamps(self, symbol: str, interval: str) -> list[str]:
+        """Horodatages stockés pour une paire et un timeframe (ordre chronologique)"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT timestamp FROM candles
+                WHERE symbol = ? AND interval = ?
+                ORDER BY timestamp
+            """, (symbol, interval))
+            rows = cursor.fetchall()
+            conn.close()
+
+            return [row[0] for row in rows]
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lecture horodatages {symbol}: {e}")
+            return []
+
+    def list_series(self) -> list[tuple[str, str]]:
+        """Couples (symbole, timeframe) présents dans le stockage"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT DISTINCT symbol, interval FROM candles ORDER BY symbol, interval")
+            rows = cursor.fetchall()
+            conn.close()
+
+            return [(row[0], row[1]) for row in rows]
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lecture des séries stockées: {e}")
+            return []
+
+    def bars_to_fetch(
+        self,
+        symbol: str,
+        interval: str,
+        output_size: int,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """
+        Calculer l'outputsize nécessaire pour compléter l'historique local
+
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            output_size: Nombre de bougies voulues par l'appelant
+            now: Date courante (UTC, défaut: maintenant)
+
+        Returns:
+            Nombre de bougies à demander à l'API (output_size si historique insuffisant)
+        """
+        if self.count_candles(symbol, interval) < output_size:
+            return output_size
+
+        last_timestamp = self.get_last_timestamp(symbol, interval)
+        if not last_timestamp:
+            return output_size
+
+        now = now or datetime.now(timezone.utc)
+        elapsed = (now - parse_timestamp(last_timestamp)).total_seconds()
+
+        # +1: la dernière bougie stockée était peut-être encore en formation
+        missing = int(max(0, elapsed) // interval_seconds(interval)) + 1
+        return min(missing, output_size)
+
+    def get_resampled_candles(
+        self,
+        symbol: str,
+        interval: str,
+        limit: int,
+    ) -> list[Dict]:
+        """
+        Construire les bougies H4/D1/W1 à partir de l'historique H1 local
+
+        Les périodes antérieures à l'historique H1 sont complétées par les
+        bougies natives du timeframe déjà stockées (backfill API).
+
+        Args:
+            symbol: Paire
+            interval: Timeframe cible (4h, 1day, 1week)
+            limit: Nombre max de bougies
+
+        Returns:
+            Bougies au format "values" (la plus récente en premier)
+        """
+        h1_values = self.get_candles(symbol, "1h", (limit + 1) * H1_BARS_PER_TARGET[interval])
+        aggregated = CandleResampler.resample(h1_values, interval)
+        native = self.get_candles(symbol, interval, limit)
+
+        return CandleResampler.merge_with_native(aggregated, native)[:limit]
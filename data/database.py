@@ -2,6 +2,7 @@
 Base de données SQLite pour l'historique des signaux
 """
 
+import json
 import sqlite3
 from datetime import datetime
 from typing import List, Dict, Optional
@@ -75,6 +76,31 @@ class Database:
                 )
             """)
 
+            # Table du journal des crédits API
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS api_credits (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    endpoint TEXT NOT NULL,
+                    symbols TEXT,
+                    interval TEXT,
+                    credits INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Table de l'état des indicateurs incrémentaux (JSON)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS indicator_state (
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (symbol, interval)
+                )
+            """)
+
+            self._migrate_active_zones(cursor)
+
             conn.commit()
             conn.close()
             logger.info(f"Base de données initialisée: {self.db_path}")
@@ -82,6 +108,23 @@ class Database:
         except sqlite3.Error as e:
             logger.error(f"Erreur initialisation BD: {e}")
 
+    # Colonnes ajoutées à active_zones (bases créées avant le suivi des zones)
+    ACTIVE_ZONE_COLUMNS = {
+        "fib_index": "INTEGER",
+        "point_a_time": "INTEGER",
+        "point_b_time": "INTEGER",
+        "anchor_key": "TEXT",
+        "last_timestamp": "INTEGER",
+    }
+
+    def _migrate_active_zones(self, cursor: sqlite3.Cursor):
+        """Ajouter les colonnes manquantes de active_zones"""
+        cursor.execute("PRAGMA table_info(active_zones)")
+        existing = {row[1] for row in cursor.fetchall()}
+        for column, column_type in self.ACTIVE_ZONE_COLUMNS.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE active_zones ADD COLUMN {column} {column_type}")
+
     def save_signal(
         self,
         symbol: str,
@@ -246,3 +289,211 @@ class Database:
         except sqlite3.Error as e:
             logger.error(f"Erreur lecture statuts paires: {e}")
             return []
+
+    def log_api_credits(
+        self,
+        endpoint: str,
+        credits: int,
+        symbols: str = "",
+        interval: str = "",
+    ) -> bool:
+        """
+        Enregistrer les crédits consommés par une requête API
+        
+        Args:
+            endpoint: Endpoint appelé (ex: time_series)
+            credits: Crédits consommés
+            symbols: Paires demandées (séparées par des virgules)
+            interval: Timeframe
+            
+        Returns:
+            True si succès
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                INSERT INTO api_credits (endpoint, symbols, interval, credits)
+                VALUES (?, ?, ?, ?)
+            """, (endpoint, symbols, interval, credits))
+
+            conn.commit()
+            conn.close()
+            return True
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur journal crédits: {e}")
+            return False
+
+    def get_credits_used_today(self) -> int:
+        """Récupérer les crédits consommés depuis 00:00 UTC"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT COALESCE(SUM(credits), 0) FROM api_credits
+                WHERE created_at >= date('now')
+            """)
+            row = cursor.fetchone()
+            conn.close()
+
+            return row[0] if row else 0
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lecture crédits: {e}")
+            return 0
+
+    def save_indicator_state(self, symbol: str, interval: str, state: Dict) -> bool:
+        """
+        Enregistrer l'état des indicateurs incrémentaux d'une paire
+        
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            state: État sérialisable (IndicatorState.to_dict)
+            
+        Returns:
+            True si succès
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                INSERT OR REPLACE INTO indicator_state (symbol, interval, state, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            """, (symbol, interval, json.dumps(state)))
+
+            conn.commit()
+            conn.close()
+            return True
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur sauvegarde état indicateurs {symbol}: {e}")
+            return False
+
+    def get_indicator_state(self, symbol: str, interval: str) -> Optional[Dict]:
+        """
+        Récupérer l'état des indicateurs incrémentaux d'une paire
+        
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            
+        Returns:
+            État sérialisé ou None
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "SELECT state FROM indicator_state WHERE symbol = ? AND interval = ?",
+                (symbol, interval),
+            )
+            row = cursor.fetchone()
+            conn.close()
+
+            return json.loads(row[0]) if row else None
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lecture état indicateurs {symbol}: {e}")
+            return None
+
+    def replace_active_zones(self, symbol: str, zones: list[Dict]) -> list[int]:
+        """
+        Remplacer les zones actives d'une paire
+        
+        Args:
+            symbol: Paire
+            zones: Zones {zone_type, high, low, level_500, level_618, status,
+                fib_index, point_a_time, point_b_time, anchor_key, last_timestamp}
+            
+        Returns:
+            Identifiants des zones enregistrées (vide en cas d'erreur)
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("DELETE FROM active_zones WHERE symbol = ?", (symbol,))
+            ids = []
+            for zone in zones:
+                cursor.execute("""
+                    INSERT INTO active_zones
+                    (symbol, zone_type, high, low, level_500, level_618, status,
+                     fib_index, point_a_time, point_b_time, anchor_key, last_timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    symbol, zone["zone_type"], zone["high"], zone["low"], zone["level_500"], zone["level_618"],
+                    zone["status"], zone["fib_index"], zone["point_a_time"], zone["point_b_time"],
+                    zone["anchor_key"], zone["last_timestamp"],
+                ))
+                ids.append(cursor.lastrowid)
+
+            conn.commit()
+            conn.close()
+            return ids
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur sauvegarde zones {symbol}: {e}")
+            return []
+
+    def get_active_zones(self, symbol: Optional[str] = None) -> list[Dict]:
+        """
+        Récupérer les zones actives
+        
+        Args:
+            symbol: Filtrer par paire (optionnel)
+            
+        Returns:
+            Zones triées par paire et numéro de Fibonacci
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+
+            if symbol:
+                cursor.execute("SELECT * FROM active_zones WHERE symbol = ? ORDER BY fib_index", (symbol,))
+            else:
+                cursor.execute("SELECT * FROM active_zones ORDER BY symbol, fib_index")
+            rows = cursor.fetchall()
+            conn.close()
+
+            return [dict(row) for row in rows]
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lecture zones: {e}")
+            return []
+
+    def update_zone_status(self, zone_id: int, status: str, last_timestamp: int) -> bool:
+        """
+        Mettre à jour le statut d'une zone
+        
+        Args:
+            zone_id: Identifiant de la zone
+            status: untouched, touched ou broken
+            last_timestamp: Dernière bougie close prise en compte (epoch)
+            
+        Returns:
+            True si succès
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                UPDATE active_zones SET status = ?, last_timestamp = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (status, last_timestamp, zone_id))
+
+            conn.commit()
+            conn.close()
+            return True
+
+        except sqlite3.Error as e:
+            logger.error(f"Erreur mise à jour zone {zone_id}: {e}")
+            return False
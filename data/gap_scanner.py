@@ -0,0 +1,255 @@
+"""
+Détection des trous dans l'historique local et backfill groupé
+"""
+
+from datetime import timedelta
+from typing import Dict, Optional
+from config.settings import BUDGET_JOB_CREDITS_PER_PAIR
+from data.candle_store import CandleStore
+from utils.logger import setup_logger
+from utils.timeframes import (
+    expected_bars,
+    format_timestamp,
+    interval_seconds,
+    parse_timestamp,
+)
+
+logger = setup_logger(__name__)
+
+# outputsize maximum d'une requête time_series
+MAX_OUTPUT_SIZE = 5000
+
+
+class GapScanner:
+    """
+    Compare l'historique stocké au calendrier des sessions FX
+
+    Les bougies manquantes entre la première et la dernière bougie stockées
+    sont regroupées en trous, puis couvertes par le moins possible de
+    requêtes (outputsize jusqu'à 5000, end_date juste après le trou le plus
+    récent). La fin de l'historique reste du ressort du fetch incrémental.
+    """
+
+    def __init__(self, candle_store: CandleStore, api_client=None, max_output_size: int = MAX_OUTPUT_SIZE):
+        """
+        Initialiser le scanner
+
+        Args:
+            candle_store: Stockage local des bougies
+            api_client: Client Twelve Data (requis pour le backfill)
+            max_output_size: Bougies maximum par requête
+        """
+        self.candle_store = candle_store
+        self.api_client = api_client
+        self.max_output_size = max_output_size
+
+        # Bougies absentes côté API malgré une requête qui les couvrait (jours fériés...)
+        self.unfillable: set[tuple[str, str, str]] = set()
+
+    def find_gaps(self, symbol: str, interval: str) -> list[Dict]:
+        """
+        Trouver les bougies manquantes d'une série
+
+        Args:
+            symbol: Paire
+            interval: Timeframe
+
+        Returns:
+            Trous du plus ancien au plus récent: {start, end, bars, first_idx, missing}
+            (first_idx: rang de la première bougie manquante dans le calendrier attendu)
+        """
+        stored = self.candle_store.get_timestamps(symbol, interval)
+        if len(stored) < 2:
+            return []
+
+        present = set(stored)
+        calendar = expected_bars(interval, parse_timestamp(stored[0]), parse_timestamp(stored[-1]))
+
+        gaps = []
+        current = None
+        for idx, bar in enumerate(calendar):
+            key = format_timestamp(bar, interval)
+            if key in present or (symbol, interval, key) in self.unfillable:
+                current = None
+                continue
+
+            if current is None:
+                current = {"start": key, "end": key, "bars": 0, "first_idx": idx, "missing": []}
+                gaps.append(current)
+            current["end"] = key
+            current["bars"] += 1
+            current["missing"].append(key)
+
+        if gaps:
+            logger.info(
+                f"{symbol} {interval}: {len(gaps)} trou(s), "
+                f"{sum(gap['bars'] for gap in gaps)} bougie(s) manquante(s)"
+            )
+        return gaps
+
+    def plan_requests(self, interval: str, gaps: list[Dict]) -> list[Dict]:
+        """
+        Couvrir les trous avec le moins de requêtes possible
+
+        Parcours glouton du trou le plus récent au plus ancien: une requête
+        se termine une bougie après son trou le plus récent et remonte
+        jusqu'au plus ancien trou qui tient dans max_output_size bougies.
+
+        Args:
+            interval: Timeframe
+            gaps: Trous renvoyés par find_gaps
+
+        Returns:
+            Requêtes (plus récente d'abord): {end_date, output_size, missing}
+        """
+        # Une bougie de marge: end_date peut être exclue de la réponse
+        span = self.max_output_size - 1
+        step = timedelta(seconds=interval_seconds(interval))
+
+        # Morceaux (premier rang, clés manquantes), un trou trop long est découpé
+        pieces = []
+        for gap in gaps:
+            keys = gap["missing"]
+            for offset in range(0, len(keys), span):
+                pieces.append((gap["first_idx"] + offset, keys[offset:offset + span]))
+
+        requests = []
+        i = len(pieces) - 1
+        while i >= 0:
+            first_idx, newest_keys = pieces[i]
+            last_idx = first_idx + len(newest_keys) - 1
+            missing = list(newest_keys)
+            i -= 1
+
+            while i >= 0 and last_idx - pieces[i][0] + 1 <= span:
+                first_idx = pieces[i][0]
+                missing = pieces[i][1] + missing
+                i -= 1
+
+            requests.append({
+                "end_date": format_timestamp(parse_timestamp(newest_keys[-1]) + step, interval),
+                "output_size": last_idx - first_idx + 2,
+                "missing": missing,
+            })
+
+        return requests
+
+    def _plan_all(self, series: Optional[list[tuple[str, str]]]) -> list[tuple[str, str, Dict]]:
+        """Requêtes de backfill de toutes les séries (ordre des séries conservé)"""
+        if series is None:
+            series = self.candle_store.list_series()
+
+        planned = []
+        for symbol, interval in series:
+            gaps = self.find_gaps(symbol, interval)
+            planned.extend((symbol, interval, request) for request in self.plan_requests(interval, gaps))
+        return planned
+
+    def _apply(self, symbol: str, interval: str, request: Dict, data: Optional[Dict], stats: Dict):
+        """
+        Enregistrer une réponse de backfill
+
+        Les bougies toujours absentes alors que la réponse remonte au-delà
+        sont marquées comme introuvables pour ne plus être redemandées.
+        """
+        if not data or not data.get("values"):
+            stats["failed"] += 1
+            return
+
+        values = data["values"]
+        self.candle_store.save_candles(symbol, interval, values)
+
+        received = {item.get("datetime") for item in values if item.get("datetime")}
+        oldest = min(received)
+        for key in request["missing"]:
+            if key in received:
+                stats["filled"] += 1
+            elif key >= oldest:
+                self.unfillable.add((symbol, interval, key))
+                stats["unfillable"] += 1
+
+    @staticmethod
+    def _new_stats(planned: list) -> Dict:
+        """Compteurs d'un passage de backfill"""
+        return {
+            "planned": len(planned),
+            "requests": 0,
+            "credits": 0,
+            "filled": 0,
+            "unfillable": 0,
+            "failed": 0,
+            "deferred": 0,
+        }
+
+    @staticmethod
+    def _within_budget(stats: Dict, max_credits: Optional[int]) -> bool:
+        """Vérifier si une requête de plus tient dans le budget alloué"""
+        cost = BUDGET_JOB_CREDITS_PER_PAIR["backfill"]
+        return max_credits is None or stats["credits"] + cost <= max_credits
+
+    def backfill(
+        self,
+        series: Optional[list[tuple[str, str]]] = None,
+        max_credits: Optional[int] = None,
+    ) -> Dict:
+        """
+        Combler les trous de l'historique
+
+        Args:
+            series: Couples (symbole, timeframe) à traiter (défaut: tout le stockage)
+            max_credits: Crédits maximum engagés (les requêtes en trop sont différées)
+
+        Returns:
+            Dict {planned, requests, credits, filled, unfillable, failed, deferred}
+        """
+        planned = self._plan_all(series)
+        stats = self._new_stats(planned)
+
+        for symbol, interval, request in planned:
+            if not self._within_budget(stats, max_credits):
+                stats["deferred"] += 1
+                continue
+
+            data = self.api_client.get_time_series_range(
+                symbol, interval, request["output_size"], request["end_date"]
+            )
+            stats["requests"] += 1
+            stats["credits"] += BUDGET_JOB_CREDITS_PER_PAIR["backfill"]
+            self._apply(symbol, interval, request, data, stats)
+
+        self._log(stats)
+        return stats
+
+    async def backfill_async(
+        self,
+        series: Optional[list[tuple[str, str]]] = None,
+        max_credits: Optional[int] = None,
+    ) -> Dict:
+        """Version async de backfill (ne bloque pas la boucle asyncio)"""
+        planned = self._plan_all(series)
+        stats = self._new_stats(planned)
+
+        for symbol, interval, request in planned:
+            if not self._within_budget(stats, max_credits):
+                stats["deferred"] += 1
+                continue
+
+            data = await self.api_client.get_time_series_range_async(
+                symbol, interval, request["output_size"], request["end_date"]
+            )
+            stats["requests"] += 1
+            stats["credits"] += BUDGET_JOB_CREDITS_PER_PAIR["backfill"]
+            self._apply(symbol, interval, request, data, stats)
+
+        self._log(stats)
+        return stats
+
+    @staticmethod
+    def _log(stats: Dict):
+        """Résumer un passage de backfill"""
+        if not stats["planned"]:
+            return
+        logger.info(
+            f"Backfill: {stats['filled']} bougie(s) récupérée(s) en {stats['requests']} requête(s), "
+            f"{stats['unfillable']} introuvable(s), {stats['deferred']} requête(s) différée(s)"
+        )
@@ -0,0 +1,190 @@
+"""
+Flux de prix temps réel Twelve Data (WebSocket)
+"""
+
+import asyncio
+import inspect
+import json
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional, Union
+import websockets
+from config.settings import TWELVEDATA_WS_HEARTBEAT, TWELVEDATA_WS_URL
+from data.resilience import RetryPolicy
+from utils import fast_json
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Callback appelé à chaque tick: (paire, prix, timestamp UNIX)
+TickHandler = Callable[[str, float, int], Union[None, Awaitable[None]]]
+
+
+class PriceStream:
+    """
+    Consommateur du flux de prix (sans crédit REST)
+
+    Garde la dernière cotation de chaque paire abonnée et appelle
+    on_tick à chaque prix reçu. La connexion est rétablie avec backoff
+    et les abonnements sont renvoyés après chaque reconnexion.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        on_tick: Optional[TickHandler] = None,
+        url: str = TWELVEDATA_WS_URL,
+        heartbeat_interval: float = TWELVEDATA_WS_HEARTBEAT,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """
+        Initialiser le flux
+
+        Args:
+            api_key: Clé API Twelve Data
+            on_tick: Callback (sync ou async) appelé à chaque prix
+            url: URL WebSocket (flux local de substitution pour les tests)
+            heartbeat_interval: Intervalle des heartbeats (secondes)
+            retry_policy: Backoff entre reconnexions
+        """
+        self.api_key = api_key
+        self.on_tick = on_tick
+        self.url = url
+        self.heartbeat_interval = heartbeat_interval
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        self.symbols: set[str] = set()
+        self.latest: dict[str, Dict] = {}
+        self.ticks = 0
+        self.reconnects = 0
+        self.connected = asyncio.Event()
+        self._ws = None
+        self._running = False
+
+    def get_quote(self, symbol: str) -> Optional[Dict]:
+        """
+        Dernière cotation reçue pour une paire
+
+        Args:
+            symbol: Paire
+
+        Returns:
+            Dict {price, timestamp} ou None
+        """
+        return self.latest.get(symbol)
+
+    async def set_symbols(self, symbols: list[str]):
+        """
+        Mettre à jour les paires suivies (abonnements envoyés si connecté)
+
+        Args:
+            symbols: Paires à suivre
+        """
+        wanted = set(symbols)
+        added = wanted - self.symbols
+        removed = self.symbols - wanted
+        self.symbols = wanted
+
+        for symbol in removed:
+            self.latest.pop(symbol, None)
+
+        if self._ws is not None:
+            if removed:
+                await self._send("unsubscribe", removed)
+            if added:
+                await self._send("subscribe", added)
+
+    async def _send(self, action: str, symbols: set[str]):
+        """Envoyer un (dés)abonnement"""
+        try:
+            await self._ws.send(json.dumps({
+                "action": action,
+                "params": {"symbols": ",".join(sorted(symbols))},
+            }))
+        except websockets.ConnectionClosed:
+            pass  # renvoyé à la reconnexion
+
+    async def run(self):
+        """Consommer le flux jusqu'à stop() (reconnexion automatique)"""
+        self._running = True
+        attempt = 0
+
+        while self._running:
+            heartbeat = None
+            try:
+                async with websockets.connect(f"{self.url}?apikey={self.api_key}") as ws:
+                    self._ws = ws
+                    attempt = 0
+                    if self.symbols:
+                        await self._send("subscribe", self.symbols)
+                    self.connected.set()
+                    logger.info(f"Flux de prix connecté ({len(self.symbols)} paires)")
+
+                    heartbeat = asyncio.ensure_future(self._heartbeat(ws))
+                    async for raw in ws:
+                        await self._handle(raw)
+
+            except (websockets.WebSocketException, OSError) as e:
+                logger.warning(f"Flux de prix interrompu: {e}")
+
+            finally:
+                self._ws = None
+                self.connected.clear()
+                if heartbeat is not None:
+                    heartbeat.cancel()
+
+            if self._running:
+                delay = self.retry_policy.delay(attempt)
+                attempt += 1
+                self.reconnects += 1
+                logger.info(f"Reconnexion du flux de prix dans {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _heartbeat(self, ws):
+        """Maintenir la connexion ouverte"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await ws.send(json.dumps({"action": "heartbeat"}))
+
+    async def _handle(self, raw: Union[str, bytes]):
+        """
+        Traiter un message du flux
+
+        Args:
+            raw: Message JSON (price, subscribe-status, heartbeat)
+        """
+        try:
+            message = fast_json.loads(raw)
+        except ValueError:
+            logger.warning(f"Message du flux invalide: {raw!r:.100}")
+            return
+
+        event = message.get("event")
+        if event == "subscribe-status":
+            fails = [item.get("symbol") for item in message.get("fails") or []]
+            if fails:
+                logger.error(f"Abonnement refusé: {', '.join(fails)}")
+            return
+
+        if event != "price" or message.get("symbol") not in self.symbols:
+            return
+
+        symbol = message["symbol"]
+        price = float(message.get("price", 0))
+        timestamp = int(message.get("timestamp") or datetime.now(timezone.utc).timestamp())
+        self.latest[symbol] = {"price": price, "timestamp": timestamp}
+        self.ticks += 1
+
+        if self.on_tick is None:
+            return
+        try:
+            result = self.on_tick(symbol, price, timestamp)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Erreur traitement tick {symbol}: {e}")
+
+    async def stop(self):
+        """Arrêter le flux"""
+        self._running = False
+        if self._ws is not None:
+            await self._ws.close()
@@ -0,0 +1,168 @@
+"""
+Rate limiter token-bucket partagé (crédits/minute et crédits/jour Twelve Data)
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+from config.settings import (
+    TWELVEDATA_CREDITS_DAILY_LIMIT,
+    TWELVEDATA_REQUESTS_PER_MINUTE,
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class DailyCreditLimitError(Exception):
+    """Budget quotidien de crédits API épuisé"""
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket thread-safe, utilisable en sync (sleep) ou async (await)
+
+    Chaque appel réserve ses crédits sous verrou puis attend hors verrou:
+    le bucket peut devenir négatif, ce qui met en file les appelants suivants
+    sans que deux coroutines ou threads ne consomment le même jeton.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: int = TWELVEDATA_REQUESTS_PER_MINUTE,
+        daily_limit: int = TWELVEDATA_CREDITS_DAILY_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialiser le limiteur
+
+        Args:
+            rate_per_minute: Crédits autorisés par minute (taille du bucket)
+            daily_limit: Crédits autorisés par jour UTC
+            clock: Horloge monotone (injectable pour les tests)
+        """
+        self.capacity = rate_per_minute
+        self.refill_rate = rate_per_minute / 60
+        self.daily_limit = daily_limit
+        self.clock = clock
+
+        self.tokens = float(rate_per_minute)
+        self.last_refill = clock()
+        self.daily_used = 0
+        self.day = datetime.now(timezone.utc).date()
+
+        self.total_wait = 0.0
+        self.last_wait = 0.0
+        self.acquisitions = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, credits: int) -> float:
+        """
+        Réserver des crédits et calculer l'attente nécessaire
+
+        Args:
+            credits: Crédits consommés par la requête
+
+        Returns:
+            Attente en secondes avant de pouvoir envoyer la requête
+        """
+        with self._lock:
+            today = datetime.now(timezone.utc).date()
+            if today != self.day:
+                self.day = today
+                self.daily_used = 0
+
+            if self.daily_used + credits > self.daily_limit:
+                raise DailyCreditLimitError(
+                    f"Budget quotidien atteint ({self.daily_used}/{self.daily_limit} crédits)"
+                )
+
+            # Remplir le bucket selon le temps écoulé
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+            self.last_refill = now
+
+            self.tokens -= credits
+            self.daily_used += credits
+            wait = max(0.0, -self.tokens / self.refill_rate)
+
+            self.acquisitions += 1
+            self.total_wait += wait
+            self.last_wait = wait
+
+        if wait > 0:
+            logger.warning(f"Rate limit atteint. Attente de {wait:.1f}s...")
+        return wait
+
+    def acquire(self, credits: int = 1) -> float:
+        """
+        Attendre (sleep) la disponibilité des crédits
+
+        Args:
+            credits: Crédits consommés par la requête
+
+        Returns:
+            Temps d'attente en secondes
+        """
+        wait = self._reserve(credits)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, credits: int = 1) -> float:
+        """
+        Attendre (await) la disponibilité des crédits sans bloquer la boucle
+
+        Args:
+            credits: Crédits consommés par la requête
+
+        Returns:
+            Temps d'attente en secondes
+        """
+        wait = self._reserve(credits)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def sync_daily_usage(self, credits_used: int):
+        """
+        Aligner le compteur quotidien sur le journal persistant (après redémarrage)
+
+        Args:
+            credits_used: Crédits déjà consommés aujourd'hui
+        """
+        with self._lock:
+            self.daily_used = max(self.daily_used, credits_used)
+
+    def credits_remaining_today(self) -> int:
+        """Crédits restants pour la journée UTC en cours"""
+        with self._lock:
+            if datetime.now(timezone.utc).date() != self.day:
+                return self.daily_limit
+            return max(0, self.daily_limit - self.daily_used)
+
+    def get_stats(self) -> Dict:
+        """Statistiques d'attente du limiteur"""
+        with self._lock:
+            return {
+                "acquisitions": self.acquisitions,
+                "total_wait": self.total_wait,
+                "last_wait": self.last_wait,
+                "daily_used": self.daily_used,
+                "daily_limit": self.daily_limit,
+            }
+
+
+_shared_rate_limiter: Optional[TokenBucketRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> TokenBucketRateLimiter:
+    """Récupérer le limiteur commun à tous les clients du processus"""
+    global _shared_rate_limiter
+    with _shared_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = TokenBucketRateLimiter()
+        return _shared_rate_limiter
@@ -0,0 +1,386 @@
+"""
+Enregistrement/rejeu des réponses Twelve Data et serveurs locaux de substitution
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import websockets
+from utils.logger import setup_logger
+from utils.timeframes import (
+    bucket_start,
+    format_timestamp,
+    interval_seconds,
+    is_bar_expected,
+    parse_timestamp,
+)
+
+logger = setup_logger(__name__)
+
+
+class ResponseRecorder:
+    """
+    Réponses brutes de l'API stockées sur disque (un fichier JSON par requête)
+
+    La clé d'un enregistrement ignore outputsize: le client le calcule à
+    partir de l'historique local et de l'heure courante, il varierait donc
+    entre l'enregistrement et le rejeu. Une requête est rejouée avec la
+    réponse la plus longue enregistrée pour les mêmes autres paramètres.
+    """
+
+    # Paramètres sans influence sur la réponse (la clé API n'est jamais écrite)
+    IGNORED_PARAMS = ("apikey",)
+    # Paramètres exclus de la clé (dépendants de l'heure de la requête)
+    UNKEYED_PARAMS = ("outputsize",)
+
+    def __init__(self, directory: str):
+        """
+        Initialiser l'enregistreur
+
+        Args:
+            directory: Répertoire des enregistrements
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, endpoint: str, params: Dict) -> str:
+        """Chemin du fichier associé à une requête"""
+        ignored = self.IGNORED_PARAMS + self.UNKEYED_PARAMS
+        key = {k: str(v) for k, v in params.items() if k not in ignored}
+        digest = hashlib.sha1(json.dumps([endpoint, key], sort_keys=True).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{endpoint}_{digest}.json")
+
+    def save(self, endpoint: str, params: Dict, status: int, body: str):
+        """
+        Enregistrer une réponse (succès, rate limit ou erreur)
+
+        Args:
+            endpoint: Endpoint appelé (ex: time_series)
+            params: Paramètres de la requête
+            status: Code HTTP
+            body: Corps brut de la réponse
+        """
+        path = self._path(endpoint, params)
+        if status < 400 and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                previous = json.load(f)
+            # Garder la réponse la plus longue (outputsize hors de la clé)
+            previous_size = int(previous["params"].get("outputsize", 0))
+            if previous["status"] < 400 and previous_size > int(params.get("outputsize", 0)):
+                return
+
+        record = {
+            "endpoint": endpoint,
+            "params": {k: str(v) for k, v in params.items() if k not in self.IGNORED_PARAMS},
+            "status": status,
+            "body": body,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+
+    def load(self, endpoint: str, params: Dict) -> Optional[Tuple[int, str]]:
+        """
+        Relire une réponse enregistrée
+
+        Args:
+            endpoint: Endpoint appelé
+            params: Paramètres de la requête
+
+        Returns:
+            Tuple (code HTTP, corps brut) ou None si absente
+        """
+        path = self._path(endpoint, params)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        return record["status"], record["body"]
+
+
+def synthetic_time_series(symbol: str, interval: str, output_size: int, end: Optional[datetime] = None) -> Dict:
+    """
+    Générer une série déterministe (marche aléatoire) au format Twelve Data
+
+    Args:
+        symbol: Paire (graine de la marche aléatoire)
+        interval: Timeframe (1h, 4h, 1day, 1week)
+        output_size: Nombre de bougies
+        end: Date de la dernière bougie (défaut: bougie en cours)
+
+    Returns:
+        Réponse time_series {meta, values, status}
+    """
+    rng = random.Random(zlib.crc32(f"{symbol}:{interval}".encode()))
+    step = timedelta(seconds=interval_seconds(interval))
+    current = bucket_start(end or datetime.now(timezone.utc), interval)
+
+    timestamps = []
+    while len(timestamps) < output_size:
+        if is_bar_expected(current, interval):
+            timestamps.append(current)
+        current -= step
+
+    price = 100.0 if "JPY" in symbol else 1.0
+    values = []
+    for ts in reversed(timestamps):
+        open_price = price
+        close = open_price * (1 + rng.gauss(0, 0.002))
+        high = max(open_price, close) * (1 + abs(rng.gauss(0, 0.001)))
+        low = min(open_price, close) * (1 - abs(rng.gauss(0, 0.001)))
+        values.append({
+            "datetime": format_timestamp(ts, interval),
+            "open": f"{open_price:.5f}",
+            "high": f"{high:.5f}",
+            "low": f"{low:.5f}",
+            "close": f"{close:.5f}",
+        })
+        price = close
+
+    return {
+        "meta": {"symbol": symbol, "interval": interval, "type": "Physical Currency"},
+        "values": list(reversed(values)),
+        "status": "ok",
+    }
+
+
+class TwelveDataStandInServer:
+    """
+    Serveur HTTP local imitant l'endpoint time_series de Twelve Data
+
+    Sert les réponses enregistrées (ResponseRecorder) si disponibles, sinon
+    une série synthétique déterministe. Les erreurs par symbole et les
+    réponses globales (rate limit 429, erreurs 5xx) peuvent être injectées.
+    """
+
+    def __init__(
+        self,
+        recorder: Optional[ResponseRecorder] = None,
+        errors: Optional[dict[str, str]] = None,
+        latency: float = 0.0,
+        end: Optional[datetime] = None,
+    ):
+        """
+        Initialiser le serveur (démarré par start() ou en context manager)
+
+        Args:
+            recorder: Réponses enregistrées à rejouer
+            errors: Symboles en erreur {symbole: message}
+            latency: Latence simulée par requête (secondes)
+            end: Date de la dernière bougie synthétique
+        """
+        self.recorder = recorder
+        self.errors = errors or {}
+        self.latency = latency
+        self.end = end
+        self.requests: list[Dict] = []
+        self._queued: list[Tuple[int, Dict, float]] = []
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                status, body = server.handle(parsed.path.strip("/"), params)
+
+                payload = body.encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client parti (requête doublée annulée)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def queue_response(self, status: int, body: Dict, count: int = 1, delay: float = 0.0):
+        """
+        Injecter des réponses servies avant toute autre (ex: rate limit)
+
+        Args:
+            status: Code HTTP
+            body: Corps JSON
+            count: Nombre de requêtes concernées
+            delay: Latence supplémentaire de ces réponses (secondes)
+        """
+        with self._lock:
+            self._queued.extend([(status, body, delay)] * count)
+
+    def queue_rate_limit(self, count: int = 1):
+        """Injecter des réponses 429 identiques à celles de Twelve Data"""
+        self.queue_response(429, {
+            "code": 429,
+            "message": "You have run out of API credits for the current minute.",
+            "status": "error",
+        }, count)
+
+    def handle(self, endpoint: str, params: Dict) -> Tuple[int, str]:
+        """
+        Construire la réponse d'une requête
+
+        Args:
+            endpoint: Endpoint demandé
+            params: Paramètres de la requête
+
+        Returns:
+            Tuple (code HTTP, corps JSON)
+        """
+        with self._lock:
+            self.requests.append(params)
+            queued = self._queued.pop(0) if self._queued else None
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if queued is not None:
+            status, body, delay = queued
+            time.sleep(delay)
+            return status, json.dumps(body)
+
+        if self.recorder is not None:
+            recorded = self.recorder.load(endpoint, params)
+            if recorded is not None:
+                return recorded
+
+        if endpoint != "time_series":
+            return 404, json.dumps({"code": 404, "message": f"endpoint inconnu: {endpoint}", "status": "error"})
+
+        symbols = params.get("symbol", "").split(",")
+        interval = params.get("interval", "1h")
+        size = int(params.get("outputsize", 30))
+        end = parse_timestamp(params["end_date"]) if params.get("end_date") else self.end
+
+        entries = {}
+        for symbol in symbols:
+            if symbol in self.errors:
+                entries[symbol] = {"code": 400, "message": self.errors[symbol], "status": "error"}
+            else:
+                entries[symbol] = synthetic_time_series(symbol, interval, size, end)
+
+        body = entries[symbols[0]] if len(symbols) == 1 else entries
+        return 200, json.dumps(body)
+
+    def start(self) -> "TwelveDataStandInServer":
+        """Démarrer le serveur dans un thread"""
+        self._thread.start()
+        logger.info(f"Serveur Twelve Data local démarré: {self.url}")
+        return self
+
+    def stop(self):
+        """Arrêter le serveur"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class PriceFeedStandInServer:
+    """
+    Serveur WebSocket local imitant le flux de prix Twelve Data
+
+    Gère subscribe/unsubscribe/heartbeat; les prix sont poussés par
+    push_price() aux connexions abonnées à la paire.
+    """
+
+    def __init__(self):
+        """Initialiser le serveur (démarré par start() ou en context manager async)"""
+        self.url = None
+        self.messages: list[Dict] = []
+        self._subscriptions: dict = {}
+        self._server = None
+
+    async def _handler(self, ws, *args):
+        """Traiter les messages d'une connexion"""
+        symbols = self._subscriptions.setdefault(ws, set())
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                self.messages.append(message)
+                action = message.get("action")
+                requested = [s for s in message.get("params", {}).get("symbols", "").split(",") if s]
+
+                if action == "subscribe":
+                    symbols.update(requested)
+                    await ws.send(json.dumps({
+                        "event": "subscribe-status",
+                        "status": "ok",
+                        "success": [{"symbol": s} for s in requested],
+                        "fails": [],
+                    }))
+                elif action == "unsubscribe":
+                    symbols.difference_update(requested)
+                elif action == "heartbeat":
+                    await ws.send(json.dumps({"event": "heartbeat", "status": "ok"}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._subscriptions.pop(ws, None)
+
+    def subscribers(self, symbol: str) -> int:
+        """Nombre de connexions abonnées à une paire"""
+        return sum(1 for symbols in self._subscriptions.values() if symbol in symbols)
+
+    async def push_price(self, symbol: str, price: float, timestamp: Optional[int] = None):
+        """
+        Envoyer un prix aux connexions abonnées
+
+        Args:
+            symbol: Paire
+            price: Prix
+            timestamp: Timestamp UNIX (défaut: maintenant)
+        """
+        message = json.dumps({
+            "event": "price",
+            "symbol": symbol,
+            "type": "Physical Currency",
+            "timestamp": timestamp or int(time.time()),
+            "price": price,
+        })
+        for ws, symbols in list(self._subscriptions.items()):
+            if symbol in symbols:
+                await ws.send(message)
+
+    async def disconnect_all(self):
+        """Couper toutes les connexions (test de reconnexion)"""
+        await asyncio.gather(*(ws.close() for ws in list(self._subscriptions)))
+
+    async def start(self) -> "PriceFeedStandInServer":
+        """Démarrer le serveur sur un port libre"""
+        self._server = await websockets.serve(self._handler, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        logger.info(f"Flux de prix local démarré: {self.url}")
+        return self
+
+    async def stop(self):
+        """Arrêter le serveur"""
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
@@ -0,0 +1,85 @@
+"""
+Agrégation locale des bougies H1 en H4, D1 et W1
+"""
+
+from typing import Dict
+from utils.logger import setup_logger
+from utils.timeframes import bucket_start, format_timestamp, parse_timestamp
+
+logger = setup_logger(__name__)
+
+
+class CandleResampler:
+    """Construction des timeframes supérieurs à partir de l'historique H1"""
+
+    # Timeframes constructibles à partir du H1
+    TARGETS = ("4h", "1day", "1week")
+
+    @staticmethod
+    def resample(values: list[Dict], target_interval: str) -> list[Dict]:
+        """
+        Agréger des bougies en bougies du timeframe cible
+
+        Args:
+            values: Bougies sources au format "values" (ordre quelconque)
+            target_interval: Timeframe cible (4h, 1day, 1week)
+
+        Returns:
+            Bougies agrégées au format "values" (la plus récente en premier),
+            la dernière pouvant être en cours de formation
+        """
+        if target_interval not in CandleResampler.TARGETS:
+            raise ValueError(f"Timeframe non agrégeable: {target_interval}")
+
+        buckets = {}
+
+        for item in sorted(values, key=lambda v: v["datetime"]):
+            start = bucket_start(parse_timestamp(item["datetime"]), target_interval)
+            key = format_timestamp(start, target_interval)
+            high = float(item.get("high", 0))
+            low = float(item.get("low", 0))
+            close = float(item.get("close", 0))
+            volume = float(item.get("volume") or 0)
+
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {
+                    "datetime": key,
+                    "open": float(item.get("open", 0)),
+                    "high": high,
+                    "low": low,
+                    "close": close,
+                    "volume": volume,
+                }
+            else:
+                bucket["high"] = max(bucket["high"], high)
+                bucket["low"] = min(bucket["low"], low)
+                bucket["close"] = close
+                bucket["volume"] += volume
+
+        logger.debug(f"Agrégation {target_interval}: {len(values)} -> {len(buckets)} bougies")
+        return [buckets[key] for key in sorted(buckets, reverse=True)]
+
+    @staticmethod
+    def merge_with_native(aggregated: list[Dict], native: list[Dict]) -> list[Dict]:
+        """
+        Compléter les bougies agrégées par l'historique natif plus ancien
+
+        La première bougie agrégée est souvent partielle (l'historique H1
+        commence en cours de période): la bougie native est alors préférée.
+
+        Args:
+            aggregated: Bougies agrégées (la plus récente en premier)
+            native: Bougies natives de l'API (la plus récente en premier)
+
+        Returns:
+            Série fusionnée (la plus récente en premier)
+        """
+        if not aggregated:
+            return list(native)
+
+        oldest_key = aggregated[-1]["datetime"]
+        older = [item for item in native if item["datetime"] < oldest_key]
+        overlap = [item for item in native if item["datetime"] == oldest_key]
+
+        return aggregated[:-1] + (overlap or aggregated[-1:]) + older
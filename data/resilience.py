@@ -0,0 +1,201 @@
+"""
+Résilience des requêtes API: retries avec backoff, circuit breaker, latences
+"""
+
+import math
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from config.settings import (
+    TWELVEDATA_BREAKER_FAILURES,
+    TWELVEDATA_BREAKER_RESET,
+    TWELVEDATA_LATENCY_WINDOW,
+    TWELVEDATA_RETRY_ATTEMPTS,
+    TWELVEDATA_RETRY_BASE_DELAY,
+    TWELVEDATA_RETRY_MAX_DELAY,
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RetryPolicy:
+    """Nombre de tentatives et backoff exponentiel avec jitter complet"""
+
+    def __init__(
+        self,
+        max_attempts: int = TWELVEDATA_RETRY_ATTEMPTS,
+        base_delay: float = TWELVEDATA_RETRY_BASE_DELAY,
+        max_delay: float = TWELVEDATA_RETRY_MAX_DELAY,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Initialiser la politique
+
+        Args:
+            max_attempts: Tentatives maximum (1 = pas de retry)
+            base_delay: Délai de base du backoff (secondes)
+            max_delay: Plafond du délai (secondes)
+            rng: Générateur uniforme [0, 1) (injectable pour les tests)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng
+
+    def delay(self, attempt: int) -> float:
+        """
+        Délai avant la tentative suivante
+
+        Le jitter évite que les appelants en échec ne réessaient tous au
+        même instant (et ne vident ensemble le bucket du rate limiter).
+
+        Args:
+            attempt: Numéro de la tentative échouée (0 = première)
+
+        Returns:
+            Délai en secondes, tiré dans [0, min(max_delay, base * 2^attempt)]
+        """
+        return self.rng() * min(self.max_delay, self.base_delay * 2 ** attempt)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker d'un endpoint (fermé -> ouvert -> semi-ouvert)
+
+    Après failure_threshold échecs consécutifs, les requêtes sont refusées
+    pendant reset_timeout secondes, puis une seule requête d'essai est
+    autorisée: son succès referme le circuit, son échec le rouvre.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = TWELVEDATA_BREAKER_FAILURES,
+        reset_timeout: float = TWELVEDATA_BREAKER_RESET,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialiser le circuit breaker
+
+        Args:
+            name: Endpoint protégé (pour les logs)
+            failure_threshold: Échecs consécutifs avant ouverture
+            reset_timeout: Durée d'ouverture avant la requête d'essai (secondes)
+            clock: Horloge monotone (injectable pour les tests)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Vérifier si une requête peut être envoyée"""
+        with self._lock:
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """
+        Libérer une requête autorisée sans résultat (budget refusé, annulation)
+
+        L'état ne change pas: en semi-ouvert, une nouvelle requête d'essai
+        pourra être autorisée.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        """Enregistrer une réponse valide (referme le circuit)"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit {self.name} refermé")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Enregistrer un échec (timeout, erreur réseau, HTTP 5xx)"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"Circuit {self.name} ouvert pour {self.reset_timeout:.0f}s "
+                        f"({self.failures} échecs consécutifs)"
+                    )
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+                self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Latences des tentatives HTTP sur une fenêtre glissante"""
+
+    def __init__(self, window: int = TWELVEDATA_LATENCY_WINDOW):
+        """
+        Initialiser le suivi
+
+        Args:
+            window: Nombre de tentatives conservées
+        """
+        self.samples: deque = deque(maxlen=window)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """Enregistrer la durée d'une tentative"""
+        with self._lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Calculer un percentile (rang le plus proche)
+
+        Args:
+            p: Percentile entre 0 et 100
+
+        Returns:
+            Latence en secondes ou None sans mesure
+        """
+        with self._lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def get_stats(self) -> Dict:
+        """Nombre de tentatives et percentiles p50/p90/p99 (secondes)"""
+        return {
+            "attempts": self.count,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
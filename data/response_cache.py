@@ -0,0 +1,229 @@
+"""
+Cache des réponses time_series aligné sur la clôture des bougies
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from utils.logger import setup_logger
+from utils.timeframes import bucket_start, interval_seconds
+
+logger = setup_logger(__name__)
+
+
+class _Flight:
+    """Requête HTTP en cours partagée par plusieurs appelants"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.result: Optional[Dict] = None
+        self.event = threading.Event()
+
+
+class BarAwareCache:
+    """
+    Cache en mémoire clé (symbole, timeframe, bougie en cours)
+
+    Une réponse reste valide jusqu'à la clôture de la bougie en cours au
+    moment du fetch: avant cette clôture, aucune nouvelle bougie fermée ne
+    peut apparaître. Une entrée de N bougies sert toute demande <= N.
+    Les appels concurrents sur une même clé partagent un seul fetch
+    (single-flight), en sync comme en async.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        Initialiser le cache
+
+        Args:
+            clock: Horloge (timestamp UNIX, injectable pour les tests)
+        """
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: dict[Tuple[str, str], Tuple[float, int, Dict]] = {}
+        self._inflight: dict[Tuple[str, str], _Flight] = {}
+        self._inflight_async: dict[Tuple[str, str], Tuple[int, asyncio.Future]] = {}
+        self._lock = threading.Lock()
+
+    def bar_close(self, interval: str) -> float:
+        """Timestamp de clôture de la bougie en cours du timeframe"""
+        now = self.clock()
+        close = bucket_start(datetime.fromtimestamp(now, timezone.utc), interval).timestamp()
+
+        # Week-end: la dernière bougie (vendredi) est déjà close
+        while close <= now:
+            close += interval_seconds(interval)
+        return close
+
+    @staticmethod
+    def _slice(data: Dict, size: int) -> Dict:
+        """Restreindre une réponse aux size bougies les plus récentes"""
+        return {**data, "values": data.get("values", [])[:size]}
+
+    def get(self, symbol: str, interval: str, size: int) -> Optional[Dict]:
+        """
+        Lire une réponse valide couvrant au moins size bougies
+
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            size: Nombre de bougies demandées
+
+        Returns:
+            Réponse restreinte à size bougies ou None
+        """
+        with self._lock:
+            return self._get_locked((symbol, interval), size)
+
+    def _get_locked(self, key: Tuple[str, str], size: int) -> Optional[Dict]:
+        """Lecture sous verrou (compte les hits)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, cached_size, data = entry
+        if self.clock() >= expires_at:
+            del self._entries[key]
+            return None
+        if cached_size < size:
+            return None
+
+        self.hits += 1
+        return self._slice(data, size)
+
+    def put(self, symbol: str, interval: str, size: int, data: Dict):
+        """
+        Enregistrer une réponse jusqu'à la clôture de la bougie en cours
+
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            size: Nombre de bougies demandées
+            data: Réponse de l'API
+        """
+        with self._lock:
+            self._put_locked((symbol, interval), size, data)
+
+    def _put_locked(self, key: Tuple[str, str], size: int, data: Dict):
+        """Écriture sous verrou"""
+        self._entries[key] = (self.bar_close(key[1]), size, data)
+
+    def get_or_fetch(
+        self,
+        symbol: str,
+        interval: str,
+        size: int,
+        fetch: Callable[[], Optional[Dict]],
+    ) -> Optional[Dict]:
+        """
+        Lire le cache ou exécuter fetch une seule fois pour tous les appelants
+
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            size: Nombre de bougies demandées
+            fetch: Requête à exécuter en cas d'absence (None = échec, non mis en cache)
+
+        Returns:
+            Réponse ou None
+        """
+        key = (symbol, interval)
+
+        with self._lock:
+            cached = self._get_locked(key, size)
+            if cached is not None:
+                return cached
+
+            flight = self._inflight.get(key)
+            leader = flight is None or flight.size < size
+            if leader:
+                flight = _Flight(size)
+                self._inflight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            return self._slice(flight.result, size) if flight.result is not None else None
+
+        try:
+            flight.result = fetch()
+        finally:
+            with self._lock:
+                if flight.result is not None:
+                    self._put_locked(key, size, flight.result)
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.event.set()
+
+        return flight.result
+
+    async def get_or_fetch_async(
+        self,
+        symbol: str,
+        interval: str,
+        size: int,
+        fetch: Callable[[], Awaitable[Optional[Dict]]],
+    ) -> Optional[Dict]:
+        """Version async de get_or_fetch (les coroutines attendent le même fetch)"""
+        key = (symbol, interval)
+
+        with self._lock:
+            cached = self._get_locked(key, size)
+            if cached is not None:
+                return cached
+
+            inflight = self._inflight_async.get(key)
+            if inflight is not None and inflight[0] >= size:
+                self.coalesced += 1
+                future = inflight[1]
+            else:
+                future = None
+                self.misses += 1
+                own = asyncio.get_running_loop().create_future()
+                self._inflight_async[key] = (size, own)
+
+        if future is not None:
+            result = await asyncio.shield(future)
+            return self._slice(result, size) if result is not None else None
+
+        result = None
+        try:
+            result = await fetch()
+        finally:
+            with self._lock:
+                if result is not None:
+                    self._put_locked(key, size, result)
+                if self._inflight_async.get(key, (0, None))[1] is own:
+                    del self._inflight_async[key]
+            own.set_result(result)
+
+        return result
+
+    def get_stats(self) -> Dict:
+        """Compteurs du cache"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+_shared_response_cache: Optional[BarAwareCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_response_cache() -> BarAwareCache:
+    """Récupérer le cache commun à tous les clients du processus"""
+    global _shared_response_cache
+    with _shared_lock:
+        if _shared_response_cache is None:
+            _shared_response_cache = BarAwareCache()
+        return _shared_response_cache
@@ -2,9 +2,29 @@
 Client Twelve Data avec gestion du rate limiting et des crédits
 """
 
+import asyncio
 import time
+import httpx
 import requests
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from config.settings import (
+    TWELVEDATA_BATCH_MAX_SYMBOLS,
+    TWELVEDATA_CREDITS_DAILY_LIMIT,
+    TWELVEDATA_HEDGE_AFTER,
+    TWELVEDATA_HTTP_TIMEOUT,
+    TWELVEDATA_MAX_CONCURRENCY,
+)
+from data.candle_store import CandleStore
+from data.database import Database
+from data.replay import ResponseRecorder
+from data.resilience import CircuitBreaker, LatencyTracker, RetryPolicy
+from data.response_cache import BarAwareCache, get_shared_response_cache
+from data.rate_limiter import (
+    DailyCreditLimitError,
+    TokenBucketRateLimiter,
+    get_shared_rate_limiter,
+)
+from utils import fast_json
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -15,38 +35,441 @@ class TwelveDataClient:
 
     BASE_URL = "https://api.twelvedata.com"
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        candle_store: Optional[CandleStore] = None,
+        base_url: str = BASE_URL,
+        timeout: float = TWELVEDATA_HTTP_TIMEOUT,
+        max_concurrency: int = TWELVEDATA_MAX_CONCURRENCY,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        credit_ledger: Optional[Database] = None,
+        response_cache: Optional[BarAwareCache] = None,
+        mode: str = "live",
+        recorder: Optional[ResponseRecorder] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_after: Optional[float] = TWELVEDATA_HEDGE_AFTER,
+    ):
         """
         Initialiser le client
         
         Args:
             api_key: Clé API Twelve Data
+            candle_store: Stockage local des bougies (fetch incrémental si fourni)
+            base_url: URL de l'API (serveur local de substitution pour les tests)
+            timeout: Timeout par requête (secondes)
+            max_concurrency: Requêtes async simultanées maximum
+            rate_limiter: Limiteur de débit (défaut: limiteur partagé du processus)
+            credit_ledger: Base de données où journaliser les crédits consommés
+            response_cache: Cache des réponses (défaut: cache partagé du processus)
+            mode: "live", "record" (réponses enregistrées) ou "replay" (hors ligne)
+            recorder: Stockage des réponses pour les modes record et replay
+            retry_policy: Tentatives et backoff (défaut: paramètres TWELVEDATA_RETRY_*)
+            hedge_after: Délai avant de doubler une requête async lente (None = jamais)
         """
+        if mode not in ("live", "record", "replay"):
+            raise ValueError(f"Mode inconnu: {mode}")
+        if mode != "live" and recorder is None:
+            raise ValueError(f"Le mode {mode} nécessite un recorder")
+
         self.api_key = api_key
-        self.requests_per_minute = 0
-        self.last_reset_time = time.time()
-        self.credits_used = 0
-        self.max_credits_daily = 800
-
-    def _check_rate_limit(self):
-        """Vérifier et respecter le rate limit (8 req/min)"""
-        now = time.time()
-        time_since_reset = now - self.last_reset_time
-
-        # Reset le compteur chaque minute
-        if time_since_reset > 60:
-            self.requests_per_minute = 0
-            self.last_reset_time = now
-
-        # Si on a atteint la limite, attendre
-        if self.requests_per_minute >= 8:
-            wait_time = 60 - time_since_reset
-            logger.warning(f"Rate limit atteint. Attente de {wait_time:.1f}s...")
-            time.sleep(wait_time)
-            self.requests_per_minute = 0
-            self.last_reset_time = time.time()
-
-        self.requests_per_minute += 1
+        self.mode = mode
+        self.recorder = recorder
+        self.candle_store = candle_store
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.response_cache = response_cache or get_shared_response_cache()
+        self.last_wait = 0.0
+        self.credit_ledger = credit_ledger
+        self.credits_used = credit_ledger.get_credits_used_today() if credit_ledger else 0
+        self.max_credits_daily = TWELVEDATA_CREDITS_DAILY_LIMIT
+
+        # Retries, circuit breaker par endpoint et latence de chaque tentative
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_after = hedge_after
+        self.circuit_breakers: dict[str, CircuitBreaker] = {}
+        self.latency = LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+
+        # Reprendre la consommation du jour après un redémarrage
+        self.rate_limiter.sync_daily_usage(self.credits_used)
+
+        # Sessions HTTP keep-alive (sync et async), créées une seule fois
+        self.session = requests.Session()
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
+
+    def _check_rate_limit(self, credits: int = 1) -> bool:
+        """
+        Attendre la disponibilité des crédits (token bucket partagé)
+        
+        Args:
+            credits: Crédits consommés par la requête
+        
+        Returns:
+            False si le budget quotidien est épuisé
+        """
+        try:
+            self.last_wait = self.rate_limiter.acquire(credits)
+        except DailyCreditLimitError as e:
+            logger.error(f"Requête refusée: {e}")
+            return False
+
+        logger.debug(f"Attente rate limit: {self.last_wait:.2f}s")
+        return True
+
+    async def _check_rate_limit_async(self, credits: int = 1) -> bool:
+        """Version async de _check_rate_limit (await au lieu de sleep)"""
+        try:
+            self.last_wait = await self.rate_limiter.acquire_async(credits)
+        except DailyCreditLimitError as e:
+            logger.error(f"Requête refusée: {e}")
+            return False
+
+        logger.debug(f"Attente rate limit: {self.last_wait:.2f}s")
+        return True
+
+    def _build_params(
+        self,
+        symbols: list[str],
+        interval: str,
+        output_size: int,
+        end_date: Optional[str] = None,
+    ) -> Dict:
+        """Construire les paramètres d'une requête time_series"""
+        params = {
+            "symbol": ",".join(symbols),
+            "interval": interval,
+            "outputsize": min(output_size, 5000),
+            "format": "JSON",
+            "timezone": "UTC",
+            "apikey": self.api_key,
+        }
+        if end_date:
+            params["end_date"] = end_date
+        return params
+
+    def _request_time_series(
+        self,
+        symbols: list[str],
+        interval: str,
+        output_size: int,
+        end_date: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """
+        Exécuter une requête time_series (un ou plusieurs symboles)
+        
+        Args:
+            symbols: Paires demandées (séparées par des virgules côté API)
+            interval: Timeframe (1week, 1day, 1h)
+            output_size: Nombre de bougies
+            end_date: Date de la dernière bougie (défaut: bougie en cours)
+        
+        Returns:
+            Réponse JSON brute ou None
+        """
+        params = self._build_params(symbols, interval, output_size, end_date)
+        if self.mode == "replay":
+            return self._replay(params)
+
+        breaker = self._breaker("time_series")
+        for attempt in range(self.retry_policy.max_attempts):
+            if not breaker.allow():
+                logger.warning(f"Circuit time_series ouvert, requête {params['symbol']} ignorée")
+                return None
+
+            # Requête d'essai libérée si elle n'aboutit pas (budget épuisé, exception)
+            try:
+                # Twelve Data facture un crédit par symbole, même en batch (retries compris)
+                if not self._check_rate_limit(len(symbols)):
+                    return None
+                self.log_credit_usage(len(symbols), params["symbol"], interval)
+
+                response = self._send(params)
+                retry = self._should_retry(breaker, params["symbol"], response, attempt)
+            finally:
+                breaker.release()
+            if not retry:
+                break
+            time.sleep(self.retry_policy.delay(attempt))
+
+        if response is None:
+            return None
+        return self._handle_response(params, *response)
+
+    def _send(self, params: Dict) -> Optional[Tuple[int, str]]:
+        """Envoyer une tentative HTTP et mesurer sa latence"""
+        start = time.perf_counter()
+        try:
+            response = self.session.get(
+                f"{self.base_url}/time_series",
+                params=params,
+                timeout=self.timeout,
+            )
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Erreur requête pour {params['symbol']}: {e}")
+            return None
+        finally:
+            self.latency.record(time.perf_counter() - start)
+
+        return response.status_code, response.text
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Récupérer le client httpx partagé (pool de connexions keep-alive)"""
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._async_client
+
+    async def _request_time_series_async(
+        self,
+        symbols: list[str],
+        interval: str,
+        output_size: int,
+        end_date: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """Version async de _request_time_series (ne bloque pas la boucle asyncio)"""
+        params = self._build_params(symbols, interval, output_size, end_date)
+        if self.mode == "replay":
+            return self._replay(params)
+
+        client = self._get_async_client()
+        breaker = self._breaker("time_series")
+        for attempt in range(self.retry_policy.max_attempts):
+            if not breaker.allow():
+                logger.warning(f"Circuit time_series ouvert, requête {params['symbol']} ignorée")
+                return None
+
+            try:
+                if not await self._check_rate_limit_async(len(symbols)):
+                    return None
+                self.log_credit_usage(len(symbols), params["symbol"], interval)
+
+                response = await self._send_hedged_async(client, params, len(symbols))
+                retry = self._should_retry(breaker, params["symbol"], response, attempt)
+            finally:
+                breaker.release()  # aussi en cas d'annulation de la coroutine
+            if not retry:
+                break
+            await asyncio.sleep(self.retry_policy.delay(attempt))
+
+        if response is None:
+            return None
+        return self._handle_response(params, *response)
+
+    async def _send_async(self, client: httpx.AsyncClient, params: Dict) -> Optional[Tuple[int, str]]:
+        """Version async de _send"""
+        async with self._async_semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.get("/time_series", params=params)
+            except httpx.HTTPError as e:
+                logger.warning(f"Erreur requête pour {params['symbol']}: {e}")
+                return None
+            finally:
+                self.latency.record(time.perf_counter() - start)
+
+        return response.status_code, response.text
+
+    async def _send_hedged_async(
+        self,
+        client: httpx.AsyncClient,
+        params: Dict,
+        credits: int,
+    ) -> Optional[Tuple[int, str]]:
+        """
+        Envoyer une tentative, doublée si elle dépasse hedge_after
+        
+        La requête doublée passe par le rate limiter et ses crédits sont
+        journalisés; la première réponse valide est gardée, l'autre annulée.
+        
+        Args:
+            client: Client httpx partagé
+            params: Paramètres de la requête
+            credits: Crédits consommés par requête
+        
+        Returns:
+            Tuple (code HTTP, corps) ou None (erreur réseau)
+        """
+        primary = asyncio.ensure_future(self._send_async(client, params))
+        if self.hedge_after is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        if not await self._check_rate_limit_async(credits):
+            return await primary
+
+        self.hedges += 1
+        logger.info(f"Requête {params['symbol']} > {self.hedge_after}s, requête doublée")
+        self.log_credit_usage(credits, params["symbol"], params["interval"])
+        pending = {primary, asyncio.ensure_future(self._send_async(client, params))}
+
+        response = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            response = next((r for r in (task.result() for task in done) if r and r[0] < 500), None)
+            if response is not None:
+                break
+
+        for task in pending:
+            task.cancel()
+        return response
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        """Circuit breaker de l'endpoint (créé au premier appel)"""
+        if endpoint not in self.circuit_breakers:
+            self.circuit_breakers[endpoint] = CircuitBreaker(endpoint)
+        return self.circuit_breakers[endpoint]
+
+    def _should_retry(
+        self,
+        breaker: CircuitBreaker,
+        label: str,
+        response: Optional[Tuple[int, str]],
+        attempt: int,
+    ) -> bool:
+        """
+        Mettre à jour le circuit breaker et décider d'une nouvelle tentative
+        
+        Args:
+            breaker: Circuit breaker de l'endpoint
+            label: Paires demandées (pour les logs)
+            response: Tuple (code HTTP, corps) ou None (erreur réseau)
+            attempt: Numéro de la tentative (0 = première)
+        
+        Returns:
+            True si la requête doit être renvoyée
+        """
+        # Seules les pannes serveur/réseau comptent pour le circuit
+        server_failure = response is None or response[0] >= 500
+        if server_failure:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if not server_failure and not self._is_rate_limited(*response):
+            return False
+
+        if attempt + 1 >= self.retry_policy.max_attempts:
+            logger.error(f"Échec pour {label} après {self.retry_policy.max_attempts} tentatives")
+            return False
+
+        self.retries += 1
+        logger.warning(f"Tentative {attempt + 1}/{self.retry_policy.max_attempts} échouée pour {label}, nouvel essai")
+        return True
+
+    @staticmethod
+    def _is_rate_limited(status: int, body: str) -> bool:
+        """Détecter un rate limit (HTTP 429 ou code 429 dans une réponse 200)"""
+        if status == 429:
+            return True
+
+        # Les réponses d'erreur sont courtes: inutile de décoder une série complète
+        if len(body) > 512:
+            return False
+        try:
+            data = fast_json.loads(body)
+        except ValueError:
+            return False
+        return isinstance(data, dict) and data.get("code") == 429
+
+    def _handle_response(self, params: Dict, status: int, body: str) -> Optional[Dict]:
+        """
+        Décoder une réponse HTTP (et l'enregistrer en mode record)
+        
+        Crédits déjà journalisés à l'envoi de chaque tentative.
+        
+        Args:
+            params: Paramètres de la requête
+            status: Code HTTP
+            body: Corps brut de la réponse
+        
+        Returns:
+            Réponse JSON ou None
+        """
+        if self.mode == "record":
+            self.recorder.save("time_series", params, status, body)
+
+        return self._decode(params["symbol"], status, body)
+
+    def _replay(self, params: Dict) -> Optional[Dict]:
+        """Rejouer une réponse enregistrée (ni rate limit ni crédits)"""
+        recorded = self.recorder.load("time_series", params)
+        if recorded is None:
+            logger.error(f"Aucun enregistrement pour {params['symbol']} {params['interval']}")
+            return None
+
+        return self._decode(params["symbol"], *recorded)
+
+    @staticmethod
+    def _decode(label: str, status: int, body: str) -> Optional[Dict]:
+        """Valider le code HTTP et décoder le JSON"""
+        if status >= 400:
+            logger.error(f"Erreur requête pour {label}: HTTP {status}")
+            return None
+
+        try:
+            return fast_json.loads(body)
+        except ValueError as e:
+            logger.error(f"Réponse invalide pour {label}: {e}")
+            return None
+
+    @staticmethod
+    def _parse_single(symbol: str, data: Optional[Dict]) -> Optional[Dict]:
+        """Valider la réponse d'une requête sur un seul symbole"""
+        if data is None:
+            return None
+
+        if data.get("status") != "ok":
+            logger.error(f"Erreur API pour {symbol}: {data.get('message')}")
+            return None
+
+        return data
+
+    @staticmethod
+    def _split_batch(chunk: list[str], data: Optional[Dict]) -> dict[str, Optional[Dict]]:
+        """Découper une réponse batch en séries par paire"""
+        # Erreur globale (clé invalide, rate limit...)
+        if data is None or data.get("status") == "error":
+            if data is not None:
+                logger.error(f"Erreur API pour {','.join(chunk)}: {data.get('message')}")
+            return {symbol: None for symbol in chunk}
+
+        # Un seul symbole: l'API renvoie la réponse non imbriquée
+        per_symbol = {chunk[0]: data} if len(chunk) == 1 else data
+
+        results = {}
+        for symbol in chunk:
+            entry = per_symbol.get(symbol)
+            if not entry or entry.get("status") != "ok":
+                message = entry.get("message") if entry else "absent de la réponse"
+                logger.error(f"Erreur API pour {symbol}: {message}")
+                results[symbol] = None
+            else:
+                results[symbol] = entry
+
+        return results
+
+    @staticmethod
+    def _chunks(symbols: list[str]) -> list[list[str]]:
+        """Découper les paires en lots de TWELVEDATA_BATCH_MAX_SYMBOLS"""
+        return [
+            symbols[start:start + TWELVEDATA_BATCH_MAX_SYMBOLS]
+            for start in range(0, len(symbols), TWELVEDATA_BATCH_MAX_SYMBOLS)
+        ]
 
     def get_time_series(
         self,
@@ -61,60 +484,331 @@ class TwelveDataClient:
             symbol: Paire (ex: EUR/USD)
             interval: Timeframe (1week, 1day, 1h)
             output_size: Nombre de bougies
-            
+        
         Returns:
             Données de série temporelle ou None
         """
-        self._check_rate_limit()
+        def fetch():
+            data = self._request_time_series([symbol], interval, output_size)
+            return self._parse_single(symbol, data)
 
-        try:
-            params = {
-                "symbol": symbol,
-                "interval": interval,
-                "outputsize": min(output_size, 5000),
-                "format": "JSON",
-                "apikey": self.api_key,
-            }
+        # Une seule requête par paire/timeframe et par bougie, même concurrente
+        return self.response_cache.get_or_fetch(symbol, interval, output_size, fetch)
 
-            response = requests.get(
-                f"{self.BASE_URL}/time_series",
-                params=params,
-                timeout=10,
-            )
-            response.raise_for_status()
+    async def get_time_series_async(
+        self,
+        symbol: str,
+        interval: str,
+        output_size: int = 100,
+    ) -> Optional[Dict]:
+        """Version async de get_time_series"""
+        async def fetch():
+            data = await self._request_time_series_async([symbol], interval, output_size)
+            return self._parse_single(symbol, data)
 
-            data = response.json()
+        return await self.response_cache.get_or_fetch_async(symbol, interval, output_size, fetch)
 
-            if data.get("status") != "ok":
-                logger.error(f"Erreur API pour {symbol}: {data.get('message')}")
-                return None
+    def get_time_series_range(
+        self,
+        symbol: str,
+        interval: str,
+        output_size: int,
+        end_date: str,
+    ) -> Optional[Dict]:
+        """
+        Récupérer les bougies précédant end_date (backfill, hors cache)
+        
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            output_size: Nombre de bougies (max 5000)
+            end_date: Date de fin au format Twelve Data
+        
+        Returns:
+            Données de série temporelle ou None
+        """
+        data = self._request_time_series([symbol], interval, output_size, end_date)
+        return self._parse_single(symbol, data)
 
-            return data
+    async def get_time_series_range_async(
+        self,
+        symbol: str,
+        interval: str,
+        output_size: int,
+        end_date: str,
+    ) -> Optional[Dict]:
+        """Version async de get_time_series_range"""
+        data = await self._request_time_series_async([symbol], interval, output_size, end_date)
+        return self._parse_single(symbol, data)
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Erreur requête pour {symbol}: {e}")
+    def get_time_series_batch(
+        self,
+        symbols: list[str],
+        interval: str,
+        output_size: int = 100,
+    ) -> dict[str, Optional[Dict]]:
+        """
+        Récupérer les séries de plusieurs paires en une requête par lot
+        
+        Args:
+            symbols: Paires (découpées en lots de TWELVEDATA_BATCH_MAX_SYMBOLS)
+            interval: Timeframe (1week, 1day, 1h)
+            output_size: Nombre de bougies par paire
+        
+        Returns:
+            Dict {paire: données de série temporelle ou None}
+        """
+        results = self._cached_series(symbols, interval, output_size)
+        pending = [symbol for symbol in symbols if symbol not in results]
+
+        for chunk in self._chunks(pending):
+            data = self._request_time_series(chunk, interval, output_size)
+            results.update(self._cache_series(self._split_batch(chunk, data), interval, output_size))
+
+        return results
+
+    async def get_time_series_batch_async(
+        self,
+        symbols: list[str],
+        interval: str,
+        output_size: int = 100,
+    ) -> dict[str, Optional[Dict]]:
+        """Version async de get_time_series_batch (lots envoyés en parallèle)"""
+        results = self._cached_series(symbols, interval, output_size)
+        chunks = self._chunks([symbol for symbol in symbols if symbol not in results])
+        responses = await asyncio.gather(*(
+            self._request_time_series_async(chunk, interval, output_size)
+            for chunk in chunks
+        ))
+
+        for chunk, data in zip(chunks, responses):
+            results.update(self._cache_series(self._split_batch(chunk, data), interval, output_size))
+
+        return results
+
+    def _cached_series(self, symbols: list[str], interval: str, output_size: int) -> dict[str, Dict]:
+        """Séries déjà en cache pour la bougie en cours"""
+        results = {}
+        for symbol in symbols:
+            data = self.response_cache.get(symbol, interval, output_size)
+            if data is not None:
+                results[symbol] = data
+        return results
+
+    def _cache_series(
+        self,
+        series: dict[str, Optional[Dict]],
+        interval: str,
+        output_size: int,
+    ) -> dict[str, Optional[Dict]]:
+        """Mettre en cache les séries reçues d'un lot"""
+        for symbol, data in series.items():
+            if data is not None:
+                self.response_cache.put(symbol, interval, output_size, data)
+        return series
+
+    def _merge_fetched(
+        self,
+        symbol: str,
+        interval: str,
+        output_size: int,
+        fetch_size: int,
+        data: Optional[Dict],
+    ) -> Optional[list[Dict]]:
+        """
+        Enregistrer les bougies reçues et relire l'historique local
+        
+        Args:
+            symbol: Paire
+            interval: Timeframe
+            output_size: Nombre de bougies voulues
+            fetch_size: Nombre de bougies demandées à l'API
+            data: Réponse de l'API (ou None en cas d'échec)
+        
+        Returns:
+            Bougies (la plus récente en premier) ou None
+        """
+        if data:
+            self.candle_store.save_candles(symbol, interval, data.get("values", []))
+        elif fetch_size >= output_size:
+            # Historique local insuffisant et API indisponible
             return None
+        else:
+            logger.warning(f"Fetch incrémental échoué pour {symbol} {interval}, données locales utilisées")
+
+        logger.debug(f"{symbol} {interval}: {fetch_size}/{output_size} bougies demandées à l'API")
+        return self.candle_store.get_candles(symbol, interval, output_size)
+
+    def get_candles(
+        self,
+        symbol: str,
+        interval: str,
+        output_size: int,
+    ) -> Optional[list[Dict]]:
+        """
+        Récupérer les bougies en lisant d'abord le stockage local
+        
+        Seules les bougies plus récentes que la dernière stockée sont
+        demandées à l'API (la dernière est rafraîchie car peut-être incomplète).
+        
+        Args:
+            symbol: Paire (ex: EUR/USD)
+            interval: Timeframe (1week, 1day, 1h)
+            output_size: Nombre de bougies
+        
+        Returns:
+            Bougies (la plus récente en premier) ou None
+        """
+        if self.candle_store is None:
+            data = self.get_time_series(symbol, interval, output_size)
+            return data.get("values", []) if data else None
+
+        fetch_size = self.candle_store.bars_to_fetch(symbol, interval, output_size)
+        data = self.get_time_series(symbol, interval, fetch_size)
+        return self._merge_fetched(symbol, interval, output_size, fetch_size, data)
+
+    async def get_candles_async(
+        self,
+        symbol: str,
+        interval: str,
+        output_size: int,
+    ) -> Optional[list[Dict]]:
+        """Version async de get_candles"""
+        if self.candle_store is None:
+            data = await self.get_time_series_async(symbol, interval, output_size)
+            return data.get("values", []) if data else None
+
+        fetch_size = self.candle_store.bars_to_fetch(symbol, interval, output_size)
+        data = await self.get_time_series_async(symbol, interval, fetch_size)
+        return self._merge_fetched(symbol, interval, output_size, fetch_size, data)
+
+    def get_candles_batch(
+        self,
+        symbols: list[str],
+        interval: str,
+        output_size: int,
+    ) -> dict[str, Optional[list[Dict]]]:
+        """
+        Récupérer les bougies de plusieurs paires (requêtes par lot)
+        
+        Avec un stockage local, l'outputsize du lot est le plus grand
+        nombre de bougies manquantes parmi les paires demandées.
+        
+        Args:
+            symbols: Paires
+            interval: Timeframe (1week, 1day, 1h)
+            output_size: Nombre de bougies par paire
+        
+        Returns:
+            Dict {paire: bougies (la plus récente en premier) ou None}
+        """
+        if self.candle_store is None:
+            series = self.get_time_series_batch(symbols, interval, output_size)
+            return {
+                symbol: data.get("values", []) if data else None
+                for symbol, data in series.items()
+            }
+
+        fetch_sizes = {
+            symbol: self.candle_store.bars_to_fetch(symbol, interval, output_size)
+            for symbol in symbols
+        }
+        series = self.get_time_series_batch(symbols, interval, max(fetch_sizes.values(), default=0))
+
+        return {
+            symbol: self._merge_fetched(symbol, interval, output_size, fetch_sizes[symbol], series.get(symbol))
+            for symbol in symbols
+        }
+
+    async def get_candles_batch_async(
+        self,
+        symbols: list[str],
+        interval: str,
+        output_size: int,
+    ) -> dict[str, Optional[list[Dict]]]:
+        """Version async de get_candles_batch"""
+        if self.candle_store is None:
+            series = await self.get_time_series_batch_async(symbols, interval, output_size)
+            return {
+                symbol: data.get("values", []) if data else None
+                for symbol, data in series.items()
+            }
+
+        fetch_sizes = {
+            symbol: self.candle_store.bars_to_fetch(symbol, interval, output_size)
+            for symbol in symbols
+        }
+        series = await self.get_time_series_batch_async(symbols, interval, max(fetch_sizes.values(), default=0))
+
+        return {
+            symbol: self._merge_fetched(symbol, interval, output_size, fetch_sizes[symbol], series.get(symbol))
+            for symbol in symbols
+        }
 
     def get_weekly_candles(self, symbol: str) -> Optional[list[Dict]]:
         """Récupérer les bougies hebdomadaires"""
-        data = self.get_time_series(symbol, "1week", 200)
-        return data.get("values", []) if data else None
+        return self.get_candles(symbol, "1week", 200)
 
     def get_daily_candles(self, symbol: str) -> Optional[list[Dict]]:
         """Récupérer les bougies quotidiennes"""
-        data = self.get_time_series(symbol, "1day", 200)
-        return data.get("values", []) if data else None
+        return self.get_candles(symbol, "1day", 200)
 
     def get_hourly_candles(self, symbol: str) -> Optional[list[Dict]]:
         """Récupérer les bougies horaires"""
-        data = self.get_time_series(symbol, "1h", 100)
-        return data.get("values", []) if data else None
+        return self.get_candles(symbol, "1h", 100)
+
+    async def get_weekly_candles_async(self, symbol: str) -> Optional[list[Dict]]:
+        """Récupérer les bougies hebdomadaires (async)"""
+        return await self.get_candles_async(symbol, "1week", 200)
+
+    async def get_daily_candles_async(self, symbol: str) -> Optional[list[Dict]]:
+        """Récupérer les bougies quotidiennes (async)"""
+        return await self.get_candles_async(symbol, "1day", 200)
+
+    async def get_hourly_candles_async(self, symbol: str) -> Optional[list[Dict]]:
+        """Récupérer les bougies horaires (async)"""
+        return await self.get_candles_async(symbol, "1h", 100)
+
+    def get_fetch_stats(self) -> Dict:
+        """
+        Statistiques des requêtes HTTP
+        
+        Returns:
+            Dict {attempts, p50, p90, p99 (secondes), retries, hedges, circuits}
+        """
+        stats = self.latency.get_stats()
+        stats.update({
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "circuits": {name: breaker.state for name, breaker in self.circuit_breakers.items()},
+        })
+        return stats
 
     def get_credits_remaining(self) -> int:
-        """Calculer les crédits restants (estimation)"""
-        return max(0, self.max_credits_daily - self.credits_used)
+        """Calculer les crédits restants (d'après le limiteur partagé)"""
+        return self.rate_limiter.credits_remaining_today()
 
-    def log_credit_usage(self, amount: int):
-        """Enregistrer l'utilisation de crédits"""
+    def log_credit_usage(self, amount: int, symbols: str = "", interval: str = ""):
+        """
+        Enregistrer l'utilisation de crédits
+        
+        Args:
+            amount: Crédits consommés
+            symbols: Paires demandées
+            interval: Timeframe
+        """
         self.credits_used += amount
+        if self.credit_ledger is not None:
+            self.credit_ledger.log_api_credits("time_series", amount, symbols, interval)
         logger.info(f"Crédits utilisés: {self.credits_used}/{self.max_credits_daily}")
+
+    def close(self):
+        """Fermer la session HTTP synchrone"""
+        self.session.close()
+
+    async def aclose(self):
+        """Fermer les sessions HTTP (sync et async)"""
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
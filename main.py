@@ -10,9 +10,18 @@ import threading
 import os
 from flask import Flask
 from config.secrets import Secrets
-from config.settings import PAIRS
+from config.settings import (
+    PAIRS,
+    CANDLE_STORE_PATH,
+    TWELVEDATA_RECORDINGS_DIR,
+    TWELVEDATA_STREAM_ENABLED,
+)
+from core.analysis_cache import AnalysisCache
 from data.twelvedata_client import TwelveDataClient
 from data.database import Database
+from data.candle_store import CandleStore
+from data.replay import ResponseRecorder
+from data.price_stream import PriceStream
 from bot.telegram_bot import FiboBotManager
 from bot.handlers import CommandHandlers
 from scheduler.jobs import SchedulerManager
@@ -43,6 +52,8 @@ class FiboBotApplication:
         self.db = None
         self.bot_manager = None
         self.scheduler_manager = None
+        self.price_stream = None
+        self.analysis_cache = None
         self.app = None
         self.chat_id = None
 
@@ -54,18 +65,28 @@ class FiboBotApplication:
             telegram_token = Secrets.get_telegram_token()
             twelvedata_key = Secrets.get_twelvedata_api_key()
 
-            # Initialiser le client API
-            self.api_client = TwelveDataClient(twelvedata_key)
-
             # Initialiser la base de données
             self.db = Database("fibo_bot.db")
 
+            # Initialiser le client API (historique local des bougies, journal des crédits)
+            twelvedata_mode = Secrets.get_twelvedata_mode()
+            self.api_client = TwelveDataClient(
+                twelvedata_key,
+                CandleStore(CANDLE_STORE_PATH),
+                credit_ledger=self.db,
+                mode=twelvedata_mode,
+                recorder=ResponseRecorder(TWELVEDATA_RECORDINGS_DIR) if twelvedata_mode != "live" else None,
+            )
+
             # Initialiser le bot Telegram (nouvelle API v20+)
             self.bot_manager = FiboBotManager()
             self.app = await self.bot_manager.setup()
 
+            # Cache des analyses du scanner (scans H1 et ticks), compteurs lus par /status
+            self.analysis_cache = AnalysisCache()
+
             # Initialiser les handlers
-            handlers = CommandHandlers(self.db)
+            handlers = CommandHandlers(self.db, self.api_client, self.analysis_cache)
             self.app.add_handler(CommandHandler("start", handlers.handle_start))
             self.app.add_handler(CommandHandler("status", handlers.handle_status))
             self.app.add_handler(CommandHandler("pairs", handlers.handle_pairs))
@@ -75,9 +96,18 @@ class FiboBotApplication:
 
             self.chat_id = 0
 
+            # Flux de prix temps réel (signaux intrabar, sans crédit REST)
+            if TWELVEDATA_STREAM_ENABLED and twelvedata_mode == "live":
+                self.price_stream = PriceStream(twelvedata_key)
+
             # Initialiser le scheduler
             self.scheduler_manager = SchedulerManager(
-                self.api_client, self.db, self.bot_manager, self.chat_id
+                self.api_client,
+                self.db,
+                self.bot_manager,
+                self.chat_id,
+                self.price_stream,
+                self.analysis_cache,
             )
             self.scheduler_manager.setup()
 
@@ -104,10 +134,14 @@ class FiboBotApplication:
 
     async def stop(self):
         logger.info("🛑 Arrêt du bot...")
+        if self.price_stream:
+            await self.price_stream.stop()
         if self.scheduler_manager:
             self.scheduler_manager.stop()
         if self.app:
             await self.app.stop()
+        if self.api_client:
+            await self.api_client.aclose()
 
 
 async def main():
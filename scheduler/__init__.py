@@ -1,5 +1,6 @@
 """Scheduler package"""
 
 from .jobs import SchedulerManager
+from .budget import BudgetPlanner
 
-__all__ = ["SchedulerManager"]
+__all__ = ["SchedulerManager", "BudgetPlanner"]
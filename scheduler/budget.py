@@ -0,0 +1,158 @@
+"""
+Planification du budget quotidien de crédits API
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from config.settings import (
+    BUDGET_H1_SCAN,
+    BUDGET_JOB_CREDITS_PER_PAIR,
+    BUDGET_SAFETY_MARGIN,
+    PAIRS,
+)
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class BudgetPlanner:
+    """
+    Répartit les crédits restants entre les jobs planifiés de la journée
+
+    Priorités: scan quotidien W1+D1 > scans H1 restants > travaux de fond
+    (backfill). Les jobs de priorité basse sont différés tant qu'ils
+    entameraient la réserve des scans H1 encore à venir aujourd'hui.
+    """
+
+    PRIORITIES = {
+        "daily_scan": 0,
+        "hourly_scan": 1,
+        "backfill": 2,
+    }
+
+    def __init__(
+        self,
+        pairs: list[str] = PAIRS,
+        safety_margin: int = BUDGET_SAFETY_MARGIN,
+    ):
+        """
+        Initialiser le planificateur
+
+        Args:
+            pairs: Univers des paires (l'ordre définit la priorité des paires)
+            safety_margin: Crédits jamais engagés par la planification
+        """
+        self.pairs = pairs
+        self.safety_margin = safety_margin
+
+    @staticmethod
+    def hourly_runs_left(now: datetime) -> int:
+        """Nombre de scans H1 restant aujourd'hui après l'heure courante"""
+        return max(0, 23 - now.hour)
+
+    def reserve_for(
+        self,
+        job: str,
+        now: datetime,
+        expected_hourly_pairs: int = BUDGET_H1_SCAN,
+    ) -> int:
+        """
+        Crédits à garder pour les jobs plus prioritaires encore à venir
+
+        Args:
+            job: Nom du job à planifier
+            now: Date courante (UTC)
+            expected_hourly_pairs: Paires attendues à chaque scan H1
+
+        Returns:
+            Crédits réservés
+        """
+        # Le scan quotidien tombe à 00:00 UTC: il dispose du budget du jour neuf
+        if self.PRIORITIES.get(job, 2) <= self.PRIORITIES["hourly_scan"]:
+            return self.safety_margin
+
+        hourly_cost = expected_hourly_pairs * BUDGET_JOB_CREDITS_PER_PAIR["hourly_scan"]
+        return self.safety_margin + self.hourly_runs_left(now) * hourly_cost
+
+    def credits_available(
+        self,
+        job: str,
+        credits_remaining: int,
+        now: Optional[datetime] = None,
+        expected_hourly_pairs: int = BUDGET_H1_SCAN,
+    ) -> int:
+        """
+        Crédits qu'un job peut engager sans entamer les réserves
+
+        Args:
+            job: Nom du job (daily_scan, hourly_scan, backfill)
+            credits_remaining: Crédits restants aujourd'hui
+            now: Date courante (UTC, défaut: maintenant)
+            expected_hourly_pairs: Paires attendues à chaque scan H1
+
+        Returns:
+            Crédits disponibles
+        """
+        now = now or datetime.now(timezone.utc)
+        available = max(0, credits_remaining - self.reserve_for(job, now, expected_hourly_pairs))
+
+        # Un scan H1 ne consomme que sa part du budget restant de la journée
+        if job == "hourly_scan":
+            available = min(available, credits_remaining // (self.hourly_runs_left(now) + 1))
+        return available
+
+    def plan(
+        self,
+        job: str,
+        pairs: list[str],
+        credits_remaining: int,
+        now: Optional[datetime] = None,
+        expected_hourly_pairs: int = BUDGET_H1_SCAN,
+        intervals: Optional[dict[str, list[str]]] = None,
+    ) -> Dict:
+        """
+        Décider quelles paires récupérer avec le budget restant
+        
+        Args:
+            job: Nom du job (daily_scan, hourly_scan, backfill)
+            pairs: Paires candidates
+            credits_remaining: Crédits restants aujourd'hui
+            now: Date courante (UTC, défaut: maintenant)
+            expected_hourly_pairs: Paires attendues à chaque scan H1
+            intervals: Timeframes réellement demandés par paire (1 crédit chacun),
+                sinon BUDGET_JOB_CREDITS_PER_PAIR du job
+            
+        Returns:
+            Dict {job, pairs, deferred, credits}
+        """
+        now = now or datetime.now(timezone.utc)
+        default_cost = BUDGET_JOB_CREDITS_PER_PAIR.get(job, 1)
+
+        # Paires triées selon l'ordre de priorité de l'univers
+        rank = {symbol: i for i, symbol in enumerate(self.pairs)}
+        ordered = sorted(pairs, key=lambda symbol: rank.get(symbol, len(rank)))
+
+        available = self.credits_available(job, credits_remaining, now, expected_hourly_pairs)
+        selected, deferred = [], []
+        credits = 0
+        for symbol in ordered:
+            cost = len(intervals[symbol]) if intervals is not None and symbol in intervals else default_cost
+            # Priorité stricte: une paire différée diffère toutes les suivantes
+            if deferred or credits + cost > available:
+                deferred.append(symbol)
+                continue
+            selected.append(symbol)
+            credits += cost
+
+        if deferred:
+            logger.warning(
+                f"Budget {job}: {len(deferred)} paire(s) différée(s) "
+                f"({credits_remaining} crédits restants)"
+            )
+
+        return {
+            "job": job,
+            "pairs": selected,
+            "deferred": deferred,
+            "credits": credits,
+        }
@@ -2,17 +2,23 @@
 Jobs du scheduler pour les scans automatiques
 """
 
+import asyncio
 from datetime import datetime
+from typing import Dict, Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 import pytz
 
-from config.settings import PAIRS, SCAN_TIME_DAILY, TIMEZONE
+from config.settings import BACKFILL_HOURS, PAIRS, SCAN_TIME_DAILY, TIMEZONE
+from core.analysis_cache import AnalysisCache
 from core.scanner import ForexScanner
+from scheduler.budget import BudgetPlanner
 from bot.telegram_bot import FiboBotManager
 from data.twelvedata_client import TwelveDataClient
 from data.database import Database
+from data.gap_scanner import GapScanner
+from data.price_stream import PriceStream
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -27,6 +33,8 @@ class SchedulerManager:
         db: Database,
         bot_manager: FiboBotManager,
         chat_id: int,
+        price_stream: Optional[PriceStream] = None,
+        analysis_cache: Optional[AnalysisCache] = None,
     ):
         """
         Initialiser le scheduler
@@ -36,15 +44,29 @@ class SchedulerManager:
             db: Base de données
             bot_manager: Gestionnaire du bot
             chat_id: ID du chat pour les notifications
+            price_stream: Flux de prix temps réel (signaux intrabar si fourni)
+            analysis_cache: Cache des analyses (compteurs affichés par /status)
         """
         self.api_client = api_client
         self.db = db
         self.bot_manager = bot_manager
         self.chat_id = chat_id
-        self.scanner = ForexScanner(api_client, db)
+        self.scanner = ForexScanner(api_client, db, analysis_cache)
+        self.budget_planner = BudgetPlanner(PAIRS)
         self.scheduler = AsyncIOScheduler(timezone=pytz.timezone(TIMEZONE))
         self.aligned_pairs = {}
 
+        # Backfill de l'historique local (client avec stockage des bougies)
+        self.gap_scanner = None
+        if api_client.candle_store is not None:
+            self.gap_scanner = GapScanner(api_client.candle_store, api_client)
+
+        # Chaque tick est évalué contre les zones du dernier scan H1
+        self.price_stream = price_stream
+        self._stream_task: Optional[asyncio.Task] = None
+        if price_stream is not None:
+            price_stream.on_tick = self.on_price_tick
+
     def setup(self):
         """Configurer les jobs"""
         try:
@@ -68,6 +90,15 @@ class SchedulerManager:
                 name="Scan H1 horaire",
             )
 
+            # Job: Backfill des trous de l'historique, avec le budget non réservé
+            if self.gap_scanner is not None:
+                self.scheduler.add_job(
+                    self.job_backfill,
+                    CronTrigger(hour=BACKFILL_HOURS, minute=30, timezone=pytz.UTC),
+                    id="backfill",
+                    name="Backfill de l'historique",
+                )
+
             # Job: Heartbeat toutes les 6 heures
             self.scheduler.add_job(
                 self.job_heartbeat,
@@ -88,8 +119,17 @@ class SchedulerManager:
         try:
             logger.info("🔄 Démarrage du scan quotidien W1+D1...")
 
-            # Scanner les 14 paires
-            self.aligned_pairs = self.scanner.scan_daily_w1_d1(PAIRS)
+            # Paires finançables avec le budget restant
+            plan = self.budget_planner.plan(
+                "daily_scan",
+                PAIRS,
+                self.api_client.get_credits_remaining(),
+                intervals=self.scanner.daily_scan_intervals(PAIRS),
+            )
+
+            # Scanner les paires (sans bloquer la boucle asyncio)
+            self.aligned_pairs = await self.scanner.scan_daily_w1_d1_async(plan["pairs"])
+            await self._sync_stream()
 
             bullish_pairs = [p for p, t in self.aligned_pairs.items() if t == "BULLISH"]
             bearish_pairs = [p for p, t in self.aligned_pairs.items() if t == "BEARISH"]
@@ -117,34 +157,130 @@ class SchedulerManager:
 
             logger.info(f"🔄 Démarrage du scan H1 pour {len(self.aligned_pairs)} paires...")
 
-            for symbol, trend in self.aligned_pairs.items():
+            plan = self.budget_planner.plan(
+                "hourly_scan",
+                list(self.aligned_pairs),
+                self.api_client.get_credits_remaining(),
+                expected_hourly_pairs=len(self.aligned_pairs),
+                intervals={symbol: ["1h"] for symbol in self.aligned_pairs},
+            )
+
+            # Récupérer et analyser toutes les paires en parallèle
+            pairs = [(symbol, self.aligned_pairs[symbol]) for symbol in plan["pairs"]]
+            results = await asyncio.gather(
+                *(self.scanner.scan_hourly_for_signals_async(symbol, trend) for symbol, trend in pairs),
+                return_exceptions=True,
+            )
+
+            for (symbol, trend), signal in zip(pairs, results):
                 try:
-                    signal = self.scanner.scan_hourly_for_signals(symbol, trend)
+                    if isinstance(signal, Exception):
+                        raise signal
 
                     if signal:
                         logger.info(f"✅ Signal détecté: {symbol} {trend}")
-
-                        # Sauvegarder le signal
-                        self.db.save_signal(
-                            symbol=symbol,
-                            timeframe="1h",
-                            signal_type=signal.get("signal_type", ""),
-                            price=signal.get("price", 0),
-                            fib_level=signal.get("fib_zone", ""),
-                            heiken_ashi_confirmed=True,
-                            rsi_divergence=signal.get("rsi_divergence", False),
-                            sr_confluence=signal.get("sr_confluence", False),
-                        )
-
-                        # Envoyer la notification
-                        await self.bot_manager.send_signal_notification(self.chat_id, signal)
+                        await self._publish_signal(symbol, signal)
 
                 except Exception as e:
                     logger.error(f"Erreur scan H1 {symbol}: {e}")
 
+            await self._check_latest_quotes(plan["pairs"])
+
+            stats = self.api_client.get_fetch_stats()
+            if stats["attempts"]:
+                logger.info(
+                    f"Latence API: p50 {stats['p50'] * 1000:.0f}ms, p99 {stats['p99'] * 1000:.0f}ms "
+                    f"({stats['attempts']} tentatives, {stats['retries']} retries, {stats['hedges']} doublées)"
+                )
+
         except Exception as e:
             logger.error(f"Erreur job_hourly_scan: {e}")
 
+    async def _publish_signal(self, symbol: str, signal: Dict):
+        """
+        Sauvegarder un signal et envoyer la notification
+        
+        Args:
+            symbol: Paire
+            signal: Signal détecté (scan H1 ou flux de prix)
+        """
+        self.db.save_signal(
+            symbol=symbol,
+            timeframe="1h",
+            signal_type=signal.get("signal_type", ""),
+            price=signal.get("price", 0),
+            fib_level=signal.get("fib_zone", ""),
+            heiken_ashi_confirmed=True,
+            rsi_divergence=signal.get("rsi_divergence", False),
+            sr_confluence=signal.get("sr_confluence", False),
+        )
+
+        await self.bot_manager.send_signal_notification(self.chat_id, signal)
+
+    async def on_price_tick(self, symbol: str, price: float, timestamp: int):
+        """
+        Évaluer un tick du flux de prix (aucun crédit REST)
+        
+        Args:
+            symbol: Paire
+            price: Dernier prix
+            timestamp: Timestamp UNIX du prix
+        """
+        if symbol not in self.aligned_pairs:
+            return
+
+        signal = self.scanner.check_tick(symbol, price, timestamp)
+        if signal:
+            logger.info(f"✅ Signal intrabar: {symbol} {self.aligned_pairs[symbol]}")
+            await self._publish_signal(symbol, signal)
+
+    async def _check_latest_quotes(self, symbols: list[str]):
+        """
+        Évaluer en un appel les dernières cotations du flux contre les zones du scan
+        
+        Args:
+            symbols: Paires scannées
+        """
+        if self.price_stream is None:
+            return
+
+        quotes = {symbol: self.price_stream.get_quote(symbol) for symbol in symbols}
+        quotes = {symbol: quote for symbol, quote in quotes.items() if quote}
+        if not quotes:
+            return
+
+        now = max(quote["timestamp"] for quote in quotes.values())
+        signals = self.scanner.check_ticks({symbol: quote["price"] for symbol, quote in quotes.items()}, now)
+        for symbol, signal in signals.items():
+            logger.info(f"✅ Signal intrabar: {symbol} {self.aligned_pairs[symbol]}")
+            await self._publish_signal(symbol, signal)
+
+    async def _sync_stream(self):
+        """Suivre dans le flux uniquement les paires alignées"""
+        # Zones d'une paire plus alignée ou dont la tendance s'est inversée
+        for symbol, setup in list(self.scanner.zones.items()):
+            if setup["signal_type"] != self.aligned_pairs.get(symbol, "").lower():
+                self.scanner.drop_zones(symbol)
+        if self.price_stream is not None:
+            await self.price_stream.set_symbols(list(self.aligned_pairs))
+
+    async def job_backfill(self):
+        """Job: Combler les trous de l'historique local"""
+        try:
+            credits = self.budget_planner.credits_available(
+                "backfill",
+                self.api_client.get_credits_remaining(),
+                expected_hourly_pairs=len(self.aligned_pairs),
+            )
+            if credits <= 0:
+                logger.info("Backfill différé: budget réservé aux scans")
+                return
+
+            await self.gap_scanner.backfill_async(max_credits=credits)
+
+        except Exception as e:
+            logger.error(f"Erreur job_backfill: {e}")
+
     async def job_heartbeat(self):
         """Job: Heartbeat"""
         try:
@@ -155,9 +291,11 @@ class SchedulerManager:
             logger.error(f"Erreur job_heartbeat: {e}")
 
     def start(self):
-        """Démarrer le scheduler"""
+        """Démarrer le scheduler (et le flux de prix)"""
         try:
             self.scheduler.start()
+            if self.price_stream is not None:
+                self._stream_task = asyncio.ensure_future(self.price_stream.run())
             logger.info("Scheduler démarré")
         except Exception as e:
             logger.error(f"Erreur démarrage scheduler: {e}")
@@ -166,6 +304,8 @@ class SchedulerManager:
         """Arrêter le scheduler"""
         try:
             self.scheduler.shutdown()
+            if self._stream_task is not None:
+                self._stream_task.cancel()
             logger.info("Scheduler arrêté")
         except Exception as e:
             logger.error(f"Erreur arrêt scheduler: {e}")
@@ -3,10 +3,41 @@
 Tests unitaires du bot Fibonacci
 """
 
+import asyncio
+import json
+import os
+import tempfile
+import shutil
+import sqlite3
 import unittest
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from core.analysis_cache import AnalysisCache
+from core.candles import CandleSeries
 from core.fibonacci import FibonacciCalculator
 from core.heiken_ashi import HeikenAshiAnalyzer
+from core.indicators import IndicatorState, StreamingPivots, atr_series, rsi_series, sma_series, wilder_smoothing
+from core.swings import ZigZag
 from core.technical import TechnicalAnalyzer
+from core.zone_index import ZoneIndex
+from core.zone_tracker import ZoneTracker
+from data.candle_store import CandleStore
+from data.database import Database
+from data.gap_scanner import GapScanner
+from data.resampler import CandleResampler
+from core.scanner import ForexScanner
+from data.price_stream import PriceStream
+from data.replay import (
+    PriceFeedStandInServer,
+    ResponseRecorder,
+    TwelveDataStandInServer,
+    synthetic_time_series,
+)
+from data.resilience import CircuitBreaker, LatencyTracker, RetryPolicy
+from data.response_cache import BarAwareCache
+from data.rate_limiter import DailyCreditLimitError, TokenBucketRateLimiter
+from data.twelvedata_client import TwelveDataClient
+from scheduler.budget import BudgetPlanner
 
 
 class TestFibonacciCalculator(unittest.TestCase):
@@ -24,6 +55,40 @@ class TestFibonacciCalculator(unittest.TestCase):
         self.assertAlmostEqual(levels["level_618"], 1.08764, places=5)
         self.assertAlmostEqual(levels["level_100"], 1.08000, places=5)
 
+    def test_levels_batch_and_zone_mask(self):
+        """Tester les niveaux par lots et le masque de zones contre le calcul unitaire"""
+        highs = np.array([[1.10, 1.12, np.nan], [1.30, 1.28, 1.27]])
+        lows = np.array([[1.08, 1.09, np.nan], [1.25, 1.26, 1.20]])
+
+        levels = FibonacciCalculator.calculate_levels_batch(highs, lows)
+        self.assertEqual(levels.shape, (2, 3, 7))
+        expected = FibonacciCalculator.calculate_levels(1.28, 1.26)
+        np.testing.assert_allclose(levels[1, 1], list(expected.values()))
+
+        zone_min, zone_max = FibonacciCalculator.zone_bounds_batch(levels)
+        mask = FibonacciCalculator.zone_mask([1.089, 1.2685], zone_min, zone_max)
+        self.assertEqual(mask.tolist(), [[True, False, False], [False, True, False]])
+        for row, price in enumerate([1.089, 1.2685]):
+            for col in range(2):
+                single = FibonacciCalculator.calculate_levels(highs[row, col], lows[row, col])
+                self.assertEqual(mask[row, col], FibonacciCalculator.is_price_in_zone(price, single))
+
+        fibs = {"EUR/USD": [{"index": 1, "zone_min": 1.0, "zone_max": 1.1}, {"index": 2, "zone_min": 1.05, "zone_max": 1.2}],
+                "GBP/USD": [{"index": 1, "zone_min": 1.3, "zone_max": 1.4}]}
+        hits = FibonacciCalculator.check_prices_in_zones({"EUR/USD": 1.08, "GBP/USD": 1.2, "USD/JPY": 150.0}, fibs)
+        self.assertEqual(list(hits), ["EUR/USD"])
+        self.assertEqual(hits["EUR/USD"], FibonacciCalculator.check_price_in_any_zone(1.08, fibs["EUR/USD"]))
+
+    def test_multiple_fibonacci_uses_batch_levels(self):
+        """Tester les Fibonacci tracés par lots contre le calcul unitaire"""
+        candles = CandleSeries.from_values(synthetic_time_series("EUR/USD", "1h", 300)["values"], "1h")
+        for mode in ("bullish", "bearish"):
+            for fib in FibonacciCalculator.calculate_multiple_fibonacci(candles, mode=mode):
+                single = FibonacciCalculator.build_fibonacci(
+                    mode, fib["index"], fib["point_a"], fib["point_b"], fib["point_a_idx"], fib["point_b_idx"]
+                )
+                self.assertEqual(fib, single)
+
     def test_is_price_in_zone(self):
         """Tester si le prix est dans la zone GA"""
         high = 1.10000
@@ -51,6 +116,34 @@ class TestFibonacciCalculator(unittest.TestCase):
         self.assertGreater(len(peaks), 0)
         self.assertGreater(len(troughs), 0)
 
+    def test_find_fractals_matches_loop(self):
+        """Tester les fractales vectorisées contre une boucle (égalités comprises)"""
+        rng = np.random.default_rng(3)
+        highs = np.round(rng.normal(0, 1, 2000), 1)  # arrondi: nombreuses égalités
+        lows = highs - 0.5
+
+        for window in (1, 2, 3):
+            for strict in (True, False):
+                expected_peaks, expected_troughs = [], []
+                for i in range(window, len(highs) - window):
+                    left_h, right_h = highs[i - window:i], highs[i + 1:i + window + 1]
+                    left_l, right_l = lows[i - window:i], lows[i + 1:i + window + 1]
+                    left_ok = (highs[i] > left_h).all() if strict else (highs[i] >= left_h).all()
+                    if left_ok and (highs[i] > right_h).all():
+                        expected_peaks.append(i)
+                    left_ok = (lows[i] < left_l).all() if strict else (lows[i] <= left_l).all()
+                    if left_ok and (lows[i] < right_l).all():
+                        expected_troughs.append(i)
+
+                peaks, troughs = FibonacciCalculator.find_fractals(highs, lows, window, strict)
+                self.assertEqual(peaks.tolist(), expected_peaks)
+                self.assertEqual(troughs.tolist(), expected_troughs)
+
+        # Plateau: un seul pivot non strict (dernière bougie), aucun strict
+        plateau = np.array([1.0, 2.0, 2.0, 1.0, 1.5])
+        self.assertEqual(FibonacciCalculator.find_fractals(plateau, plateau, 1, False)[0].tolist(), [2])
+        self.assertEqual(FibonacciCalculator.find_fractals(plateau, plateau, 1, True)[0].tolist(), [])
+
 
 class TestHeikenAshiAnalyzer(unittest.TestCase):
     """Tests de l'analyseur Heiken Ashi"""
@@ -97,6 +190,24 @@ class TestHeikenAshiAnalyzer(unittest.TestCase):
 
         self.assertEqual(change, "red_to_green")
 
+    def test_color_arrays_match_pairwise(self):
+        """Tester les tableaux de changements et de séries de couleur contre les bougies dict"""
+        series = CandleSeries.from_values(synthetic_time_series("EUR/USD", "1h", 300)["values"], "1h")
+        ha = HeikenAshiAnalyzer.convert_to_heiken_ashi(series)
+        bars = list(ha)
+
+        labels = {1: "red_to_green", -1: "green_to_red", 0: "no_change"}
+        changes = HeikenAshiAnalyzer.color_changes(ha)
+        runs = HeikenAshiAnalyzer.run_lengths(series)  # conversion implicite
+        run = 1
+        for i in range(1, len(bars)):
+            self.assertEqual(labels[int(changes[i])], HeikenAshiAnalyzer.detect_color_change(bars[i - 1], bars[i]))
+            run = 1 if changes[i] else run + 1
+            self.assertEqual(runs[i], run)
+            self.assertEqual(HeikenAshiAnalyzer.is_peak_confirmed(ha, i), HeikenAshiAnalyzer.is_peak_confirmed(bars, i))
+            self.assertEqual(HeikenAshiAnalyzer.is_trough_confirmed(ha, i), HeikenAshiAnalyzer.is_trough_confirmed(bars, i))
+        self.assertGreater(np.count_nonzero(changes), 0)
+
 
 class TestTechnicalAnalyzer(unittest.TestCase):
     """Tests de l'analyseur technique"""
@@ -145,6 +256,1139 @@ class TestTechnicalAnalyzer(unittest.TestCase):
         self.assertIsInstance(supports, list)
         self.assertIsInstance(resistances, list)
 
+    def test_sr_clustering_and_confluence(self):
+        """Tester le regroupement des niveaux et la confluence par dichotomie"""
+        clusters = TechnicalAnalyzer.cluster_levels([1.1011, 1.1000, 1.1004, 1.1010, 1.1002], 0.0005)
+
+        self.assertEqual([c["touches"] for c in clusters], [3, 2])
+        self.assertAlmostEqual(clusters[0]["price"], 1.1002)
+        self.assertEqual(TechnicalAnalyzer.nearest_level(1.1008, [c["price"] for c in clusters]), clusters[1]["price"])
+        self.assertTrue(TechnicalAnalyzer.check_sr_confluence(1.0995, [1.0, 1.1002], [1.2]))
+        self.assertFalse(TechnicalAnalyzer.check_sr_confluence(1.15, [1.0, 1.1002], [1.2]))
+
+        # Historique long: chaque pivot compté une fois, niveaux triés
+        series = CandleSeries.from_values(synthetic_time_series("EUR/USD", "1h", 3000)["values"], "1h")
+        levels = TechnicalAnalyzer.find_sr_levels(series)
+        _, troughs = FibonacciCalculator.find_peaks_and_troughs(series, lookback=len(series))
+        prices = [c["price"] for c in levels["supports"]]
+
+        self.assertEqual(sum(c["touches"] for c in levels["supports"]), len(troughs))
+        self.assertLess(len(prices), len(troughs))
+        self.assertEqual(prices, sorted(prices))
+
+
+class TestZigZag(unittest.TestCase):
+    """Tests du moteur de swings ZigZag"""
+
+    def test_swings_alternate_on_reversal(self):
+        """Tester les swings confirmés par un retournement de 1% et les ancrages Fibonacci"""
+        closes = np.array([1.00, 1.02, 1.04, 1.10, 1.095, 1.05, 1.06, 1.07, 1.12, 1.115, 1.114, 1.113])
+        series = CandleSeries(np.arange(12), closes, closes, closes, closes)
+
+        swings = ZigZag.from_series(series, reversal_pct=1.0, reversal_atr=None).swings()
+
+        self.assertEqual([(s["index"], s["type"], s["confirmed"]) for s in swings],
+                         [(0, "low", True), (3, "high", True), (5, "low", True), (8, "high", False)])
+
+        # Sommet en cours 1.12, Fibonacci tirés des creux de swing (pas des micro-creux)
+        fibs = FibonacciCalculator.calculate_multiple_fibonacci(series, "bullish", swings=swings)
+        self.assertEqual([(f["point_b"], f["point_a"]) for f in fibs], [(1.00, 1.12), (1.05, 1.12)])
+
+    def test_incremental_extension_matches_full_pass(self):
+        """Tester l'extension bougie par bougie contre un passage complet"""
+        series = CandleSeries.from_values(synthetic_time_series("EUR/USD", "1h", 3000)["values"], "1h")
+        full = ZigZag.from_series(series, reversal_pct=0.3, reversal_atr=None).swings()
+
+        zigzag = ZigZag(reversal_pct=0.3)
+        for end in range(100, len(series) + 1, 250):
+            zigzag.extend(series[:end])
+        zigzag.extend(series)
+
+        self.assertEqual(zigzag.swings(), full)
+        types = [s["type"] for s in full]
+        self.assertTrue(all(a != b for a, b in zip(types, types[1:])))
+
+
+class TestIndicators(unittest.TestCase):
+    """Tests des séries d'indicateurs vectorisées"""
+
+    def test_wilder_smoothing_matches_recursion(self):
+        """Tester le lissage par blocs contre la récurrence de Wilder"""
+        values = np.random.default_rng(1).random(300)
+        expected = [values[:14].mean()]
+        for value in values[14:]:
+            expected.append((expected[-1] * 13 + value) / 14)
+
+        smoothed = wilder_smoothing(values, 14)
+
+        self.assertTrue(np.isnan(smoothed[:13]).all())
+        np.testing.assert_allclose(smoothed[13:], expected, rtol=1e-12)
+
+    def test_sma_and_rsi_series(self):
+        """Tester les séries SMA et RSI"""
+        closes = np.array([1.10, 1.11, 1.12, 1.11, 1.10, 1.12])
+
+        np.testing.assert_allclose(sma_series(closes, 5)[4:], [1.108, 1.112])
+        self.assertEqual(rsi_series(np.arange(20.0), 14)[-1], 100)
+        self.assertEqual(rsi_series(np.ones(20), 14)[-1], 0)
+
+        rsi = rsi_series(closes, 2)
+        self.assertTrue(np.isnan(rsi[:2]).all())
+        self.assertEqual(TechnicalAnalyzer.calculate_rsi([{"close": c} for c in closes], 2), rsi[-1])
+
+    def test_pivot_divergences(self):
+        """Tester les divergences classiques et cachées entre pivots"""
+        closes = [1.10 + 0.001 * i for i in range(20)]
+        for step, count in ((-0.006, 5), (0.003, 5), (-0.002, 8), (0.002, 3)):
+            closes += [closes[-1] + step * (i + 1) for i in range(count)]
+        candles = [{"close": c, "open": c, "low": c - 0.0005, "high": c + 0.0005} for c in closes]
+
+        # Creux plus bas (chute lente) avec un RSI plus haut qu'après la chute brutale
+        divergences = TechnicalAnalyzer.find_rsi_divergences(candles)
+        self.assertEqual([(d["type"], d["kind"], d["start"], d["end"]) for d in divergences],
+                         [("bullish", "regular", 24, 37)])
+        self.assertTrue(TechnicalAnalyzer.detect_rsi_divergence(candles, "bullish"))
+        self.assertFalse(TechnicalAnalyzer.detect_rsi_divergence(candles, "bearish"))
+
+        # RSI et pivots fournis: sommets plus bas avec RSI plus haut = cachée baissière
+        highs = np.array([1.0, 1.3, 1.0, 1.2, 1.0])
+        series = CandleSeries(np.arange(5), highs, highs, highs - 0.1, highs)
+        rsi = np.array([50.0, 60.0, 50.0, 65.0, 50.0])
+        hidden = TechnicalAnalyzer.find_rsi_divergences(series, rsi=rsi, peaks=[1, 3], troughs=[])
+        self.assertEqual([(d["type"], d["kind"]) for d in hidden], [("bearish", "hidden")])
+
+    def test_online_state_matches_full_recomputation(self):
+        """Tester l'état incrémental (persisté entre scans) contre le calcul complet"""
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            db = Database(db_path)
+            series = CandleSeries.from_values(
+                synthetic_time_series("EUR/USD", "1h", 300, datetime(2024, 3, 1, tzinfo=timezone.utc))["values"], "1h"
+            )
+
+            for end in range(230, 301):
+                saved = db.get_indicator_state("EUR/USD", "1h")
+                state = IndicatorState.from_dict(saved) if saved else IndicatorState()
+                window = series[:end]
+                state.advance(window)
+                db.save_indicator_state("EUR/USD", "1h", state.to_dict())
+                snapshot = state.snapshot(window)
+
+                self.assertAlmostEqual(snapshot["sma"], sma_series(window.close, 200)[-1], places=12)
+                self.assertAlmostEqual(snapshot["rsi"], rsi_series(window.close, 14)[-1], places=9)
+                ha = HeikenAshiAnalyzer.convert_to_heiken_ashi(window)[-1]
+                self.assertAlmostEqual(snapshot["ha"]["ha_open"], ha["ha_open"], places=12)
+
+            # Série sans recouvrement avec l'état: repartir de zéro
+            self.assertEqual(state.advance(series[:50]), 49)
+            self.assertIsNone(state.snapshot(series[:50])["sma"])
+        finally:
+            os.remove(db_path)
+
+    def test_streaming_pivots_match_batch(self):
+        """Tester les pivots et S/R incrémentaux contre le calcul sur la fenêtre"""
+        series = CandleSeries.from_values(
+            synthetic_time_series("GBP/USD", "1h", 200, datetime(2024, 3, 1, tzinfo=timezone.utc))["values"], "1h"
+        )
+        pivots = StreamingPivots(window=1, lookback=50)
+
+        for i in range(len(series)):
+            pivots = StreamingPivots.from_dict(json.loads(json.dumps(pivots.to_dict())))
+            pivots.update(float(series.high[i]), float(series.low[i]), float(series.close[i]))
+            if i < 60:
+                continue
+
+            closed = series[:i + 1]
+            peaks, troughs = FibonacciCalculator.find_peaks_and_troughs(closed, 50)
+            self.assertEqual([index for index, _ in pivots.peaks], peaks)
+            self.assertEqual([index for index, _ in pivots.troughs], troughs)
+            self.assertEqual(pivots.levels(0.0005), TechnicalAnalyzer.find_sr_levels(closed, 50, tolerance=0.0005))
+
+        atr = atr_series(series.high, series.low, series.close, 14)[-1]
+        self.assertAlmostEqual(pivots.atr.value, atr, places=12)
+
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_values(start_hour: int, count: int, base: datetime = BASE_TIME) -> list[dict]:
+    """Générer des bougies H1 au format Twelve Data (la plus récente en premier)"""
+    values = []
+    for hour in range(start_hour, start_hour + count):
+        values.append({
+            "datetime": (base + timedelta(hours=hour)).strftime("%Y-%m-%d %H:%M:%S"),
+            "open": "1.10000",
+            "high": "1.10100",
+            "low": "1.09900",
+            "close": f"{1.1 + hour / 10000:.5f}",
+        })
+    return list(reversed(values))
+
+
+class TestCandleSeries(unittest.TestCase):
+    """Tests de la série de bougies en colonnes"""
+
+    def setUp(self):
+        self.values = make_values(0, 60)
+        for i, item in enumerate(self.values):
+            item["high"] = f"{1.101 + (i % 7) / 1000:.5f}"
+            item["low"] = f"{1.099 - (i % 5) / 1000:.5f}"
+        self.series = CandleSeries.from_values(self.values, "1h")
+        self.candles = [self.series.bar(i) for i in range(len(self.series))]
+
+    def test_from_values_is_chronological(self):
+        """Tester le tri chronologique des "values" Twelve Data"""
+        self.assertEqual(len(self.series), 60)
+        self.assertTrue(np.all(np.diff(self.series.timestamp) > 0))
+        self.assertEqual(self.series[-1]["timestamp"], self.values[0]["datetime"])
+        self.assertAlmostEqual(self.series[-1]["close"], float(self.values[0]["close"]))
+
+    def test_slice_is_zero_copy(self):
+        """Tester qu'un slice partage les colonnes"""
+        window = self.series[-20:]
+
+        self.assertIsInstance(window, CandleSeries)
+        self.assertEqual(len(window), 20)
+        self.assertTrue(np.shares_memory(window.close, self.series.close))
+        self.assertLessEqual(self.series.nbytes / len(self.series), 48)
+
+    def test_analyzers_match_dict_candles(self):
+        """Tester que les analyseurs donnent le même résultat sur série et dicts"""
+        self.assertAlmostEqual(
+            TechnicalAnalyzer.calculate_sma(self.series, 20),
+            TechnicalAnalyzer.calculate_sma(self.candles, 20),
+        )
+        self.assertAlmostEqual(
+            TechnicalAnalyzer.calculate_rsi(self.series),
+            TechnicalAnalyzer.calculate_rsi(self.candles),
+        )
+        self.assertEqual(
+            FibonacciCalculator.find_peaks_and_troughs(self.series),
+            FibonacciCalculator.find_peaks_and_troughs(self.candles),
+        )
+        self.assertEqual(
+            FibonacciCalculator.calculate_multiple_fibonacci(self.series, "bearish"),
+            FibonacciCalculator.calculate_multiple_fibonacci(self.candles, "bearish"),
+        )
+
+    def test_heiken_ashi_columns(self):
+        """Tester les colonnes Heiken Ashi contre le calcul bougie par bougie"""
+        ha = HeikenAshiAnalyzer.convert_to_heiken_ashi(self.series)
+
+        self.assertTrue(np.shares_memory(ha.close, self.series.close))
+        prev_open = prev_close = None
+        for i, candle in enumerate(self.candles):
+            ha_close = (candle["open"] + candle["high"] + candle["low"] + candle["close"]) / 4
+            ha_open = (candle["open"] + candle["close"]) / 2 if i == 0 else (prev_open + prev_close) / 2
+            self.assertAlmostEqual(ha.ha_open[i], ha_open)
+            self.assertAlmostEqual(ha.ha_close[i], ha_close)
+            self.assertAlmostEqual(ha.ha_high[i], max(candle["high"], ha_open, ha_close))
+            prev_open, prev_close = ha_open, ha_close
+
+
+class TestAnalysisCache(unittest.TestCase):
+    """Tests du cache des analyses par bougie"""
+
+    def setUp(self):
+        self.series = CandleSeries.from_values(synthetic_time_series("EUR/USD", "1h", 100)["values"], "1h")
+
+    def test_lru_eviction_and_counters(self):
+        """Tester la clé par bougie et paramètres, l'éviction LRU et les compteurs"""
+        cache = AnalysisCache(max_entries=2)
+        calls = []
+
+        def compute(name):
+            calls.append(name)
+            return name
+
+        cache.get_or_compute("EUR/USD", "1h", self.series, "pivots", lambda: compute("a"), lookback=50)
+        cache.get_or_compute("EUR/USD", "1h", self.series, "pivots", lambda: compute("b"), lookback=20)
+        cache.get_or_compute("EUR/USD", "1h", self.series, "pivots", lambda: compute("a"), lookback=50)
+        cache.get_or_compute("EUR/USD", "1h", self.series, "sr", lambda: compute("c"))
+
+        # Nouvelle bougie: nouvelle clé
+        cache.get_or_compute("EUR/USD", "1h", self.series[:-1], "sr", lambda: compute("d"))
+
+        self.assertEqual(calls, ["a", "b", "c", "d"])
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["entries"]), (1, 4, 2, 2))
+
+    def test_scanner_computes_pivots_once(self):
+        """Tester que Fibonacci, S/R et ticks réutilisent les pivots de la bougie"""
+        cache = AnalysisCache()
+        scanner = ForexScanner(None, None, cache)
+        values = synthetic_time_series("EUR/USD", "1h", 100)["values"]
+        h1_candles = scanner._convert_candles(values, "1h")
+
+        # Sans état incrémental à jour: pivots calculés une fois puis relus
+        for _ in range(2):
+            scanner._build_signal("EUR/USD", "bullish", 1.0, {"fib_index": 1}, [], h1_candles)
+        keys = [key[3] for key in cache._entries]
+        self.assertEqual(keys.count("pivots"), 2)  # lookback S/R et historique complet (RSI)
+        self.assertEqual(keys.count("rsi"), 1)
+        self.assertGreater(cache.hits, 0)
+
+        # Divergence baissière: RSI et pivots intermédiaires relus
+        misses = cache.misses
+        scanner._build_signal("EUR/USD", "bearish", 1.0, {"fib_index": 1}, [], h1_candles)
+        self.assertEqual(cache.misses, misses + 1)  # seul rsi_divergence (bearish) est calculé
+
+        # État H1 à jour: S/R lus depuis les pivots incrémentaux
+        cache.clear()
+        for _ in range(2):
+            scanner._analyze_hourly("EUR/USD", "BULLISH", values)
+            signal = scanner._build_signal("EUR/USD", "bullish", 1.0, {"fib_index": 1}, [], h1_candles)
+        keys = [key[3] for key in cache._entries]
+        self.assertNotIn("support_resistance", keys)
+        self.assertIsInstance(signal["sr_confluence"], bool)
+
+
+class TestZoneIndex(unittest.TestCase):
+    """Tests de l'index des zones actives"""
+
+    def test_queries_match_linear_scan(self):
+        """Tester contenance et zone la plus proche contre un parcours linéaire"""
+        rng = np.random.default_rng(5)
+        index = ZoneIndex()
+        zones = {}
+        for key in range(40):
+            low = round(float(rng.uniform(1.0, 1.2)), 3)
+            high = round(low + float(rng.uniform(-0.005, 0.03)), 3)  # quelques zones vides (low > high)
+            index.insert("EUR/USD", key, low, high)
+            zones[key] = (low, high)
+        index.insert("GBP/USD", 0, 1.25, 1.26)
+
+        for price in np.round(rng.uniform(0.95, 1.25, 300), 3).tolist() + [low for low, _ in zones.values()]:
+            expected = [key for key, (low, high) in zones.items() if low <= price <= high]
+            self.assertEqual([zone["key"] for zone in index.containing("EUR/USD", price)], expected)
+
+            distances = [
+                0.0 if low <= price <= high else min(abs(low - price), abs(price - high))
+                for low, high in zones.values() if low <= high
+            ]
+            zone, distance = index.nearest("EUR/USD", price)
+            self.assertAlmostEqual(distance, min(distances))
+
+        self.assertEqual(index.containing("GBP/USD", 1.1), [])
+        self.assertEqual(index.nearest("GBP/USD", 1.1)[0]["key"], 0)
+
+    def test_expire_and_scanner_zones(self):
+        """Tester l'expiration des zones et leur remplacement à chaque scan"""
+        index = ZoneIndex()
+        index.replace("EUR/USD", [(1, 1.10, 1.11, None), (2, 1.105, 1.12, None)], expires_at=100)
+        index.insert("EUR/USD", 3, 1.0, 1.2, expires_at=200)
+        self.assertEqual([zone["key"] for zone in index.containing("EUR/USD", 1.108)], [1, 2, 3])
+
+        self.assertEqual(index.expire(100), 2)
+        self.assertEqual([zone["key"] for zone in index.containing("EUR/USD", 1.108)], [3])
+        self.assertEqual(index.remove("EUR/USD"), 1)
+        self.assertEqual(len(index), 0)
+
+        # Une échéance périmée (zone remplacée) ne retire pas la nouvelle zone
+        index.replace("GBP/USD", [(1, 1.25, 1.26, None)], expires_at=300)
+        index.replace("GBP/USD", [(1, 1.25, 1.26, None)], expires_at=400)
+        self.assertEqual(index.expire(300), 0)
+        self.assertEqual(len(index.containing("GBP/USD", 1.255)), 1)
+        self.assertEqual(index.expire(400), 1)
+        self.assertEqual(index._expiries, [])
+
+        # Scanner: zones expirées avec le flux de prix
+        scanner = ForexScanner(None, None)
+        candles = CandleSeries.from_values(make_values(0, 60), "1h")
+        fibs = [{"index": 1, "zone_min": 1.14, "zone_max": 1.15}]
+        scanner._cache_zones("EUR/USD", "bearish", fibs, candles, ha_confirmed=True)
+        expiry = int(candles.timestamp[-1]) + 2 * 3600
+        self.assertIsNone(scanner.check_tick("EUR/USD", 1.145, expiry))
+        self.assertEqual(len(scanner.zone_index), 0)
+
+
+class TestZoneTracker(unittest.TestCase):
+    """Tests du suivi des zones actives"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_migrates_legacy_active_zones(self):
+        """Tester l'ajout des colonnes de suivi à une table active_zones existante"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE active_zones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT NOT NULL, zone_type TEXT NOT NULL,
+                high REAL NOT NULL, low REAL NOT NULL, level_500 REAL NOT NULL, level_618 REAL NOT NULL,
+                status TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+        db = Database(self.db_path)
+        zone = {"zone_type": "bearish", "high": 1.2, "low": 1.1, "level_500": 1.15, "level_618": 1.1382,
+                "status": "untouched", "fib_index": 1, "point_a_time": 10, "point_b_time": 20,
+                "anchor_key": "k", "last_timestamp": 20}
+        [zone_id] = db.replace_active_zones("EUR/USD", [zone])
+        self.assertTrue(db.update_zone_status(zone_id, "touched", 30))
+        row = db.get_active_zones("EUR/USD")[0]
+        self.assertEqual((row["status"], row["last_timestamp"], row["anchor_key"]), ("touched", 30, "k"))
+
+    def test_statuses_follow_new_bars_and_restart(self):
+        """Tester les statuts incrémentaux contre un recalcul complet, redémarrage compris"""
+        db = Database(self.db_path)
+        series = CandleSeries.from_values(
+            synthetic_time_series("EUR/USD", "1h", 200, datetime(2024, 3, 1, tzinfo=timezone.utc))["values"], "1h"
+        )
+        swings = [{"index": 5, "type": "high"}, {"index": 9, "type": "low"}]
+        calls = []
+
+        def compute_fibs(window):
+            calls.append(len(window))
+            high, low = float(series.high.max()), float(series.low.min())
+            return [FibonacciCalculator.build_fibonacci("bearish", 1, high, low, 5, 9)]
+
+        tracker = ZoneTracker(db)
+        for end in range(60, 201):
+            if end == 130:
+                tracker = ZoneTracker(db)  # redémarrage: zones relues en base
+            window = series[:end]
+            fibs = tracker.update("EUR/USD", "bearish", window, swings, lambda: compute_fibs(window))
+        self.assertEqual(calls, [60])
+
+        # Recalcul complet depuis le second ancrage (bougie 9)
+        ha = HeikenAshiAnalyzer.convert_to_heiken_ashi(series[:-1])
+
+        def replay(fib):
+            zone = {"zone_type": "bearish", "status": "untouched",
+                    "level_500": fib["levels"]["level_500"], "level_618": fib["levels"]["level_618"]}
+            for i in range(10, len(series) - 1):
+                zone["status"] = ZoneTracker._next_status(zone, float(series.high[i]), float(series.low[i]), ha[i])
+            return zone["status"]
+
+        status = replay(fibs[0])
+        self.assertEqual(fibs[0]["status"], status)
+        self.assertEqual(db.get_active_zones("EUR/USD")[0]["status"], status)
+        self.assertNotEqual(status, "untouched")
+
+        # Nouveau swing: ancrages recalculés, historique depuis l'ancrage rejoué
+        swings = swings + [{"index": 150, "type": "high"}]
+        fibs = tracker.update("EUR/USD", "bearish", series, swings, lambda: compute_fibs(series))
+        self.assertEqual(calls, [60, 200])
+        self.assertEqual(fibs[0]["status"], replay(fibs[0]))
+
+    def test_history_since_anchor_and_window(self):
+        """Tester qu'une zone déjà cassée à la création ne signale pas, et l'ancrage hors fenêtre"""
+        series = CandleSeries.from_values(synthetic_time_series("EUR/USD", "1h", 120)["values"], "1h")
+        low_idx = int(np.argmin(series.low[:40]))
+        high_idx = low_idx + int(np.argmax(series.high[low_idx:60]))
+        fib = FibonacciCalculator.build_fibonacci(
+            "bearish", 1, float(series.high[high_idx]), float(series.low[low_idx]), high_idx, low_idx
+        )
+        swings = [{"index": low_idx, "type": "low"}, {"index": high_idx, "type": "high"}]
+
+        tracker = ZoneTracker()
+        [tracked] = tracker.update("EUR/USD", "bearish", series, swings, lambda: [fib])
+        ha = HeikenAshiAnalyzer.convert_to_heiken_ashi(series[:-1])
+        zone = {"zone_type": "bearish", "status": "untouched",
+                "level_500": fib["levels"]["level_500"], "level_618": fib["levels"]["level_618"]}
+        for i in range(high_idx + 1, len(series) - 1):
+            zone["status"] = ZoneTracker._next_status(zone, float(series.high[i]), float(series.low[i]), ha[i])
+        self.assertEqual(tracked["status"], zone["status"])
+        self.assertNotEqual(tracked["status"], "untouched")
+
+        # Fenêtre qui ne contient plus l'ancrage: zone ignorée plutôt que placée à l'indice 0
+        stored = tracker.get_zones("EUR/USD")[0]
+        self.assertIsNone(ZoneTracker._to_fib(stored, series[low_idx + 1:]))
+        self.assertIsNotNone(ZoneTracker._to_fib(stored, series[low_idx:]))
+
+    def test_pending_leg_keeps_zones(self):
+        """Tester qu'une jambe en cours qui s'étend garde les mêmes zones (ids compris)"""
+        db = Database(self.db_path)
+        series = CandleSeries.from_values(synthetic_time_series("EUR/USD", "1h", 60)["values"], "1h")
+        confirmed = [{"index": 5, "type": "high", "confirmed": True}, {"index": 9, "type": "low", "confirmed": True}]
+        calls = []
+
+        def compute_fibs():
+            calls.append(1)
+            return [FibonacciCalculator.build_fibonacci("bearish", 1, 1.2, 1.1, 5, 9)]
+
+        tracker = ZoneTracker(db)
+        ids = []
+        for pending in (20, 30, 40):
+            swings = confirmed + [{"index": pending, "type": "high", "confirmed": False}]
+            tracker.update("EUR/USD", "bearish", series, swings, compute_fibs)
+            ids.append([zone["id"] for zone in db.get_active_zones("EUR/USD")])
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(ids[0], ids[-1])
+
+    def test_broken_zones_do_not_signal(self):
+        """Tester qu'une zone cassée ne signale plus et sort de l'index des ticks"""
+        scanner = ForexScanner(None, None)
+        candles = CandleSeries.from_values(synthetic_time_series("EUR/USD", "1h", 200)["values"], "1h")
+        fibs = scanner._fibonacci("EUR/USD", candles, "bearish")
+        self.assertTrue(fibs)
+        fib = fibs[0]
+        price = (fib["zone_min"] + fib["zone_max"]) / 2
+        ha_bearish = {"ha_open": 1.0, "ha_close": 0.9}
+
+        signal = scanner._detect_bearish_signal("EUR/USD", candles, ha_bearish, price)
+        self.assertIsNotNone(signal)
+
+        # Zone cassée par une bougie close: ni signal H1 ni zone pour le flux de prix
+        for zone in scanner.zone_tracker.get_zones("EUR/USD"):
+            if zone["fib_index"] == fib["index"]:
+                zone["status"] = "broken"
+        signal = scanner._detect_bearish_signal("EUR/USD", candles, ha_bearish, price)
+        self.assertTrue(signal is None or signal["fib_index"] != fib["index"])
+        self.assertNotIn(fib["index"], [zone["key"] for zone in scanner.zone_index.containing("EUR/USD", price)])
+        self.assertNotIn(fib["index"], [f["index"] for f in scanner.zones["EUR/USD"]["fibs"]])
+
+
+class TestCandleStore(unittest.TestCase):
+    """Tests du stockage local des bougies"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.store = CandleStore(self.db_path)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_save_and_get_candles(self):
+        """Tester l'upsert et la lecture des bougies"""
+        self.store.save_candles("EUR/USD", "1h", make_values(0, 5))
+        self.store.save_candles("EUR/USD", "1h", make_values(4, 2))
+
+        candles = self.store.get_candles("EUR/USD", "1h", 10)
+
+        self.assertEqual(len(candles), 6)
+        self.assertEqual(candles[0]["datetime"], "2024-01-01 05:00:00")
+        self.assertEqual(self.store.get_last_timestamp("EUR/USD", "1h"), "2024-01-01 05:00:00")
+
+    def test_save_columns_match_values(self):
+        """Tester l'enregistrement en colonnes contre la conversion champ par champ"""
+        for interval in ("1h", "1day"):
+            values = synthetic_time_series("EUR/USD", interval, 50)["values"]
+            values[3]["volume"] = "12"
+            self.store.save_candles("EUR/USD", interval, values)
+
+            stored = self.store.get_candles("EUR/USD", interval, 100)
+            self.assertEqual([c["datetime"] for c in stored], [v["datetime"] for v in values])
+            self.assertEqual(
+                [(c["open"], c["close"], c["volume"]) for c in stored],
+                [(float(v["open"]), float(v["close"]), float(v.get("volume") or 0)) for v in values],
+            )
+
+    def test_bars_to_fetch(self):
+        """Tester le calcul de l'outputsize incrémental"""
+        now = datetime(2024, 1, 1, 7, 30, tzinfo=timezone.utc)
+
+        # Historique insuffisant: fetch complet
+        self.assertEqual(self.store.bars_to_fetch("EUR/USD", "1h", 5, now), 5)
+
+        self.store.save_candles("EUR/USD", "1h", make_values(0, 6))
+
+        # Dernière bougie 05:00, maintenant 07:30: 05:00 + 06:00 + 07:00
+        self.assertEqual(self.store.bars_to_fetch("EUR/USD", "1h", 5, now), 3)
+
+    def test_client_incremental_fetch(self):
+        """Tester que le client ne demande que les bougies manquantes"""
+        requested = []
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+        class FakeClient(TwelveDataClient):
+            def get_time_series(self, symbol, interval, output_size=100):
+                requested.append(output_size)
+                return {"status": "ok", "values": make_values(1 - output_size, output_size, now)}
+
+        client = FakeClient("demo", self.store)
+
+        first = client.get_candles("EUR/USD", "1h", 50)
+        second = client.get_candles("EUR/USD", "1h", 50)
+
+        self.assertEqual(len(first), 50)
+        self.assertEqual(len(second), 50)
+        self.assertEqual(requested[0], 50)
+        self.assertLess(requested[1], 50)
+
+
+class TestGapScanner(unittest.TestCase):
+    """Tests de la détection des trous et du backfill"""
+
+    END = datetime(2024, 1, 12, 12, tzinfo=timezone.utc)
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.store = CandleStore(self.db_path)
+
+        # 200 bougies H1 à cheval sur le week-end du 6-7 janvier, deux trous
+        values = synthetic_time_series("EUR/USD", "1h", 200, self.END)["values"]
+        self.removed = [v["datetime"] for v in values[20:25] + values[150:153]]
+        self.store.save_candles("EUR/USD", "1h", [v for v in values if v["datetime"] not in self.removed])
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_find_gaps_skips_weekend(self):
+        """Tester que seules les bougies de session manquantes sont des trous"""
+        gaps = GapScanner(self.store).find_gaps("EUR/USD", "1h")
+
+        self.assertEqual([gap["bars"] for gap in gaps], [3, 5])
+        self.assertEqual(sorted(k for gap in gaps for k in gap["missing"]), sorted(self.removed))
+
+    def test_backfill_minimal_requests(self):
+        """Tester le regroupement des trous, le budget et le remplissage"""
+        with TwelveDataStandInServer() as server:
+            client = make_client(server)
+
+            # Trous trop éloignés pour une requête de 50 bougies: une par trou
+            narrow = GapScanner(self.store, client, max_output_size=50)
+            stats = narrow.backfill(max_credits=1)
+            self.assertEqual((stats["requests"], stats["deferred"], stats["filled"]), (1, 1, 5))
+
+            # Un seul trou restant, puis plus aucun
+            scanner = GapScanner(self.store, client)
+            stats = scanner.backfill()
+            self.assertEqual((stats["requests"], stats["filled"]), (1, 3))
+            self.assertEqual(scanner.find_gaps("EUR/USD", "1h"), [])
+            self.assertIn("end_date", server.requests[-1])
+
+
+def make_client(server, **kwargs) -> TwelveDataClient:
+    """Client pointant vers le serveur local, sans contrainte de débit"""
+    limiter = TokenBucketRateLimiter(rate_per_minute=10000, daily_limit=10000)
+    kwargs.setdefault("response_cache", BarAwareCache())
+    kwargs.setdefault("retry_policy", RetryPolicy(base_delay=0.01))
+    return TwelveDataClient("demo", base_url=server.url, rate_limiter=limiter, **kwargs)
+
+
+class TestBatchTimeSeries(unittest.TestCase):
+    """Tests des requêtes time_series par lot (serveur local)"""
+
+    def test_batch_splits_symbols(self):
+        """Tester le découpage de la réponse batch par paire"""
+        with TwelveDataStandInServer(errors={"BAD/PAIR": "symbol invalide"}) as server:
+            client = make_client(server)
+            series = client.get_time_series_batch(["EUR/USD", "GBP/USD", "BAD/PAIR"], "1h", 5)
+
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(server.requests[0]["symbol"], "EUR/USD,GBP/USD,BAD/PAIR")
+        self.assertEqual(len(series["EUR/USD"]["values"]), 5)
+        self.assertEqual(series["GBP/USD"]["meta"]["symbol"], "GBP/USD")
+        self.assertIsNone(series["BAD/PAIR"])
+
+    def test_batch_single_symbol(self):
+        """Tester la réponse non imbriquée pour un seul symbole"""
+        with TwelveDataStandInServer() as server:
+            client = make_client(server)
+            candles = client.get_candles_batch(["EUR/USD"], "1h", 3)
+
+        self.assertEqual(len(candles["EUR/USD"]), 3)
+
+
+class TestAsyncClient(unittest.TestCase):
+    """Tests du client async (pool httpx partagé)"""
+
+    def test_async_candles(self):
+        """Tester les variantes async des get_*_candles"""
+        async def run(client):
+            try:
+                return await asyncio.gather(
+                    client.get_time_series_async("EUR/USD", "1h", 4),
+                    client.get_candles_batch_async(["EUR/USD", "GBP/USD"], "1day", 3),
+                )
+            finally:
+                await client.aclose()
+
+        with TwelveDataStandInServer() as server:
+            client = make_client(server)
+            single, batch = asyncio.run(run(client))
+
+        self.assertEqual(len(single["values"]), 4)
+        self.assertEqual(len(batch["GBP/USD"]), 3)
+        self.assertEqual(len(server.requests), 2)
+
+
+class TestResilience(unittest.TestCase):
+    """Tests des retries, du circuit breaker et des requêtes doublées"""
+
+    def test_retry_after_server_error(self):
+        """Tester le retry après des erreurs 5xx puis un rate limit"""
+        with TwelveDataStandInServer() as server:
+            server.queue_response(503, {"status": "error"}, count=1)
+            server.queue_rate_limit()
+            client = make_client(server)
+            data = client.get_time_series("EUR/USD", "1h", 5)
+
+        self.assertEqual(len(data["values"]), 5)
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(client.retries, 2)
+        self.assertEqual(client.get_fetch_stats()["attempts"], 3)
+        # Chaque tentative envoyée est facturée par le limiteur et journalisée
+        self.assertEqual(client.credits_used, 3)
+        self.assertEqual(client.rate_limiter.daily_used, 3)
+
+    def test_circuit_breaker_opens(self):
+        """Tester l'ouverture puis la requête d'essai du circuit"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("time_series", failure_threshold=2, reset_timeout=30, clock=clock)
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        clock.now += 30
+        self.assertTrue(breaker.allow())  # requête d'essai
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_trial_released_on_daily_limit(self):
+        """Tester qu'un essai semi-ouvert refusé par le budget quotidien ne bloque pas le circuit"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("time_series", failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+
+        with TwelveDataStandInServer() as server:
+            client = make_client(server)
+            client.circuit_breakers["time_series"] = breaker
+            client.rate_limiter.daily_used = client.rate_limiter.daily_limit
+
+            self.assertIsNone(client.get_time_series("EUR/USD", "1h", 5))
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertEqual(len(server.requests), 0)
+
+            # Budget rétabli (nouveau jour): la requête d'essai part et referme le circuit
+            client.rate_limiter.daily_used = 0
+            self.assertIsNotNone(client.get_time_series("EUR/USD", "1h", 5))
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_open_circuit_skips_http(self):
+        """Tester qu'un circuit ouvert n'envoie plus de requête"""
+        with TwelveDataStandInServer() as server:
+            server.queue_response(500, {"status": "error"}, count=3)
+            client = make_client(server, retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+            client.circuit_breakers["time_series"] = CircuitBreaker("time_series", failure_threshold=3)
+
+            self.assertIsNone(client.get_time_series("EUR/USD", "1h", 5))
+            self.assertIsNone(client.get_time_series("GBP/USD", "1h", 5))
+
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(client.get_fetch_stats()["circuits"], {"time_series": CircuitBreaker.OPEN})
+
+    def test_hedged_request(self):
+        """Tester qu'une requête lente est doublée et la plus rapide gardée"""
+        async def run(client):
+            try:
+                return await client.get_time_series_async("EUR/USD", "1h", 5)
+            finally:
+                await client.aclose()
+
+        with TwelveDataStandInServer() as server:
+            server.queue_response(200, synthetic_time_series("EUR/USD", "1h", 5), delay=2.0)
+            client = make_client(server, hedge_after=0.1)
+            start = datetime.now()
+            data = asyncio.run(run(client))
+            elapsed = (datetime.now() - start).total_seconds()
+
+        self.assertEqual(len(data["values"]), 5)
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(client.hedges, 1)
+        self.assertEqual(client.credits_used, 2)
+
+    def test_latency_percentiles(self):
+        """Tester les percentiles de latence (rang le plus proche)"""
+        tracker = LatencyTracker(window=100)
+        for ms in range(1, 101):
+            tracker.record(ms / 1000)
+
+        stats = tracker.get_stats()
+        self.assertEqual(stats["attempts"], 100)
+        self.assertAlmostEqual(stats["p50"], 0.050)
+        self.assertAlmostEqual(stats["p99"], 0.099)
+
+
+class FakeClock:
+    """Horloge manuelle pour les tests du limiteur"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucketRateLimiter(unittest.TestCase):
+    """Tests du limiteur token-bucket"""
+
+    def test_wait_when_bucket_empty(self):
+        """Tester l'attente calculée quand le bucket est vide"""
+        clock = FakeClock()
+        limiter = TokenBucketRateLimiter(rate_per_minute=8, daily_limit=800, clock=clock)
+        limiter._reserve(8)
+
+        # Bucket vide: 1 crédit = 7.5s (8 crédits/min)
+        self.assertAlmostEqual(limiter._reserve(1), 7.5)
+        # Le suivant est mis en file derrière
+        self.assertAlmostEqual(limiter._reserve(1), 15.0)
+
+        clock.now = 60.0
+        self.assertEqual(limiter._reserve(1), 0.0)
+
+    def test_daily_limit(self):
+        """Tester le refus au-delà du budget quotidien"""
+        limiter = TokenBucketRateLimiter(rate_per_minute=100, daily_limit=10, clock=FakeClock())
+        limiter._reserve(10)
+
+        with self.assertRaises(DailyCreditLimitError):
+            limiter._reserve(1)
+        self.assertEqual(limiter.credits_remaining_today(), 0)
+
+    def test_async_acquire_concurrent(self):
+        """Tester que des coroutines concurrentes ne partagent pas un jeton"""
+        limiter = TokenBucketRateLimiter(rate_per_minute=600, daily_limit=800)
+
+        async def run():
+            return await asyncio.gather(*(limiter.acquire_async(1) for _ in range(605)))
+
+        waits = asyncio.run(run())
+
+        self.assertEqual(limiter.get_stats()["acquisitions"], 605)
+        self.assertGreater(max(waits), 0)
+
+
+class TestCreditAccounting(unittest.TestCase):
+    """Tests du journal persistant des crédits API"""
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.db = Database(self.db_path)
+
+    def tearDown(self):
+        os.remove(self.db_path)
+
+    def test_credits_logged_and_restored(self):
+        """Tester la journalisation et la reprise après redémarrage"""
+        with TwelveDataStandInServer() as server:
+            client = make_client(server, credit_ledger=self.db)
+            client.get_time_series_batch(["EUR/USD", "GBP/USD"], "1h", 2)
+            client.get_time_series("EUR/USD", "1day", 2)
+
+        self.assertEqual(self.db.get_credits_used_today(), 3)
+
+        # Nouveau client (redémarrage): le compteur repart du journal
+        restarted = TwelveDataClient("demo", rate_limiter=TokenBucketRateLimiter(), credit_ledger=Database(self.db_path))
+        self.assertEqual(restarted.get_credits_remaining(), 797)
+
+    def test_failed_attempts_logged(self):
+        """Tester que les tentatives en erreur (4xx, 5xx) sont journalisées"""
+        with TwelveDataStandInServer() as server:
+            server.queue_response(503, {"status": "error"}, count=1)
+            server.queue_response(404, {"status": "error", "code": 404}, count=1)
+            client = make_client(server, credit_ledger=self.db, retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+            client.get_time_series("EUR/USD", "1h", 2)
+
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(self.db.get_credits_used_today(), 2)
+
+
+class TestBudgetPlanner(unittest.TestCase):
+    """Tests du planificateur de budget"""
+
+    def setUp(self):
+        self.planner = BudgetPlanner(["EUR/USD", "GBP/USD", "USD/JPY", "AUD/USD"], safety_margin=10)
+
+    def test_daily_scan_uses_budget(self):
+        """Tester que le scan quotidien prend toutes les paires si possible"""
+        now = datetime(2024, 1, 2, 0, 0, tzinfo=timezone.utc)
+        plan = self.planner.plan("daily_scan", ["USD/JPY", "EUR/USD"], 800, now)
+
+        self.assertEqual(plan["pairs"], ["EUR/USD", "USD/JPY"])
+        self.assertEqual(plan["credits"], 6)  # H1 + W1 + D1 au plus
+
+        plan = self.planner.plan("daily_scan", ["USD/JPY", "EUR/USD"], 15, now)
+        self.assertEqual(plan["pairs"], ["EUR/USD"])
+        self.assertEqual(plan["deferred"], ["USD/JPY"])
+
+        # Coût réel par paire: H1 seul quand l'historique local suffit
+        intervals = {"EUR/USD": ["1h"], "USD/JPY": ["1h", "1week", "1day"]}
+        plan = self.planner.plan("daily_scan", ["USD/JPY", "EUR/USD"], 14, now, intervals=intervals)
+        self.assertEqual(plan["pairs"], ["EUR/USD", "USD/JPY"])
+        self.assertEqual(plan["credits"], 4)
+
+    def test_daily_scan_intervals_follow_local_history(self):
+        """Tester les timeframes demandés selon l'historique local"""
+        fd, db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            store = CandleStore(db_path)
+            store.save_candles("EUR/USD", "1h", make_values(0, 24 * 7 * 210))
+            store.save_candles("EUR/USD", "1day", [  # D1 natifs (backfill API déjà fait)
+                {**value, "datetime": value["datetime"][:10]} for value in make_values(0, 24 * 210)[::24]
+            ])
+            client = TwelveDataClient("demo", rate_limiter=TokenBucketRateLimiter(), candle_store=store)
+            scanner = ForexScanner(client, None)
+
+            intervals = scanner.daily_scan_intervals(["EUR/USD", "GBP/USD"])
+            self.assertEqual(intervals, {"EUR/USD": ["1h"], "GBP/USD": ["1h", "1week", "1day"]})
+            self.assertEqual(ForexScanner(TwelveDataClient("demo"), None).daily_scan_intervals(["EUR/USD"]),
+                             {"EUR/USD": ["1week", "1day"]})
+        finally:
+            os.remove(db_path)
+
+    def test_backfill_deferred_to_protect_hourly(self):
+        """Tester le report du backfill quand il menace les scans H1"""
+        now = datetime(2024, 1, 2, 10, 0, tzinfo=timezone.utc)
+        pairs = ["EUR/USD", "GBP/USD"]
+
+        # 13 scans H1 restants x 4 paires + marge 10 = 62 crédits réservés
+        plan = self.planner.plan("backfill", pairs, 62, now, expected_hourly_pairs=4)
+        self.assertEqual(plan["pairs"], [])
+        self.assertEqual(plan["deferred"], pairs)
+
+        plan = self.planner.plan("backfill", pairs, 70, now, expected_hourly_pairs=4)
+        self.assertEqual(plan["pairs"], pairs)
+        self.assertEqual(plan["credits"], 2)
+
+
+class TestCandleResampler(unittest.TestCase):
+    """Tests de l'agrégation H1 -> H4/D1/W1"""
+
+    def setUp(self):
+        # Dimanche 2024-01-07 22:00 UTC -> mardi 2024-01-09 01:00 UTC
+        self.values = make_values(0, 28, datetime(2024, 1, 7, 22, tzinfo=timezone.utc))
+
+    def test_daily_folds_sunday_into_monday(self):
+        """Tester le rattachement du dimanche soir au lundi"""
+        daily = CandleResampler.resample(self.values, "1day")
+
+        self.assertEqual([d["datetime"] for d in daily], ["2024-01-09", "2024-01-08"])
+        monday = daily[1]
+        self.assertEqual(monday["close"], float(self.values[-26]["close"]))
+        self.assertEqual(monday["open"], 1.1)
+
+    def test_weekly_and_4h(self):
+        """Tester les bornes hebdomadaires et H4"""
+        weekly = CandleResampler.resample(self.values, "1week")
+        h4 = CandleResampler.resample(self.values, "4h")
+
+        self.assertEqual(len(weekly), 1)
+        self.assertEqual(weekly[0]["datetime"], "2024-01-08")
+        self.assertEqual(h4[-1]["datetime"], "2024-01-07 20:00:00")
+        self.assertEqual(h4[0]["datetime"], "2024-01-09 00:00:00")
+
+    def test_merge_with_native(self):
+        """Tester la fusion avec l'historique natif plus ancien"""
+        aggregated = CandleResampler.resample(self.values, "1day")
+        native = [
+            {"datetime": "2024-01-08", "open": 1.0, "high": 1.2, "low": 0.9, "close": 1.1},
+            {"datetime": "2024-01-05", "open": 1.0, "high": 1.2, "low": 0.9, "close": 1.0},
+        ]
+
+        merged = CandleResampler.merge_with_native(aggregated, native)
+
+        self.assertEqual([d["datetime"] for d in merged], ["2024-01-09", "2024-01-08", "2024-01-05"])
+        self.assertEqual(merged[1]["low"], 0.9)
+
+
+class TestBarAwareCache(unittest.TestCase):
+    """Tests du cache aligné sur les bougies"""
+
+    def test_expires_at_bar_close(self):
+        """Tester l'expiration à la clôture de la bougie en cours"""
+        clock = FakeClock()
+        clock.now = datetime(2024, 1, 8, 10, 20, tzinfo=timezone.utc).timestamp()
+        cache = BarAwareCache(clock=clock)
+        cache.put("EUR/USD", "1h", 10, {"values": make_values(0, 10)})
+
+        self.assertEqual(len(cache.get("EUR/USD", "1h", 5)["values"]), 5)
+        self.assertIsNone(cache.get("EUR/USD", "1h", 20))
+
+        clock.now = datetime(2024, 1, 8, 11, 0, tzinfo=timezone.utc).timestamp()
+        self.assertIsNone(cache.get("EUR/USD", "1h", 5))
+
+    def test_single_flight_async(self):
+        """Tester que les requêtes concurrentes partagent un seul appel HTTP"""
+        with TwelveDataStandInServer() as server:
+            client = make_client(server)
+
+            async def run():
+                try:
+                    return await asyncio.gather(*(
+                        client.get_time_series_async("EUR/USD", "1h", size)
+                        for size in (5, 5, 3, 5)
+                    ))
+                finally:
+                    await client.aclose()
+
+            results = asyncio.run(run())
+            client.get_time_series("EUR/USD", "1h", 4)
+
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual([len(r["values"]) for r in results], [5, 5, 3, 5])
+        self.assertEqual(client.response_cache.get_stats()["coalesced"], 3)
+
+
+class TestRecordReplay(unittest.TestCase):
+    """Tests des modes record/replay et du serveur local"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.recorder = ResponseRecorder(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_record_then_replay_offline(self):
+        """Tester le rejeu hors ligne des réponses enregistrées"""
+        with TwelveDataStandInServer() as server:
+            recording = make_client(server, mode="record", recorder=self.recorder)
+            live = recording.get_time_series("EUR/USD", "1h", 10)
+
+        # Serveur arrêté: seul le rejeu peut répondre
+        replay = TwelveDataClient("demo", mode="replay", recorder=self.recorder, response_cache=BarAwareCache())
+        replayed = replay.get_time_series("EUR/USD", "1h", 10)
+
+        self.assertEqual(replayed["values"], live["values"])
+        self.assertIsNone(replay.get_time_series("GBP/USD", "1h", 10))
+
+    def test_replay_ignores_outputsize(self):
+        """Tester que le rejeu ne dépend pas de outputsize (calculé selon l'heure)"""
+        with TwelveDataStandInServer() as server:
+            recording = make_client(server, mode="record", recorder=self.recorder)
+            live = recording.get_time_series("EUR/USD", "1h", 10)
+            recording.response_cache = BarAwareCache()
+            recording.get_time_series("EUR/USD", "1h", 4)
+
+        replay = TwelveDataClient("demo", mode="replay", recorder=self.recorder, response_cache=BarAwareCache())
+        replayed = replay.get_time_series("EUR/USD", "1h", 7)
+
+        self.assertEqual(replayed["values"], live["values"])
+
+    def test_rate_limit_recorded_and_replayed(self):
+        """Tester l'enregistrement d'une réponse 429"""
+        with TwelveDataStandInServer() as server:
+            server.queue_rate_limit(count=RetryPolicy().max_attempts)
+            client = make_client(server, mode="record", recorder=self.recorder)
+            self.assertIsNone(client.get_time_series("EUR/USD", "1day", 5))
+
+        replay = TwelveDataClient("demo", mode="replay", recorder=self.recorder, response_cache=BarAwareCache())
+        self.assertIsNone(replay.get_time_series("EUR/USD", "1day", 5))
+        self.assertEqual(replay.credits_used, 0)
+
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    """Attendre qu'une condition devienne vraie (boucle asyncio)"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("Condition non atteinte")
+        await asyncio.sleep(0.01)
+
+
+class TestPriceStream(unittest.TestCase):
+    """Tests du flux de prix et des signaux intrabar"""
+
+    def test_latest_quote_per_pair(self):
+        """Tester l'abonnement et la dernière cotation par paire"""
+        ticks = []
+
+        async def run():
+            async with PriceFeedStandInServer() as feed:
+                stream = PriceStream("demo", on_tick=lambda *tick: ticks.append(tick), url=feed.url)
+                await stream.set_symbols(["EUR/USD", "GBP/USD"])
+                task = asyncio.ensure_future(stream.run())
+                await wait_for(lambda: feed.subscribers("GBP/USD"))
+
+                await feed.push_price("EUR/USD", 1.1, 100)
+                await feed.push_price("EUR/USD", 1.2, 101)
+                await feed.push_price("GBP/USD", 1.3, 102)
+                await wait_for(lambda: stream.ticks == 3)
+
+                await stream.set_symbols(["EUR/USD"])
+                await wait_for(lambda: not feed.subscribers("GBP/USD"))
+                await stream.stop()
+                await task
+                return stream
+
+        stream = asyncio.run(run())
+
+        self.assertEqual(stream.get_quote("EUR/USD"), {"price": 1.2, "timestamp": 101})
+        self.assertIsNone(stream.get_quote("GBP/USD"))
+        self.assertEqual(ticks[-1], ("GBP/USD", 1.3, 102))
+
+    def test_resubscribe_after_reconnect(self):
+        """Tester la reconnexion et le renvoi des abonnements"""
+        async def run():
+            async with PriceFeedStandInServer() as feed:
+                stream = PriceStream("demo", url=feed.url, retry_policy=RetryPolicy(base_delay=0.01))
+                await stream.set_symbols(["USD/JPY"])
+                task = asyncio.ensure_future(stream.run())
+                await wait_for(lambda: feed.subscribers("USD/JPY"))
+
+                await feed.disconnect_all()
+                await wait_for(lambda: stream.reconnects == 1 and feed.subscribers("USD/JPY"))
+                await feed.push_price("USD/JPY", 150.0)
+                await wait_for(lambda: stream.get_quote("USD/JPY") is not None)
+
+                await stream.stop()
+                await task
+
+        asyncio.run(run())
+
+    def test_tick_in_cached_zone(self):
+        """Tester un signal intrabar notifié une seule fois par entrée en zone"""
+        scanner = ForexScanner(None, None)
+        levels = FibonacciCalculator.calculate_levels(1.2, 1.1)
+        fibs = [{
+            "index": 1,
+            "mode": "bearish",
+            "levels": levels,
+            "zone_min": min(levels["level_500"], levels["level_618"]),
+            "zone_max": max(levels["level_500"], levels["level_618"]),
+        }]
+        candles = CandleSeries.from_values(make_values(0, 60), "1h")
+        scanner._cache_zones("EUR/USD", "bearish", fibs, candles, ha_confirmed=True)
+
+        signal = scanner.check_tick("EUR/USD", 1.145)
+        self.assertEqual(signal["signal_type"], "bearish")
+        self.assertEqual(signal["fib_index"], 1)
+        self.assertIsNone(scanner.check_tick("EUR/USD", 1.146))  # déjà notifié
+
+        self.assertIsNone(scanner.check_tick("EUR/USD", 1.17))  # sortie de zone
+        self.assertIsNotNone(scanner.check_tick("EUR/USD", 1.145))
+        self.assertIsNone(scanner.check_tick("GBP/USD", 1.145))
+
+    def test_ticks_batch_matches_single(self):
+        """Tester l'évaluation multi-paires (masque NumPy) contre l'index par paire"""
+        levels = FibonacciCalculator.calculate_levels(1.2, 1.1)
+        fib = FibonacciCalculator.build_fibonacci("bearish", 1, 1.2, 1.1, 5, 9, levels=levels)
+        candles = CandleSeries.from_values(make_values(0, 60), "1h")
+        prices = {"EUR/USD": 1.145, "GBP/USD": 1.17, "USD/JPY": 1.145}
+
+        batch, single = ForexScanner(None, None), ForexScanner(None, None)
+        for scanner in (batch, single):
+            scanner._cache_zones("EUR/USD", "bearish", [fib], candles, ha_confirmed=True)
+            scanner._cache_zones("GBP/USD", "bearish", [fib], candles, ha_confirmed=True)
+
+        signals = batch.check_ticks(prices)
+        expected = {symbol: single.check_tick(symbol, price) for symbol, price in prices.items()}
+        self.assertEqual(list(signals), ["EUR/USD"])
+        self.assertEqual(signals["EUR/USD"]["fib_index"], expected["EUR/USD"]["fib_index"])
+        self.assertEqual(batch.check_ticks(prices), {})  # déjà notifié
+
 
 if __name__ == "__main__":
     unittest.main()
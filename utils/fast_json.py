@@ -0,0 +1,31 @@
+"""
+Décodage JSON rapide (orjson si installé, sinon module json standard)
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def loads(body: Union[str, bytes]) -> Any:
+    """
+    Décoder un document JSON
+
+    Args:
+        body: Texte ou octets JSON
+
+    Returns:
+        Objet Python décodé
+
+    Raises:
+        ValueError: JSON invalide (orjson.JSONDecodeError en hérite)
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
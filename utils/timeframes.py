@@ -0,0 +1,150 @@
+"""
+Utilitaires de timeframes et d'horodatage des bougies
+"""
+
+from datetime import datetime, timedelta, timezone
+from config.settings import (
+    FX_DAY_START_HOUR_UTC,
+    FX_WEEK_CLOSE_HOUR_UTC,
+    FX_WEEK_OPEN_HOUR_UTC,
+    TIMEFRAME_SECONDS,
+)
+
+# Formats de date renvoyés par Twelve Data (intraday / daily+)
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Convertir un champ "datetime" Twelve Data en datetime UTC
+
+    Args:
+        value: Date au format "YYYY-MM-DD HH:MM:SS" ou "YYYY-MM-DD"
+
+    Returns:
+        datetime avec timezone UTC
+    """
+    fmt = DATETIME_FORMAT if len(value) > 10 else DATE_FORMAT
+    return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+
+
+def format_timestamp(dt: datetime, interval: str) -> str:
+    """
+    Formater un datetime au format Twelve Data du timeframe
+
+    Args:
+        dt: Date à formater
+        interval: Timeframe (1h, 4h, 1day, 1week)
+
+    Returns:
+        Chaîne au format Twelve Data
+    """
+    if interval in ("1day", "1week"):
+        return dt.strftime(DATE_FORMAT)
+    return dt.strftime(DATETIME_FORMAT)
+
+
+def interval_seconds(interval: str) -> int:
+    """Durée d'une bougie du timeframe en secondes"""
+    if interval not in TIMEFRAME_SECONDS:
+        raise ValueError(f"Timeframe inconnu: {interval}")
+    return TIMEFRAME_SECONDS[interval]
+
+
+def bucket_start(dt: datetime, interval: str) -> datetime:
+    """
+    Calculer le début de la bougie du timeframe contenant dt
+
+    Sessions FX: la journée commence à FX_DAY_START_HOUR_UTC et les
+    bougies du dimanche soir (ouverture du marché) sont rattachées au
+    lundi, pour la journée comme pour la semaine.
+
+    Args:
+        dt: Date UTC
+        interval: Timeframe cible (1h, 4h, 1day, 1week)
+
+    Returns:
+        Début de la bougie (UTC)
+    """
+    if interval == "1h":
+        return dt.replace(minute=0, second=0, microsecond=0)
+
+    if interval == "4h":
+        return dt.replace(hour=dt.hour - dt.hour % 4, minute=0, second=0, microsecond=0)
+
+    day = (dt - timedelta(hours=FX_DAY_START_HOUR_UTC)).replace(hour=0, minute=0, second=0, microsecond=0)
+    if day.weekday() == 6:
+        day += timedelta(days=1)  # dimanche soir -> lundi
+    elif day.weekday() == 5:
+        day -= timedelta(days=1)  # samedi (marché fermé) -> vendredi
+
+    if interval == "1day":
+        return day
+    if interval == "1week":
+        return day - timedelta(days=day.weekday())
+
+    raise ValueError(f"Timeframe inconnu: {interval}")
+
+
+def is_fx_market_open(dt: datetime) -> bool:
+    """
+    Vérifier si le marché FX est ouvert (du dimanche soir au vendredi soir UTC)
+
+    Args:
+        dt: Date UTC
+
+    Returns:
+        True si une bougie peut exister à cette date
+    """
+    weekday = dt.weekday()
+    if weekday == 5:
+        return False
+    if weekday == 4 and dt.hour >= FX_WEEK_CLOSE_HOUR_UTC:
+        return False
+    if weekday == 6 and dt.hour < FX_WEEK_OPEN_HOUR_UTC:
+        return False
+    return True
+
+
+def is_bar_expected(start: datetime, interval: str) -> bool:
+    """
+    Vérifier si une bougie commençant à start existe selon le calendrier FX
+
+    Args:
+        start: Début de la bougie (UTC, aligné sur le timeframe)
+        interval: Timeframe (1h, 4h, 1day, 1week)
+
+    Returns:
+        True si au moins une heure de la bougie est ouverte
+    """
+    if interval == "1week":
+        return start.weekday() == 0
+    if interval == "1day":
+        return start.weekday() < 5
+
+    hours = interval_seconds(interval) // 3600
+    return any(is_fx_market_open(start + timedelta(hours=h)) for h in range(hours))
+
+
+def expected_bars(interval: str, start: datetime, end: datetime) -> list[datetime]:
+    """
+    Lister les bougies attendues entre deux dates (bornes incluses)
+
+    Args:
+        interval: Timeframe (1h, 4h, 1day, 1week)
+        start: Première date (UTC)
+        end: Dernière date (UTC)
+
+    Returns:
+        Débuts des bougies attendues, du plus ancien au plus récent
+    """
+    step = timedelta(seconds=interval_seconds(interval))
+    current = bucket_start(start, interval)
+    bars = []
+
+    while current <= end:
+        if is_bar_expected(current, interval):
+            bars.append(current)
+        current += step
+    return bars